@@ -1,12 +1,13 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-import jwt
+from redis.asyncio import Redis
 
 from jwt.exceptions import InvalidTokenError as JWTInvalidTokenError
 from app.core.config import settings
+from app.core.metrics import BLACKLIST_HIT, BLACKLIST_MISS
 from app.db.pool import get_pool
-from app.redis.client import get_redis_client
-from app.utils.security import decode_access_token
+from app.utils.jwt_keys import public_jwks
+from common.token_verifier import AccessTokenVerifier, JWKSKeys, TokenRevoked
 from app.exceptions.auth import (
     InvalidTokenError,
     TokenRevokedError,
@@ -15,49 +16,54 @@ from app.exceptions.auth import (
 
 security = HTTPBearer()
 
+_token_verifier: AccessTokenVerifier | None = None
+
 async def get_db_pool():
     return await get_pool()
 
+def init_token_verifier(redis: Redis) -> AccessTokenVerifier:
+    global _token_verifier
+    if _token_verifier is None:
+        # Свои токены auth проверяет по своим же публичным ключам — без запроса к /.well-known/jwks.json
+        key = settings.JWT_SECRET_KEY if settings.JWT_ALGORITHM == "HS256" else JWKSKeys(jwks=public_jwks())
+        _token_verifier = AccessTokenVerifier(
+            redis,
+            key=key,
+            algorithms=[settings.JWT_ALGORITHM],
+            max_staleness_seconds=settings.ACCESS_TOKEN_REVOCATION_MAX_STALENESS_SECONDS,
+            claims_cache_size=settings.ACCESS_TOKEN_CLAIMS_CACHE_SIZE,
+        )
+        _token_verifier.start()
+    return _token_verifier
+
+def get_token_verifier() -> AccessTokenVerifier:
+    if _token_verifier is None:
+        raise RuntimeError("Token verifier is not initialized")
+    return _token_verifier
+
+def token_verifier_stats() -> dict | None:
+    return _token_verifier.stats() if _token_verifier is not None else None
+
+async def close_token_verifier() -> None:
+    global _token_verifier
+    if _token_verifier is not None:
+        await _token_verifier.close()
+        _token_verifier = None
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    redis = Depends(get_redis_client)
 )-> dict:
     """
-    Извлекает и валидирует JWT access-токен.
-    Возвращает словарь: {"user_id": str, "jti": str}
+    Извлекает и валидирует JWT access-токен (common/token_verifier.py: claims и отзывы — в памяти процесса).
+    Возвращает словарь: {"user_id": str, "jti": str, "exp": int}
     """
-    token = credentials.credentials
-        # credentials_exception = HTTPException(
     try:
-        # Декодируем токен
-        # status_code=status.HTTP_401_UNAUTHORIZED,
-        # detail="Could not validate credentials",
-        # headers={"WWW-Authenticate": "Bearer"},
-        # )
-        #payload = decode_access_token(token)
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM]
-        )
-
-        user_id: str | None = payload.get("sub")
-        jti: str | None = payload.get("jti")
-        token_type: str | None = payload.get("type")
-
-        if not user_id or not jti:
-            raise InvalidTokenError("Missing required claims: sub or jti")
-
-        if token_type != "access":
-            raise InvalidTokenError("Invalid token type: expected 'access'")
-
-        # Проверка чёрного списка Redis
-        if await redis.exists(f"blacklist:access:{jti}"):
-            raise TokenRevokedError()
-
-        return {"user_id": user_id, "jti": jti}
-
-
+        claims = await get_token_verifier().verify(credentials.credentials)
+    except TokenRevoked:
+        BLACKLIST_HIT.inc()
+        raise TokenRevokedError()
     except JWTInvalidTokenError:
         raise InvalidTokenError()
+    BLACKLIST_MISS.inc()
 
+    return {"user_id": claims["sub"], "jti": claims["jti"], "exp": claims["exp"]}
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from datetime import datetime, timedelta, timezone
 
-from app.api.v1.deps import get_redis_client, get_current_user
+from app.api.v1.deps import get_current_user, get_token_verifier
+from app.redis.client import get_redis_client
 from app.core.config import settings
 from app.services.auth_service import authenticate_user
 from app.schemas.auth import (
@@ -11,7 +12,6 @@ from app.schemas.auth import (
     RegisterRequest,
 )
 from app.db.functions import (
-    consume_refresh_token,
     register_user_with_refresh,
     rotate_refresh_token,
     invalidate_all_refresh_tokens,
@@ -21,6 +21,7 @@ from app.utils.security import (
     hash_token,
     create_refresh_token,
 )
+from common.token_verifier import publish_revocation
 from app.exceptions.auth import (
     PasswordRequiredError,
     InvalidCredentialsError,
@@ -29,6 +30,7 @@ from app.exceptions.auth import (
     InvalidGroupError,
     RegistrationFailedError,
 )
+from app.exceptions.base import BaseAPIException
 
 
 router = APIRouter()
@@ -48,16 +50,14 @@ async def login(request: LoginRequest):
 @router.post("/refresh", response_model=TokenResponse)
 async def refresh(request: RefreshRequest):
     token_hash = hash_token(request.refresh_token)
+    new_refresh, new_refresh_hash = create_refresh_token()
+    expires_at = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    # Старый refresh помечается использованным, новый сохраняется — одним запросом и одной транзакцией
     try:
-        user_id = await consume_refresh_token(token_hash)  # возвращает user_id и удаляет refresh
+        user_id = await rotate_refresh_token(token_hash, new_refresh_hash, expires_at)
     except ValueError:
         raise InvalidTokenError("Invalid or expired refresh token")
-    # Генерируем новые токены
     new_access = create_access_token(user_id)
-    new_refresh, new_refresh_hash = create_refresh_token()
-    expires_at = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    # Сохраняем новый refresh
-    await rotate_refresh_token(user_id, new_refresh_hash, expires_at.isoformat())
     return TokenResponse(
         access_token=new_access,
         refresh_token=new_refresh
@@ -89,6 +89,8 @@ async def register(request: RegisterRequest):
             raise InvalidGroupError(detail=err_msg)
         else:
             raise RegistrationFailedError(detail=err_msg)
+    except BaseAPIException:
+        raise  # 503 от пула паролей и т.п. — как есть
     except Exception as e:
         err_msg = str(e)
         if "already exists" in err_msg:
@@ -105,9 +107,9 @@ async def logout(
     access_jti = current_user["jti"]  # ← можно извлечь из JWT
     user_id = current_user["user_id"]
 
-    # 1. Черный список access
-    ttl = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
-    await redis.setex(f"blacklist:access:{access_jti}", ttl, "1")
+    # 1. Черный список access: ключ в Redis + стрим отзывов для локальных копий (common/token_verifier.py)
+    await publish_revocation(redis, access_jti, current_user["exp"], settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+    get_token_verifier().revoke(access_jti, current_user["exp"])
 
     # 2. Инвалидировать все refresh-токены пользователя
     await invalidate_all_refresh_tokens(user_id)
@@ -1,4 +1,5 @@
 import os
+from typing import Literal
 from pydantic import RedisDsn
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -14,14 +15,54 @@ class Settings(BaseSettings):
     POSTGRES_PORT: str = "5432"
     POSTGRES_DB: str
 
+    # Пул asyncpg (app/db/pool.py): только мастер (HAProxy 5432), реплик auth не читает
+    DB_WRITE_POOL_MIN_SIZE: int = 5
+    DB_WRITE_POOL_MAX_SIZE: int = 20
+    DB_POOL_ACQUIRE_TIMEOUT: float | None = 10.0  # сек ожидания свободного соединения
+    DB_POOL_COMMAND_TIMEOUT: float | None = None
+    DB_POOL_MAX_INACTIVE_CONNECTION_LIFETIME: float = 300.0
+    DB_POOL_MAX_QUERIES: int = 50_000
+    DB_POOL_STATEMENT_CACHE_SIZE: int = 100
+
+    # Пароли (app/utils/password_executor.py): потоков для хэширования (None — по числу ядер) и сколько задач
+    # может ждать/выполняться одновременно — сверх этого /login и /register сразу отвечают 503
+    PASSWORD_HASH_WORKERS: int | None = None
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    # Схема новых хэшей (app/utils/security.py): argon2 — argon2id, bcrypt — как раньше; хэши другой схемы
+    # и с меньшей стоимостью проверяются и перехэшируются после успешного логина (PASSWORD_REHASH_ON_LOGIN).
+    # Стоимость подбирается на старте под PASSWORD_HASH_BUDGET_MS на один хэш;
+    # PASSWORD_ARGON2_TIME_COST / PASSWORD_BCRYPT_ROUNDS фиксируют её вручную
+    PASSWORD_HASH_SCHEME: Literal["argon2", "bcrypt"] = "argon2"
+    PASSWORD_HASH_BUDGET_MS: float = 250.0
+    PASSWORD_ARGON2_MEMORY_KIB: int = 65536  # на каждый поток PASSWORD_HASH_WORKERS
+    PASSWORD_ARGON2_PARALLELISM: int = 1
+    PASSWORD_ARGON2_TIME_COST: int | None = None
+    PASSWORD_BCRYPT_ROUNDS: int | None = None
+    PASSWORD_REHASH_ON_LOGIN: bool = True
+
     # Redis
     REDIS_URL: RedisDsn
 
     # JWT
-    JWT_SECRET_KEY: str
-    JWT_ALGORITHM: str = "HS256"
+    # HS256 — общий секрет JWT_SECRET_KEY; RS256 / EdDSA — приватный ключ PEM (app/utils/jwt_keys.py),
+    # публичные ключи (текущий + JWT_ADDITIONAL_PUBLIC_KEY_PATHS при ротации) — в /.well-known/jwks.json
+    JWT_SECRET_KEY: str | None = None
+    JWT_ALGORITHM: Literal["HS256", "RS256", "EdDSA"] = "HS256"
+    JWT_PRIVATE_KEY_PATH: str | None = None
+    JWT_ADDITIONAL_PUBLIC_KEY_PATHS: list[str] = []
+    JWKS_CACHE_MAX_AGE_SECONDS: int = 300
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # Refresh-токены логинов пачками (app/db/refresh_token_writer.py): до MAX_SIZE токенов или LINGER_MS ожидания
+    # на один INSERT; MAX_IN_FLIGHT — параллельных пачек (соединений пула записи)
+    REFRESH_TOKEN_BATCH_ENABLED: bool = False
+    REFRESH_TOKEN_BATCH_MAX_SIZE: int = 100
+    REFRESH_TOKEN_BATCH_LINGER_MS: float = 2.0
+    REFRESH_TOKEN_BATCH_MAX_IN_FLIGHT: int = 4
+    # Проверка access-токенов (common/token_verifier.py): отзывы из стрима Redis дольше этого
+    # не синхронизировались — проверяем jti в Redis на каждый запрос; claims в памяти — до стольких токенов
+    ACCESS_TOKEN_REVOCATION_MAX_STALENESS_SECONDS: float = 5.0
+    ACCESS_TOKEN_CLAIMS_CACHE_SIZE: int = 10_000
 
     @property
     def DATABASE_URL(self) -> str:
@@ -0,0 +1,43 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+from common.metrics import CACHE_REQUESTS
+
+PASSWORD_HASH_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.5, 5.0)
+
+# Пароли в пуле потоков (app/utils/password_executor.py): ожидание в очереди отдельно от самого bcrypt
+PASSWORD_HASH_QUEUE_WAIT = Histogram(
+    "password_hash_queue_wait_seconds",
+    "Time a password hash/verify job waited for an executor thread",
+    ("operation",),
+    buckets=PASSWORD_HASH_BUCKETS,
+)
+PASSWORD_HASH_COMPUTE = Histogram(
+    "password_hash_compute_seconds",
+    "Password hash/verify CPU time in the executor",
+    ("operation",),
+    buckets=PASSWORD_HASH_BUCKETS,
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total",
+    "Password jobs rejected with 503: executor queue is full",
+    ("operation",),
+)
+PASSWORD_HASH_IN_FLIGHT = Gauge("password_hash_in_flight", "Password jobs queued or running in the executor")
+# Схема/стоимость новых хэшей (подобрана на старте) и перехэширование при логине
+PASSWORD_HASH_COST = Gauge("password_hash_cost", "Cost of new password hashes: argon2 time_cost or bcrypt rounds", ("scheme",))
+PASSWORD_HASH_UPGRADES = Counter(
+    "password_hash_upgrades_total",
+    "Rehash-on-login results: upgraded, conflict (password changed meanwhile), skipped (executor full), failed",
+    ("result",),
+)
+# Пачки refresh-токенов при логине (app/db/refresh_token_writer.py, REFRESH_TOKEN_BATCH_ENABLED)
+REFRESH_TOKEN_BATCH_SIZE = Histogram(
+    "refresh_token_batch_size",
+    "Refresh tokens written per auth.create_refresh_tokens call",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200),
+)
+
+# Предсозданные серии для горячего пути
+# Чёрный список access-токенов в Redis: hit — токен отозван
+BLACKLIST_HIT = CACHE_REQUESTS.labels("access_blacklist", "hit")
+BLACKLIST_MISS = CACHE_REQUESTS.labels("access_blacklist", "miss")
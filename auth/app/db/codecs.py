@@ -0,0 +1,20 @@
+import json
+
+from asyncpg import Connection
+
+
+# json/jsonb ↔ dict/list прямо в драйвере: готовые JSON-строки (json.dumps
+# в app/db/functions.py) передаются как есть, без повторной сериализации.
+
+def _encode_json(value) -> str:
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+async def register_json_codecs(conn: Connection) -> None:
+    """init= для пулов: json/jsonb декодируются в dict/list."""
+    for type_name in ("json", "jsonb"):
+        await conn.set_type_codec(
+            type_name, schema="pg_catalog",
+            encoder=_encode_json, decoder=json.loads, format="text",
+        )
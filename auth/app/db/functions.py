@@ -3,8 +3,16 @@ from asyncpg import Record
 import json
 
 from app.core.config import settings
-from app.utils.security import hash_password, create_refresh_token as gen_refresh_token
+from app.utils.password_executor import hash_password_async
+from app.utils.security import create_refresh_token as gen_refresh_token
 from app.db.pool import get_pool
+from app.db.queries import (
+    GET_ACTIVE_USER_CONTACT_BY_VALUE,
+    CREATE_REFRESH_TOKEN,
+    ROTATE_REFRESH_TOKEN,
+    CREATE_REFRESH_TOKENS,
+    UPDATE_PASSWORD_HASH,
+)
 
 # ------------------------
 # AUTH SERVICE FUNCTIONS
@@ -15,20 +23,18 @@ async def get_active_user_contact_by_value(value: str) -> Record | None:
     Получает активный контакт (second_login/email/phone) и связанные данные пользователя.
     Использует функцию accounts.get_active_user_contact_by_value (или аналогичную).
     """
+    # Только мастер: после регистрации или смены пароля реплика может отдать старые данные
     pool = await get_pool()
     # ⚠️ Важно: в схеме accounts должна существовать такая функция!
     # Если её нет — нужно создать (см. ниже рекомендацию).
-    return await pool.fetchrow(
-        "SELECT * FROM accounts.get_active_user_contact_by_value($1)",
-        value
-    )
+    return await pool.fetchrow(GET_ACTIVE_USER_CONTACT_BY_VALUE, value)
 
 async def register_user_with_refresh(payload: dict, password: str) -> tuple[Record, str]:
     """
     Создаёт пользователя в accounts и сохраняет refresh токен в auth — в одной транзакции.
     """
     pool = await get_pool()
-    password_hash = hash_password(password)
+    password_hash = await hash_password_async(password)
     full_payload = {**payload, "password_hash": password_hash}
 
     refresh_token, refresh_hash = gen_refresh_token()
@@ -43,7 +49,7 @@ async def register_user_with_refresh(payload: dict, password: str) -> tuple[Reco
             )
             # 2. Сохраняем refresh в auth.refresh_tokens
             await conn.execute(
-                "SELECT auth.create_refresh_token($1, $2, $3)",
+                CREATE_REFRESH_TOKEN,
                 str(user["id"]), refresh_hash, expires_at.isoformat()
             )
     return user, refresh_token
@@ -53,32 +59,37 @@ async def create_refresh_token(user_id: str, token_hash: str, expires_at: str) -
     Сохраняет refresh token (вызывается после логина/регистрации).
     """
     pool = await get_pool()
-    await pool.execute(
-        "SELECT auth.create_refresh_token($1, $2, $3)",
-        user_id, token_hash, expires_at
-    )
+    await pool.execute(CREATE_REFRESH_TOKEN, user_id, token_hash, expires_at)
 
-async def consume_refresh_token(token_hash: str) -> str:
+async def update_password_hash(user_id: str, old_hash: str, new_hash: str) -> bool:
     """
-    Помечает refresh token как использованный и возвращает user_id.
+    Записывает перехэшированный пароль. False — хэш в БД уже не old_hash (пароль сменили), ничего не записано.
     """
     pool = await get_pool()
-    user_id = await pool.fetchval(
-        "SELECT auth.consume_refresh_token($1)",
-        token_hash
+    return bool(await pool.fetchval(UPDATE_PASSWORD_HASH, user_id, old_hash, new_hash))
+
+async def create_refresh_tokens(conn, rows: list[tuple[str, str, datetime]]) -> None:
+    """
+    Сохраняет пачку refresh-токенов (user_id, token_hash, expires_at) одним INSERT — для app/db/refresh_token_writer.py.
+    """
+    await conn.execute(
+        CREATE_REFRESH_TOKENS,
+        [user_id for user_id, _, _ in rows],
+        [token_hash for _, token_hash, _ in rows],
+        [expires_at for _, _, expires_at in rows],
     )
+
+async def rotate_refresh_token(old_token_hash: str, new_token_hash: str, expires_at: datetime) -> str:
+    """
+    Ротация одним запросом: старый refresh помечается использованным, новый сохраняется для того же пользователя.
+    Возвращает user_id; ValueError — старый токен не найден, уже использован или истёк.
+    """
+    pool = await get_pool()
+    user_id = await pool.fetchval(ROTATE_REFRESH_TOKEN, old_token_hash, new_token_hash, expires_at)
     if not user_id:
         raise ValueError("Invalid refresh token")
     return str(user_id)
 
-async def rotate_refresh_token(user_id: str, new_token_hash: str, expires_at: str) -> None:
-    """Сохраняет новый refresh после ротации"""
-    pool = await get_pool()
-    await pool.execute(
-        "SELECT auth.create_refresh_token($1, $2, $3)",
-        user_id, new_token_hash, expires_at
-    )
-
 async def invalidate_all_refresh_tokens(user_id: str) -> None:
     """Удаляет все refresh-токены пользователя (logout с любого устройства)"""
     pool = await get_pool()
@@ -1,16 +1,36 @@
-from asyncpg import create_pool, Pool
 from app.core.config import settings
+from app.db.codecs import register_json_codecs
+from common.db_pool import InstrumentedPool, create_instrumented_pool
+from app.db.queries import HOT_STATEMENTS
+from common.metrics import observe_query
 
-_pool: Pool | None = None
+_pool: InstrumentedPool | None = None
 
-async def get_pool() -> Pool:
+async def get_pool() -> InstrumentedPool:
+    """Пул мастера (HAProxy 5432) — единственный: auth не читает с реплик."""
     global _pool
     if _pool is None:
-        _pool = await create_pool(dsn=settings.DATABASE_URL, min_size=5, max_size=20)
+        _pool = await create_instrumented_pool(
+            settings.DATABASE_URL,
+            name="write",
+            min_size=settings.DB_WRITE_POOL_MIN_SIZE,
+            max_size=settings.DB_WRITE_POOL_MAX_SIZE,
+            acquire_timeout=settings.DB_POOL_ACQUIRE_TIMEOUT,
+            command_timeout=settings.DB_POOL_COMMAND_TIMEOUT,
+            max_inactive_connection_lifetime=settings.DB_POOL_MAX_INACTIVE_CONNECTION_LIFETIME,
+            max_queries=settings.DB_POOL_MAX_QUERIES,
+            statement_cache_size=settings.DB_POOL_STATEMENT_CACHE_SIZE,
+            register_codecs=register_json_codecs,
+            hot_statements=HOT_STATEMENTS,
+            query_logger=observe_query,
+        )
     return _pool
 
 async def close_pool() -> None:
     global _pool
     if _pool:
         await _pool.close()
-        _pool = None
\ No newline at end of file
+        _pool = None
+
+def pools_stats() -> list[dict]:
+    return [_pool.stats()] if _pool is not None else []
@@ -0,0 +1,18 @@
+# Горячие запросы auth.* / accounts.*: используются в app/db/functions.py
+# кодеки их типов загружаются на каждом новом соединении пула (app/db/pool.py).
+# Все идут в пул мастера: чтение учётных данных с отстающей реплики не видит только что
+# зарегистрированного пользователя и принимает старый пароль после смены.
+
+GET_ACTIVE_USER_CONTACT_BY_VALUE = "SELECT * FROM accounts.get_active_user_contact_by_value($1)"
+CREATE_REFRESH_TOKEN = "SELECT auth.create_refresh_token($1, $2, $3)"
+ROTATE_REFRESH_TOKEN = "SELECT auth.rotate_refresh_token($1, $2, $3)"
+CREATE_REFRESH_TOKENS = "SELECT auth.create_refresh_tokens($1::uuid[], $2::text[], $3::timestamptz[])"
+UPDATE_PASSWORD_HASH = "SELECT auth.update_password_hash($1, $2, $3)"
+
+HOT_STATEMENTS = (
+    GET_ACTIVE_USER_CONTACT_BY_VALUE,
+    CREATE_REFRESH_TOKEN,
+    ROTATE_REFRESH_TOKEN,
+    CREATE_REFRESH_TOKENS,
+    UPDATE_PASSWORD_HASH,
+)
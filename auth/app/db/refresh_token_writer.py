@@ -0,0 +1,79 @@
+"""
+Запись refresh-токенов при логине пачками (REFRESH_TOKEN_BATCH_ENABLED) на общем MicroBatchWriter.
+
+Конкурентные логины ставят свой токен в очередь; пачка (до max_size штук или linger_ms) пишется одним
+auth.create_refresh_tokens: один round trip и один коммит (WAL flush) на пачку вместо одного на логин.
+Логин отвечает после коммита своей пачки — токен, выданный клиенту, уже в БД.
+Регистрация сюда не ходит: её refresh сохраняется в транзакции создания пользователя.
+"""
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from asyncpg import Pool, PostgresError
+from loguru import logger
+
+from app.core.metrics import REFRESH_TOKEN_BATCH_SIZE
+from app.db.functions import create_refresh_token, create_refresh_tokens
+from common.batch_writer import BatchEntry, MicroBatchWriter
+
+# (user_id, token_hash, expires_at)
+BatchItem = Tuple[str, str, datetime]
+
+
+class RefreshTokenBatchWriter(MicroBatchWriter[BatchItem]):
+    """
+    Пачка refresh-токенов (common/batch_writer.py) пишется одним auth.create_refresh_tokens.
+    Ошибка пачки (например, пользователя удалили между поиском и вставкой) не валит соседей:
+    пачка повторяется по одному токену, и ошибку получает только свой логин.
+    """
+
+    def __init__(self, pool: Pool, max_size: int, linger_ms: float, max_in_flight: int):
+        super().__init__(max_size, linger_ms, max_in_flight)
+        self.pool = pool
+
+    async def write(self, batch: List[BatchEntry[BatchItem]]) -> None:
+        REFRESH_TOKEN_BATCH_SIZE.observe(len(batch))
+        try:
+            async with self.pool.acquire() as conn:
+                await create_refresh_tokens(conn, [item for item, _ in batch])
+        except PostgresError as e:
+            logger.warning(f"Refresh token batch of {len(batch)} failed, retrying one by one: {e}")
+            await self._write_one_by_one(batch)
+            return
+
+        for _, future in batch:
+            if not future.done():  # клиент уже отвалился
+                future.set_result(None)
+
+    @staticmethod
+    async def _write_one_by_one(batch: List[BatchEntry[BatchItem]]) -> None:
+        for (user_id, token_hash, expires_at), future in batch:
+            try:
+                await create_refresh_token(user_id, token_hash, expires_at.isoformat())
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(None)
+
+
+batch_writer: Optional[RefreshTokenBatchWriter] = None
+
+def start_refresh_token_writer(pool: Pool, max_size: int, linger_ms: float, max_in_flight: int) -> None:
+    global batch_writer
+    batch_writer = RefreshTokenBatchWriter(pool, max_size, linger_ms, max_in_flight)
+    batch_writer.start()
+
+async def stop_refresh_token_writer() -> None:
+    global batch_writer
+    if batch_writer:
+        await batch_writer.stop()
+        batch_writer = None
+
+async def save_refresh_token(user_id: str, token_hash: str, expires_at: datetime) -> None:
+    """Сохранение refresh при логине: через пачку, если writer запущен, иначе — отдельным вызовом."""
+    if batch_writer:
+        await batch_writer.submit((user_id, token_hash, expires_at))
+        return
+    await create_refresh_token(user_id, token_hash, expires_at.isoformat())
@@ -35,4 +35,8 @@ class PasswordRequiredError(BaseAPIException):
 
 class RegistrationFailedError(BaseAPIException):
     def __init__(self, detail: str = "Registration failed due to internal error"):
-        super().__init__(detail=detail, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        super().__init__(detail=detail, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class PasswordHashingOverloadedError(BaseAPIException):
+    def __init__(self, detail: str = "Too many concurrent password checks, retry later"):
+        super().__init__(detail=detail, status_code=status.HTTP_503_SERVICE_UNAVAILABLE, headers={"Retry-After": "1"})
\ No newline at end of file
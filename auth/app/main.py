@@ -1,12 +1,29 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from contextlib import asynccontextmanager
+from fastapi.exception_handlers import http_exception_handler
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 
-from app.middleware.request_id import RequestIDMiddleware
-from app.middleware.logging import LoggingMiddleware
+from app.core.config import settings
+from common.middleware.request_context import RequestContextMiddleware, init_access_log, close_access_log
+from common.middleware.metrics import MetricsMiddleware
+from common.metrics import (
+    observe_request,
+    preallocate,
+    register_pool_collector,
+    register_token_verifier_collector,
+    render_metrics,
+)
+from app.api.v1.deps import init_token_verifier, close_token_verifier, token_verifier_stats
 from app.api.v1.routes import router as auth_router
-from app.db.pool import close_pool
-from app.redis.client import close_redis_client
+from app.db.pool import get_pool, close_pool, pools_stats
+from app.db.queries import HOT_STATEMENTS
+from app.db.refresh_token_writer import start_refresh_token_writer, stop_refresh_token_writer
+from app.redis.client import get_redis_client, close_redis_client
+from app.services.auth_service import wait_password_upgrades
+from app.utils.password_executor import init_password_executor, close_password_executor
+from app.utils.jwt_keys import jwks_response, load_signing_keys
+from app.utils.security import tune_password_hashing
 from app.exceptions.auth import (
     InvalidCredentialsError,
     TokenExpiredError,
@@ -23,22 +40,47 @@ from app.exceptions.base import BaseAPIException
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    init_access_log()
+    # Ключи подписи — до пулов: ошибка в ключах валит старт, а не первый логин
+    load_signing_keys()
+    # Пулы создаём на старте: соединения с загруженными кодеками готовы к первому логину
+    await get_pool()
+    preallocate(app.routes, HOT_STATEMENTS)
+    # Стоимость хэша — до первого логина: замер не конкурирует с запросами за CPU
+    tune_password_hashing()
+    init_password_executor()
+    init_token_verifier(await get_redis_client())
+    if settings.REFRESH_TOKEN_BATCH_ENABLED:
+        start_refresh_token_writer(
+            await get_pool(),
+            settings.REFRESH_TOKEN_BATCH_MAX_SIZE,
+            settings.REFRESH_TOKEN_BATCH_LINGER_MS,
+            settings.REFRESH_TOKEN_BATCH_MAX_IN_FLIGHT,
+        )
     yield
+    await close_token_verifier()
+    # Дописать пачку refresh-токенов, пока пул БД ещё открыт
+    await stop_refresh_token_writer()
+    await wait_password_upgrades()
+    close_password_executor()
     await close_redis_client()
     await close_pool()
+    close_access_log()
 
 app = FastAPI(
     title="Auth Service",
     lifespan=lifespan
 )
+register_pool_collector(pools_stats)
+register_token_verifier_collector(token_verifier_stats)
 
 # ← Добавить обработчики
 @app.exception_handler(BaseAPIException)
 async def base_api_exception_handler(request, exc: BaseAPIException):
-    return exc  # BaseAPIException наследуется от HTTPException → FastAPI сам сериализует
+    # Обработчик должен вернуть Response: detail, status_code и headers (Retry-After) — как у HTTPException
+    return await http_exception_handler(request, exc)
 
-app.add_middleware(RequestIDMiddleware)
-app.add_middleware(LoggingMiddleware)
+app.add_middleware(RequestContextMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],
@@ -46,10 +88,33 @@ app.add_middleware(
     allow_methods=["POST"],
     allow_headers=["Authorization", "Content-Type"],
 )
+# Последним — самый внешний: в длительность входят остальные middleware
+app.add_middleware(MetricsMiddleware, observe=observe_request)
 
 app.include_router(auth_router, prefix="/api/v1/auth")
 
 
+@app.get("/pools/stats", tags=["Service"], summary="asyncpg pool usage: size, in-use, waiting, acquire wait")
+async def get_pools_stats():
+    return pools_stats()
+
+
+@app.get("/.well-known/jwks.json", tags=["Service"], summary="Public keys for access token verification (RS256 / EdDSA)")
+async def get_jwks(request: Request):
+    # Тело и ETag собраны при загрузке ключей; клиенты кэшируют на max-age и перепроверяют через If-None-Match
+    body, etag = jwks_response()
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={settings.JWKS_CACHE_MAX_AGE_SECONDS}"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8001, reload=True)
@@ -1,14 +1,25 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
 
+from loguru import logger
+
+from app.core.config import settings
+from app.core.metrics import PASSWORD_HASH_UPGRADES
+from app.exceptions.auth import PasswordHashingOverloadedError
 from app.redis.client import get_redis_client
-from app.db.functions import get_active_user_contact_by_value, create_refresh_token
+from app.db.functions import get_active_user_contact_by_value, update_password_hash
+from app.db.refresh_token_writer import save_refresh_token
+from app.utils.password_executor import rehash_password_async, verify_password_async
 from app.utils.security import (
-    verify_password,
     create_access_token,
     create_refresh_token as gen_refresh,
     normalize_login,
+    password_needs_update,
 )
 
+# Фоновые перехэширования: ссылки держим, иначе задачу может собрать GC
+_password_upgrades: set[asyncio.Task] = set()
+
 async def authenticate_user(login: str, password: str | None = None) -> dict | None:
     normalized = normalize_login(login)
     contact = await get_active_user_contact_by_value(normalized)
@@ -21,16 +32,21 @@ async def authenticate_user(login: str, password: str | None = None) -> dict | N
     # Если пароль не требуется (например, для phone) — пропускаем проверку
     # Но в текущей логике: пароль нужен для second_login/email
     if password is not None:
-        if not password_hash or not verify_password(password, password_hash):
+        if not password_hash or not await verify_password_async(password, password_hash):
             return None
+        # bcrypt или слабая стоимость → новый хэш в фоне, ответ логина его не ждёт
+        if settings.PASSWORD_REHASH_ON_LOGIN and password_needs_update(password_hash):
+            task = asyncio.create_task(_upgrade_password_hash(user_id, password_hash, password))
+            _password_upgrades.add(task)
+            task.add_done_callback(_password_upgrades.discard)
     # Если password is None → предполагаем passwordless (реализуется отдельно)
 
     # Генерация токенов
     access_token = create_access_token(user_id)
     refresh_token, refresh_hash = gen_refresh()
 
-    expires_at = datetime.now(timezone.utc) + timedelta(days=30)
-    await create_refresh_token(user_id, refresh_hash, expires_at.isoformat())
+    expires_at = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    await save_refresh_token(user_id, refresh_hash, expires_at)
 
     return {
         "user_id": user_id,
@@ -38,6 +54,24 @@ async def authenticate_user(login: str, password: str | None = None) -> dict | N
         "refresh_token": refresh_token,
     }
 
+async def _upgrade_password_hash(user_id: str, old_hash: str, password: str) -> None:
+    """Ошибки не доходят до клиента: не получилось — перехэшируем при следующем логине."""
+    try:
+        new_hash = await rehash_password_async(password)
+        updated = await update_password_hash(user_id, old_hash, new_hash)
+    except PasswordHashingOverloadedError:
+        PASSWORD_HASH_UPGRADES.labels("skipped").inc()
+    except Exception as e:
+        PASSWORD_HASH_UPGRADES.labels("failed").inc()
+        logger.error(f"Password hash upgrade failed for user {user_id}: {e}")
+    else:
+        PASSWORD_HASH_UPGRADES.labels("upgraded" if updated else "conflict").inc()
+
+async def wait_password_upgrades() -> None:
+    """На остановке: дописать начатые перехэширования, пока пул БД ещё открыт."""
+    if _password_upgrades:
+        await asyncio.gather(*_password_upgrades, return_exceptions=True)
+
 async def revoke_token(jti: str, expire: int):
     redis = await get_redis_client()
     await redis.setex(f"revoked:{jti}", expire, "1")
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""
+Ключи подписи access-токенов.
+
+- HS256 — общий секрет JWT_SECRET_KEY, как раньше: проверить токен может только тот, у кого есть секрет.
+- RS256 / EdDSA — приватный ключ JWT_PRIVATE_KEY_PATH (PEM) есть только у auth. kid — RFC 7638 thumbprint
+  публичного ключа (не настраивается и одинаков на всех подах). Публичные ключи — текущий и
+  JWT_ADDITIONAL_PUBLIC_KEY_PATHS (предыдущий / следующий при ротации) — отдаются в /.well-known/jwks.json,
+  сервисы проверяют токены по ним сами (common/token_verifier.py: JWKSKeys).
+
+JWKS собирается один раз при загрузке ключей: ответ — готовые байты с ETag.
+"""
+import base64
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey, RSAPublicKey
+from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key
+
+from app.core.config import settings
+
+ASYMMETRIC_ALGORITHMS = ("RS256", "EdDSA")
+# Члены JWK, входящие в thumbprint (RFC 7638, 3.2)
+THUMBPRINT_MEMBERS = {"RSA": ("e", "kty", "n"), "OKP": ("crv", "kty", "x")}
+
+_signing_key: Any = None
+_signing_headers: Dict[str, str] = {}
+_verification_keys: Dict[Optional[str], Any] = {}
+_jwks: Dict[str, List[dict]] = {"keys": []}
+_jwks_body = b""
+_jwks_etag = ""
+
+
+def _public_jwk(public_key) -> dict:
+    if isinstance(public_key, RSAPublicKey):
+        jwk, alg = RSAAlgorithm.to_jwk(public_key, as_dict=True), "RS256"
+    elif isinstance(public_key, Ed25519PublicKey):
+        jwk, alg = OKPAlgorithm.to_jwk(public_key, as_dict=True), "EdDSA"
+    else:
+        raise ValueError(f"Unsupported JWT public key type: {type(public_key).__name__}, expected RSA or Ed25519")
+    thumbprint_input = {name: jwk[name] for name in THUMBPRINT_MEMBERS[jwk["kty"]]}
+    digest = hashlib.sha256(json.dumps(thumbprint_input, sort_keys=True, separators=(",", ":")).encode()).digest()
+    kid = base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+    return {**jwk, "kid": kid, "use": "sig", "alg": alg}
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def load_signing_keys() -> None:
+    """Читает ключи из настроек (один раз; вызывается в lifespan, чтобы ошибка в ключах валила старт)."""
+    global _signing_key, _signing_headers, _verification_keys, _jwks, _jwks_body, _jwks_etag
+    if _signing_key is not None:
+        return
+
+    algorithm = settings.JWT_ALGORITHM
+    if algorithm == "HS256":
+        if not settings.JWT_SECRET_KEY:
+            raise RuntimeError("JWT_SECRET_KEY is required for HS256")
+        signing_key, headers = settings.JWT_SECRET_KEY, {}
+        verification_keys = {None: settings.JWT_SECRET_KEY}
+        jwks: Dict[str, List[dict]] = {"keys": []}  # общий секрет не публикуется
+    elif algorithm in ASYMMETRIC_ALGORITHMS:
+        if not settings.JWT_PRIVATE_KEY_PATH:
+            raise RuntimeError(f"JWT_PRIVATE_KEY_PATH is required for {algorithm}")
+        signing_key = load_pem_private_key(_read(settings.JWT_PRIVATE_KEY_PATH), password=None)
+        expected = RSAPrivateKey if algorithm == "RS256" else Ed25519PrivateKey
+        if not isinstance(signing_key, expected):
+            raise RuntimeError(f"JWT_PRIVATE_KEY_PATH does not hold a key for {algorithm}")
+        public_keys = [signing_key.public_key()]
+        public_keys += [load_pem_public_key(_read(path)) for path in settings.JWT_ADDITIONAL_PUBLIC_KEY_PATHS]
+        jwks = {"keys": [_public_jwk(key) for key in public_keys]}
+        headers = {"kid": jwks["keys"][0]["kid"]}
+        verification_keys = {jwk["kid"]: key for jwk, key in zip(jwks["keys"], public_keys)}
+    else:
+        raise RuntimeError(f"Unsupported JWT_ALGORITHM {algorithm}, expected HS256, RS256 or EdDSA")
+
+    _signing_key, _signing_headers, _verification_keys, _jwks = signing_key, headers, verification_keys, jwks
+    _jwks_body = json.dumps(jwks, separators=(",", ":")).encode()
+    _jwks_etag = f'"{hashlib.sha256(_jwks_body).hexdigest()[:32]}"'
+
+
+def signing_key() -> Tuple[Any, Dict[str, str]]:
+    """(ключ для jwt.encode, заголовки токена — kid для RS256/EdDSA)."""
+    load_signing_keys()
+    return _signing_key, _signing_headers
+
+def verification_key(kid: Optional[str]) -> Any:
+    """Ключ проверки токена с этим kid; None — неизвестный kid (токен чужой или ключ уже выведен)."""
+    load_signing_keys()
+    if settings.JWT_ALGORITHM == "HS256":
+        return _verification_keys[None]
+    return _verification_keys.get(kid)
+
+def public_jwks() -> Dict[str, List[dict]]:
+    load_signing_keys()
+    return _jwks
+
+def jwks_response() -> Tuple[bytes, str]:
+    """(тело /.well-known/jwks.json, ETag)."""
+    load_signing_keys()
+    return _jwks_body, _jwks_etag
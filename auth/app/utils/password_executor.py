@@ -0,0 +1,82 @@
+"""
+Хэширование и проверка паролей вне event loop: bcrypt/argon2 — 100–300 мс CPU на вызов, на loop он
+останавливал все запросы воркера (и /refresh, которому пароль не нужен).
+
+Пул потоков фиксированного размера (PASSWORD_HASH_WORKERS): bcrypt и argon2 отпускают GIL на время
+хэширования, поэтому потоки параллельны по ядрам, а пересылать между процессами ничего не нужно.
+Допуск: больше PASSWORD_HASH_MAX_PENDING задач (в очереди + в работе) — сразу 503 с Retry-After,
+а не минутное ожидание в очереди, после которого клиент всё равно уйдёт по таймауту.
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
+
+from app.core.config import settings
+from app.core.metrics import PASSWORD_HASH_COMPUTE, PASSWORD_HASH_IN_FLIGHT, PASSWORD_HASH_QUEUE_WAIT, PASSWORD_HASH_REJECTED
+from app.exceptions.auth import PasswordHashingOverloadedError
+from app.utils.security import hash_password, verify_password
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_in_flight = 0
+
+
+def init_password_executor() -> None:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1,
+            thread_name_prefix="password-hash",
+        )
+
+def close_password_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+def _timed(func: Callable[..., T], *args) -> Tuple[float, float, T]:
+    started = time.perf_counter()
+    result = func(*args)
+    return started, time.perf_counter(), result
+
+async def _run(operation: str, func: Callable[..., T], *args) -> T:
+    global _in_flight
+    if _in_flight >= settings.PASSWORD_HASH_MAX_PENDING:
+        PASSWORD_HASH_REJECTED.labels(operation).inc()
+        raise PasswordHashingOverloadedError()
+    if _executor is None:
+        init_password_executor()
+
+    _in_flight += 1
+    PASSWORD_HASH_IN_FLIGHT.inc()
+    loop = asyncio.get_running_loop()
+    submitted = time.perf_counter()
+    job = _executor.submit(_timed, func, *args)
+    # Место освобождается, когда задача действительно закончилась в потоке, а не когда
+    # клиент перестал ждать (отменённый запрос не отменяет уже начатый bcrypt)
+    job.add_done_callback(lambda _: loop.call_soon_threadsafe(_release))
+    started, finished, result = await asyncio.wrap_future(job)
+    PASSWORD_HASH_QUEUE_WAIT.labels(operation).observe(started - submitted)
+    PASSWORD_HASH_COMPUTE.labels(operation).observe(finished - started)
+    return result
+
+def _release() -> None:
+    global _in_flight
+    _in_flight -= 1
+    PASSWORD_HASH_IN_FLIGHT.dec()
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run("verify", verify_password, plain_password, hashed_password)
+
+async def hash_password_async(password: str) -> str:
+    return await _run("hash", hash_password, password)
+
+async def rehash_password_async(password: str) -> str:
+    """Перехэширование после логина: отдельная метка operation, чтобы видеть цену миграции хэшей."""
+    return await _run("rehash", hash_password, password)
@@ -1,11 +1,37 @@
 import hashlib
+import math
 import secrets
+import time
 from datetime import datetime, timedelta, timezone
 import jwt
+from loguru import logger
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.metrics import PASSWORD_HASH_COST
+from app.utils.jwt_keys import signing_key, verification_key
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Нижние границы стоимости: ниже не опускаемся, даже если хэш не укладывается в бюджет
+ARGON2_MIN_TIME_COST = 2
+ARGON2_MAX_TIME_COST = 10
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 16
+TUNING_SAMPLES = 3
+TUNING_PASSWORD = "password-hash-cost-tuning"
+
+# Первая схема — для новых хэшей, остальные только проверяются (deprecated="auto" → needs_update).
+# min_rounds = текущая стоимость: needs_update срабатывает только на более слабых хэшах,
+# хэш, сделанный подом с большей стоимостью, не понижается
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"] if settings.PASSWORD_HASH_SCHEME == "argon2" else ["bcrypt", "argon2"],
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__memory_cost=settings.PASSWORD_ARGON2_MEMORY_KIB,
+    argon2__parallelism=settings.PASSWORD_ARGON2_PARALLELISM,
+    argon2__default_rounds=settings.PASSWORD_ARGON2_TIME_COST or ARGON2_MIN_TIME_COST,
+    argon2__min_rounds=settings.PASSWORD_ARGON2_TIME_COST or ARGON2_MIN_TIME_COST,
+    bcrypt__default_rounds=settings.PASSWORD_BCRYPT_ROUNDS or BCRYPT_MIN_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_BCRYPT_ROUNDS or BCRYPT_MIN_ROUNDS,
+)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -13,15 +39,60 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
+def password_needs_update(hashed_password: str) -> bool:
+    """Хэш старой схемы или слабее текущей стоимости — перехэшировать при следующем логине."""
+    return pwd_context.needs_update(hashed_password)
+
+def _hash_seconds(scheme: str, rounds: int) -> float:
+    handler = pwd_context.handler(scheme).using(rounds=rounds)
+    samples = []
+    for _ in range(TUNING_SAMPLES):
+        started = time.perf_counter()
+        handler.hash(TUNING_PASSWORD)
+        samples.append(time.perf_counter() - started)
+    return min(samples)  # минимум: соседние процессы на старте тоже грузят CPU
+
+def tune_password_hashing() -> int:
+    """
+    Стоимость схемы PASSWORD_HASH_SCHEME под PASSWORD_HASH_BUDGET_MS на один хэш (если не задана вручную):
+    время замеряется на нижней границе и экстраполируется — у argon2 оно линейно по time_cost,
+    у bcrypt удваивается на каждый раунд. Вызывается один раз на старте, до приёма запросов.
+    """
+    scheme = settings.PASSWORD_HASH_SCHEME
+    budget = settings.PASSWORD_HASH_BUDGET_MS / 1000
+    if scheme == "argon2":
+        rounds = settings.PASSWORD_ARGON2_TIME_COST
+        if rounds is None:
+            per_pass = _hash_seconds(scheme, 1)
+            rounds = min(max(math.floor(budget / per_pass), ARGON2_MIN_TIME_COST), ARGON2_MAX_TIME_COST)
+    else:
+        rounds = settings.PASSWORD_BCRYPT_ROUNDS
+        if rounds is None:
+            base = _hash_seconds(scheme, BCRYPT_MIN_ROUNDS)
+            extra = math.floor(math.log2(budget / base)) if budget > base else 0
+            rounds = min(BCRYPT_MIN_ROUNDS + extra, BCRYPT_MAX_ROUNDS)
+
+    pwd_context.update(**{f"{scheme}__default_rounds": rounds, f"{scheme}__min_rounds": rounds})
+    PASSWORD_HASH_COST.labels(scheme).set(rounds)
+    took = _hash_seconds(scheme, rounds)
+    log = logger.warning if took > budget else logger.info
+    log(
+        f"Password hashing: {scheme} cost {rounds}, {took * 1000:.0f} ms per hash "
+        f"(budget {settings.PASSWORD_HASH_BUDGET_MS:.0f} ms)"
+    )
+    return rounds
+
 def create_access_token(user_id: str) -> str:
     jti = secrets.token_urlsafe(16)
     expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode = {
         "sub": user_id,
         "exp": expire,
-        "jti": jti  # опционально, если нужен ID токена
+        "jti": jti,  # опционально, если нужен ID токена
+        "type": "access",
     }
-    return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    key, headers = signing_key()
+    return jwt.encode(to_encode, key, algorithm=settings.JWT_ALGORITHM, headers=headers or None)
 
 def create_refresh_token() -> tuple[str, str]:
     """Возвращает (token, token_hash)"""
@@ -31,7 +102,10 @@ def create_refresh_token() -> tuple[str, str]:
 
 def decode_access_token(token: str):
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+        key = verification_key(jwt.get_unverified_header(token).get("kid"))
+        if key is None:
+            return None
+        payload = jwt.decode(token, key, algorithms=[settings.JWT_ALGORITHM])
         return payload
     except jwt.PyJWTError:
         return None
@@ -0,0 +1,107 @@
+"""
+/login: хэш пароля на event loop (как было) vs пул потоков app/utils/password_executor.py.
+
+Запуск (из auth/, нужен .env с настройками сервиса; БД и Redis не нужны):
+    python -m benchmarks.bench_login_hashing                       # 64 логина, схема и стоимость из настроек
+    python -m benchmarks.bench_login_hashing --scheme bcrypt --rounds 12
+    python -m benchmarks.bench_login_hashing --scheme argon2 --rounds 3 --logins 200 --concurrency 50
+
+Логин смоделирован как в authenticate_user: поиск контакта (--db-ms), проверка пароля,
+запись refresh-токена (--db-ms). Параллельно каждые 10 мс идёт «/refresh» без пароля —
+его задержка показывает, насколько event loop занят хэшированием.
+Пропускная способность на ядро — логинов/с, делённые на min(ядер, PASSWORD_HASH_WORKERS).
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+from loguru import logger
+
+from app.core.config import settings
+from app.utils import password_executor
+from app.utils.security import pwd_context, tune_password_hashing, verify_password
+
+PASSWORD = "correct horse battery staple"
+REFRESH_INTERVAL = 0.01
+
+
+async def _login(password_hash: str, offloaded: bool, db_seconds: float) -> None:
+    await asyncio.sleep(db_seconds)
+    if offloaded:
+        ok = await password_executor.verify_password_async(PASSWORD, password_hash)
+    else:
+        ok = verify_password(PASSWORD, password_hash)
+    assert ok
+    await asyncio.sleep(db_seconds)
+
+async def _refresh_probe(stop: asyncio.Event, latencies: List[float]) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + REFRESH_INTERVAL
+        await asyncio.sleep(REFRESH_INTERVAL)
+        latencies.append(max(0.0, loop.time() - expected))
+
+async def bench(offloaded: bool, args, password_hash: str) -> None:
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one() -> None:
+        async with semaphore:
+            await _login(password_hash, offloaded, args.db_ms / 1000)
+
+    stop = asyncio.Event()
+    refresh_latencies: List[float] = []
+    probe = asyncio.create_task(_refresh_probe(stop, refresh_latencies))
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(args.logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+
+    cores = min(os.cpu_count() or 1, settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1) if offloaded else 1
+    refresh_latencies.sort()
+    label = f"executor ({password_executor._executor._max_workers} threads)" if offloaded else "inline (event loop)"
+    logger.bind(bench=True).info(
+        f"{label}: {args.logins / elapsed:.1f} logins/s, {args.logins / elapsed / cores:.1f} per core; "
+        f"/refresh delay p50 {statistics.median(refresh_latencies) * 1000:.0f} ms, "
+        f"max {refresh_latencies[-1] * 1000:.0f} ms"
+    )
+
+
+async def main(args) -> None:
+    settings.PASSWORD_HASH_SCHEME = args.scheme
+    # Без --rounds — стоимость, которую сервис подобрал бы на старте под PASSWORD_HASH_BUDGET_MS
+    rounds = args.rounds or tune_password_hashing()
+    password_hash = pwd_context.handler(args.scheme).using(rounds=rounds).hash(PASSWORD)
+    logger.bind(bench=True).info(f"{args.scheme} cost {rounds}, {os.cpu_count()} CPU, {args.logins} logins")
+    await bench(False, args, password_hash)
+    password_executor.init_password_executor()
+    try:
+        await bench(True, args, password_hash)
+    finally:
+        password_executor.close_password_executor()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=32, help="одновременных логинов")
+    parser.add_argument("--scheme", choices=("argon2", "bcrypt"), default=settings.PASSWORD_HASH_SCHEME)
+    parser.add_argument("--rounds", type=int, help="time_cost argon2 / rounds bcrypt; по умолчанию — подбор")
+    parser.add_argument("--db-ms", type=float, default=2.0, help="задержка каждого из двух запросов к БД")
+    args = parser.parse_args()
+
+    # Очередь не должна отвечать 503 во время замера
+    settings.PASSWORD_HASH_MAX_PENDING = max(settings.PASSWORD_HASH_MAX_PENDING, args.concurrency)
+
+    logger.remove()
+    logger.add(
+        sink=sys.stderr,
+        level="INFO",
+        format="<green>{time:HH:mm:ss}</green> | <level>{message}</level>",
+        filter=lambda record: "bench" in record["extra"],
+    )
+    asyncio.run(main(args))
@@ -0,0 +1,137 @@
+"""
+/refresh и запись refresh-токенов при логине, только БД (без HTTP и Redis):
+- ротация: пометка старого токена + auth.create_refresh_token (как было до auth.rotate_refresh_token:
+  два round trip и два коммита) vs auth.rotate_refresh_token (один запрос);
+- логин: auth.create_refresh_token на каждый токен vs RefreshTokenBatchWriter (auth.create_refresh_tokens пачкой).
+
+Запуск (из auth/, нужна БД с функциями auth.*):
+    python -m benchmarks.bench_refresh --count 5000 --concurrency 200
+
+Выводит refreshes/sec (логинов/с) и commits/sec (по pg_stat_database.xact_commit).
+Внимание: пишет синтетические строки в auth.refresh_tokens (user_id случайный), в конце удаляет их.
+"""
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from loguru import logger
+
+from app.core.config import settings
+from app.db.functions import (
+    create_refresh_token,
+    create_refresh_tokens,
+    invalidate_all_refresh_tokens,
+    rotate_refresh_token,
+)
+from app.db.pool import close_pool, get_pool
+from app.db.refresh_token_writer import RefreshTokenBatchWriter
+from app.utils.security import create_refresh_token as gen_refresh_token
+
+
+# Прежний /refresh (auth.consume_refresh_token удалена): пометка токена отдельным запросом
+CONSUME_REFRESH_TOKEN = """
+    UPDATE auth.refresh_tokens SET revoked = true
+    WHERE token_hash = $1 AND NOT revoked AND expires_at > NOW()
+    RETURNING user_id
+"""
+
+
+def expires_at() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+
+
+async def xact_commits(pool) -> int:
+    return await pool.fetchval(
+        "SELECT xact_commit FROM pg_stat_database WHERE datname = current_database()"
+    )
+
+
+async def seed(pool, user_id: str, count: int) -> list[str]:
+    """count действующих refresh-токенов (хэши) — по одному на каждый /refresh."""
+    hashes = [gen_refresh_token()[1] for _ in range(count)]
+    async with pool.acquire() as conn:
+        await create_refresh_tokens(conn, [(user_id, token_hash, expires_at()) for token_hash in hashes])
+    return hashes
+
+
+async def run(label: str, pool, count: int, concurrency: int, one) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(i: int):
+        async with semaphore:
+            await one(i)
+
+    commits_before = await xact_commits(pool)
+    start = time.perf_counter()
+    await asyncio.gather(*(limited(i) for i in range(count)))
+    elapsed = time.perf_counter() - start
+    commits = await xact_commits(pool) - commits_before
+    logger.info(
+        f"{label}: {count / elapsed:,.0f}/s, "
+        f"{commits / elapsed:,.0f} commits/s ({commits} commits, {elapsed:.2f}s)"
+    )
+
+
+async def bench(args) -> None:
+    pool = await get_pool()
+    user_id = str(uuid.uuid4())
+    try:
+        hashes = await seed(pool, user_id, args.count)
+
+        async def consume_then_create(i: int):
+            owner = await pool.fetchval(CONSUME_REFRESH_TOKEN, hashes[i])
+            await create_refresh_token(str(owner), gen_refresh_token()[1], expires_at().isoformat())
+
+        await run("refresh: consume + create", pool, args.count, args.concurrency, consume_then_create)
+
+        hashes = await seed(pool, user_id, args.count)
+
+        async def rotate(i: int):
+            await rotate_refresh_token(hashes[i], gen_refresh_token()[1], expires_at())
+
+        await run("refresh: rotate_refresh_token", pool, args.count, args.concurrency, rotate)
+
+        async def login_single(i: int):
+            await create_refresh_token(user_id, gen_refresh_token()[1], expires_at().isoformat())
+
+        await run("login: create_refresh_token", pool, args.count, args.concurrency, login_single)
+
+        writer = RefreshTokenBatchWriter(pool, args.batch_size, args.linger_ms, args.in_flight)
+        writer.start()
+
+        async def login_batched(i: int):
+            await writer.submit((user_id, gen_refresh_token()[1], expires_at()))
+
+        try:
+            await run(
+                f"login: batched (size={args.batch_size}, linger={args.linger_ms}ms, in_flight={args.in_flight})",
+                pool, args.count, args.concurrency, login_batched,
+            )
+        finally:
+            await writer.stop()
+    finally:
+        await invalidate_all_refresh_tokens(user_id)
+        await close_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=settings.REFRESH_TOKEN_BATCH_MAX_SIZE)
+    parser.add_argument("--linger-ms", type=float, default=settings.REFRESH_TOKEN_BATCH_LINGER_MS)
+    parser.add_argument("--in-flight", type=int, default=settings.REFRESH_TOKEN_BATCH_MAX_IN_FLIGHT)
+    args = parser.parse_args()
+
+    # Минимальная настройка логгера (без файлов — только в консоль)
+    logger.remove()
+    logger.add(
+        sink=sys.stderr,
+        level="INFO",
+        format="<green>{time:HH:mm:ss}</green> | <level>{message}</level>"
+    )
+
+    asyncio.run(bench(args))
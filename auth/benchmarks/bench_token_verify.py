@@ -0,0 +1,105 @@
+"""
+Авторизация запроса: jwt.decode + EXISTS blacklist:access:{jti} в Redis (как было) vs
+AccessTokenVerifier (common/token_verifier.py) — claims из памяти, отзывы из локальной копии стрима.
+
+Запуск (из auth/, нужен Redis из REDIS_URL; БД не нужна):
+    PYTHONPATH=.. python -m benchmarks.bench_token_verify                        # 20 000 запросов, 200 токенов
+    PYTHONPATH=.. python -m benchmarks.bench_token_verify --requests 100000 --tokens 1000 --concurrency 100
+
+Токены выдаются заранее и повторяются по кругу (клиент ходит с одним access-токеном до его истечения).
+Алгоритм и ключи — из настроек (JWT_ALGORITHM: HS256 / RS256 / EdDSA).
+Заодно меряется, через сколько отзыв (publish_revocation) виден второму экземпляру верификатора.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+import jwt
+from loguru import logger
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.utils.security import create_access_token
+from app.utils.jwt_keys import public_jwks, verification_key
+from common.token_verifier import BLACKLIST_KEY_PREFIX, AccessTokenVerifier, JWKSKeys, TokenRevoked, publish_revocation
+
+
+async def _legacy_verify(redis: Redis, token: str) -> dict:
+    key = verification_key(jwt.get_unverified_header(token).get("kid"))
+    claims = jwt.decode(token, key, algorithms=[settings.JWT_ALGORITHM])
+    if await redis.exists(f"{BLACKLIST_KEY_PREFIX}{claims['jti']}"):
+        raise TokenRevoked()
+    return claims
+
+def _verifier_key():
+    return settings.JWT_SECRET_KEY if settings.JWT_ALGORITHM == "HS256" else JWKSKeys(jwks=public_jwks())
+
+async def bench(label: str, verify, tokens, args) -> None:
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await verify(tokens[i % len(tokens)])
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    logger.bind(bench=True).info(
+        f"{label}: {args.requests / elapsed:.0f} req/s, p50 {statistics.median(latencies) * 1e6:.0f} µs, "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:.0f} µs"
+    )
+
+
+async def main(args) -> None:
+    redis = Redis.from_url(str(settings.REDIS_URL), decode_responses=True)
+    tokens = [create_access_token(f"bench-{i}") for i in range(args.tokens)]
+    verifier = AccessTokenVerifier(redis, key=_verifier_key(), algorithms=[settings.JWT_ALGORITHM])
+    other = AccessTokenVerifier(redis, key=_verifier_key(), algorithms=[settings.JWT_ALGORITHM])
+    verifier.start()
+    other.start()
+    try:
+        while not (verifier.fresh and other.fresh):
+            await asyncio.sleep(0.01)
+        await bench("jwt.decode + Redis EXISTS", lambda t: _legacy_verify(redis, t), tokens, args)
+        await bench("AccessTokenVerifier", verifier.verify, tokens, args)
+
+        claims = jwt.decode(tokens[0], options={"verify_signature": False})
+        started = time.perf_counter()
+        await publish_revocation(redis, claims["jti"], claims["exp"], settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+        while True:
+            try:
+                await other.verify(tokens[0])
+            except TokenRevoked:
+                break
+            await asyncio.sleep(0.001)
+        logger.bind(bench=True).info(
+            f"revocation visible to another process after {(time.perf_counter() - started) * 1000:.1f} ms; "
+            f"fallback checks {verifier.fallback_checks}"
+        )
+    finally:
+        await verifier.close()
+        await other.close()
+        await redis.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--tokens", type=int, default=200, help="разных access-токенов")
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(
+        sink=sys.stderr,
+        level="INFO",
+        format="<green>{time:HH:mm:ss}</green> | <level>{message}</level>",
+        filter=lambda record: "bench" in record["extra"],
+    )
+    asyncio.run(main(args))
@@ -0,0 +1,4 @@
+"""
+Код, общий для auth, users и webhook_2can: пул БД с метриками, middleware, проверка access-токенов.
+В образ копируется рядом с кодом сервиса (COPY common ./common), локально — PYTHONPATH=..
+"""
@@ -0,0 +1,79 @@
+"""
+Проверка access-токенов auth в сервисах за ним (users, служебные роуты webhook_2can): один
+AccessTokenVerifier на процесс — claims в памяти, отзывы из стрима Redis auth (его БД, не своя).
+Ключ — общий секрет HS256 или публичные ключи из JWKS auth (RS256 / EdDSA: секрет сервисам не нужен).
+Зависимость require_access_token подключается к роутам, только если сервису включили проверку.
+"""
+from typing import Optional
+
+import jwt
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from redis.asyncio import Redis
+
+from common.token_verifier import AccessTokenVerifier, JWKSKeys, TokenRevoked
+
+security = HTTPBearer(auto_error=False)
+
+_redis: Optional[Redis] = None
+_verifier: Optional[AccessTokenVerifier] = None
+
+
+def init_access_token_verifier(
+    redis_url: str,
+    *,
+    algorithm: str,
+    secret_key: Optional[str],
+    jwks_url: str,
+    jwks_refresh_seconds: float,
+    max_staleness_seconds: float,
+    claims_cache_size: int,
+) -> None:
+    global _redis, _verifier
+    if _verifier is None:
+        if algorithm == "HS256":
+            if not secret_key:
+                raise RuntimeError("A shared secret is required to verify HS256 access tokens")
+            key = secret_key
+        else:
+            # Ключи по kid из /.well-known/jwks.json auth: фоновое обновление и дозагрузка при ротации
+            key = JWKSKeys(jwks_url, algorithms=[algorithm], refresh_seconds=jwks_refresh_seconds)
+        _redis = Redis.from_url(redis_url)
+        _verifier = AccessTokenVerifier(
+            _redis,
+            key=key,
+            algorithms=[algorithm],
+            max_staleness_seconds=max_staleness_seconds,
+            claims_cache_size=claims_cache_size,
+        )
+        _verifier.start()
+
+async def close_access_token_verifier() -> None:
+    global _redis, _verifier
+    if _verifier is not None:
+        await _verifier.close()
+        _verifier = None
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+def access_token_verifier_stats() -> Optional[dict]:
+    return _verifier.stats() if _verifier is not None else None
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail, headers={"WWW-Authenticate": "Bearer"})
+
+async def require_access_token(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+) -> dict:
+    """Claims access-токена из заголовка Authorization: Bearer; иначе 401."""
+    if _verifier is None:
+        raise RuntimeError("Access token verifier is not initialized")
+    if credentials is None:
+        raise _unauthorized("Not authenticated")
+    try:
+        return await _verifier.verify(credentials.credentials)
+    except TokenRevoked:
+        raise _unauthorized("Token has been revoked")
+    except jwt.InvalidTokenError:
+        raise _unauthorized("Invalid token")
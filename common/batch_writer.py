@@ -0,0 +1,90 @@
+import asyncio
+from typing import Any, Generic, List, Optional, Tuple, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+# (элемент, future ответа)
+BatchEntry = Tuple[T, asyncio.Future]
+
+
+class MicroBatchWriter(Generic[T]):
+    """
+    Собирает конкурентные записи в пачку (до max_size штук или linger_ms) и отдаёт её write():
+    один round trip и один коммит (WAL flush) на пачку вместо одного на запись.
+    Одновременно пишется не больше max_in_flight пачек. Подкласс реализует write(batch)
+    и сам раздаёт результаты/ошибки в future своих элементов; необработанное исключение write()
+    получают все элементы пачки, ещё не получившие ответа.
+    """
+
+    def __init__(self, max_size: int, linger_ms: float, max_in_flight: int):
+        self.max_size = max_size
+        self.linger = linger_ms / 1000
+        self._queue: asyncio.Queue[Optional[BatchEntry[T]]] = asyncio.Queue()
+        self._full = asyncio.Event()
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._flushes: set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        # Дописываем всё, что уже в очереди, и ждём незавершённые пачки
+        self._queue.put_nowait(None)
+        self._full.set()
+        if self._task:
+            await self._task
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    async def submit(self, item: T) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item, future))
+        if self._queue.qsize() >= self.max_size - 1:
+            self._full.set()
+        return await future
+
+    async def write(self, batch: List[BatchEntry[T]]) -> None:
+        raise NotImplementedError
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            entry = await self._queue.get()
+            if entry is None:
+                break
+            batch = [entry]
+            # Ждём добора пачки не дольше linger; полная пачка будит сразу
+            if self._queue.qsize() < self.max_size - 1:
+                self._full.clear()
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.linger)
+                except asyncio.TimeoutError:
+                    pass
+            while len(batch) < self.max_size and not self._queue.empty():
+                entry = self._queue.get_nowait()
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+
+            await self._slots.acquire()
+            task = asyncio.create_task(self._flush(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: List[BatchEntry[T]]) -> None:
+        try:
+            await self.write(batch)
+        except Exception as e:
+            logger.exception(f"Unexpected error in {type(self).__name__} batch of {len(batch)}")
+            self.fail(batch, e)
+        finally:
+            self._slots.release()
+
+    @staticmethod
+    def fail(batch: List[BatchEntry[T]], exc: BaseException) -> None:
+        for _, future in batch:
+            if not future.done():  # клиент уже отвалился или ответ уже есть
+                future.set_exception(exc)
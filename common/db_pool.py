@@ -0,0 +1,143 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Optional
+
+import asyncpg
+from asyncpg import Connection, Pool, PostgresError
+from loguru import logger
+
+
+class InstrumentedPool:
+    """
+    Обёртка над asyncpg.Pool с метриками: ожидание acquire(), занятые соединения,
+    очередь ожидающих. fetch*/execute идут через собственный acquire(), остальное проксируется.
+    """
+
+    def __init__(self, pool: Pool, name: str, acquire_timeout: Optional[float]):
+        self.pool = pool
+        self.name = name
+        self.acquire_timeout = acquire_timeout
+        self.waiting = 0
+        self.acquires = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    @asynccontextmanager
+    async def acquire(self, *, timeout: Optional[float] = None) -> AsyncIterator[Connection]:
+        ctx = self.pool.acquire(timeout=timeout if timeout is not None else self.acquire_timeout)
+        start = time.perf_counter()
+        self.waiting += 1
+        try:
+            conn = await ctx.__aenter__()
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.waiting -= 1
+            waited = time.perf_counter() - start
+            self.acquires += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        try:
+            yield conn
+        except BaseException as e:
+            await ctx.__aexit__(type(e), e, e.__traceback__)
+            raise
+        else:
+            await ctx.__aexit__(None, None, None)
+
+    async def fetch(self, query: str, *args, timeout: Optional[float] = None):
+        async with self.acquire() as conn:
+            return await conn.fetch(query, *args, timeout=timeout)
+
+    async def fetchrow(self, query: str, *args, timeout: Optional[float] = None):
+        async with self.acquire() as conn:
+            return await conn.fetchrow(query, *args, timeout=timeout)
+
+    async def fetchval(self, query: str, *args, column: int = 0, timeout: Optional[float] = None):
+        async with self.acquire() as conn:
+            return await conn.fetchval(query, *args, column=column, timeout=timeout)
+
+    async def execute(self, query: str, *args, timeout: Optional[float] = None) -> str:
+        async with self.acquire() as conn:
+            return await conn.execute(query, *args, timeout=timeout)
+
+    async def executemany(self, command: str, args, *, timeout: Optional[float] = None):
+        async with self.acquire() as conn:
+            return await conn.executemany(command, args, timeout=timeout)
+
+    def __getattr__(self, name):
+        # close(), get_size(), expire_connections() и прочее — как у asyncpg.Pool
+        return getattr(self.pool, name)
+
+    def stats(self) -> dict:
+        size = self.pool.get_size()
+        return {
+            "name": self.name,
+            "size": size,
+            "max_size": self.pool.get_max_size(),
+            "in_use": size - self.pool.get_idle_size(),
+            "waiting": self.waiting,
+            "acquires": self.acquires,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+        }
+
+
+async def _load_statement_codecs(conn: Connection, name: str, statements: Iterable[str]) -> None:
+    """
+    Загружает в соединение кодеки типов горячих запросов (интроспекция pg_type — один раз на соединение)
+    и проверяет, что функции есть в БД. Сам prepared statement не сохраняется: Connection.prepare()
+    идёт мимо statement cache, план запрос получит при первом conn.fetch*(query) — это лишний
+    Parse/Describe на запрос при открытии соединения, не на каждый вызов.
+    """
+    for query in statements:
+        try:
+            await conn.prepare(query)
+        except PostgresError as e:
+            # Нет функции (миграция не накачена) — не повод ронять соединение
+            logger.warning(f"Pool {name}: cannot describe {query!r}: {e}")
+
+
+async def create_instrumented_pool(
+    dsn: str,
+    *,
+    name: str,
+    min_size: int,
+    max_size: int,
+    acquire_timeout: Optional[float],
+    command_timeout: Optional[float],
+    max_inactive_connection_lifetime: float,
+    max_queries: int,
+    statement_cache_size: int,
+    register_codecs: Callable[[Connection], Awaitable[None]],
+    hot_statements: Iterable[str] = (),
+    query_logger: Optional[Callable[[object], None]] = None,
+) -> InstrumentedPool:
+    """
+    Пул с настройками из settings сервиса. init= выполняется один раз на новое соединение:
+    кодеки json/jsonb + кодеки типов горячих запросов (_load_statement_codecs).
+    query_logger — Connection.add_query_logger (метрики длительности запросов).
+    """
+    hot_statements = tuple(hot_statements)
+
+    async def init(conn: Connection) -> None:
+        await register_codecs(conn)
+        if query_logger is not None:
+            conn.add_query_logger(query_logger)
+        await _load_statement_codecs(conn, name, hot_statements)
+
+    pool = await asyncpg.create_pool(
+        dsn,
+        min_size=min_size,
+        max_size=max_size,
+        max_queries=max_queries,
+        max_inactive_connection_lifetime=max_inactive_connection_lifetime,
+        init=init,
+        command_timeout=command_timeout,
+        statement_cache_size=statement_cache_size,
+    )
+    return InstrumentedPool(pool, name, acquire_timeout)
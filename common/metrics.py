@@ -0,0 +1,151 @@
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+
+# Общие серии auth / users / webhook_2can; свои серии сервиса — в его metrics.py.
+# Горячий путь: label-наборы создаются один раз и кэшируются по ключу
+# из объектов, которые уже есть под рукой (route.path, int status, текст запроса).
+
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+DB_FUNCTION_RE = re.compile(r"\b(accounts|auth|to_can)\.([a-z_][a-z0-9_]*)\s*\(", re.IGNORECASE)
+UNMATCHED_ROUTE = "<unmatched>"
+MAX_CACHED_QUERIES = 1000
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status",
+    ("method", "route", "status"),
+)
+DB_FUNCTION_DURATION = Histogram(
+    "db_function_duration_seconds",
+    "Duration of accounts.* / auth.* / to_can.* function calls",
+    ("function",),
+    buckets=DB_BUCKETS,
+)
+DB_FUNCTION_ERRORS = Counter(
+    "db_function_errors_total",
+    "Failed accounts.* / auth.* / to_can.* function calls",
+    ("function",),
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by cache and result",
+    ("cache", "result"),
+)
+
+_http_children: Dict[Tuple[str, str, int], object] = {}
+_query_children: Dict[str, Optional[Tuple[object, object]]] = {}
+
+
+def observe_request(method: str, route_path: Optional[str], status: int, seconds: float) -> None:
+    key = (method, route_path or UNMATCHED_ROUTE, status)
+    child = _http_children.get(key)
+    if child is None:
+        child = _http_children[key] = HTTP_REQUEST_DURATION.labels(key[0], key[1], str(status))
+    child.observe(seconds)
+
+
+def _query_metrics(query: str) -> Optional[Tuple[object, object]]:
+    match = DB_FUNCTION_RE.search(query)
+    if match is None:
+        return None
+    function = f"{match.group(1)}.{match.group(2)}".lower()
+    return DB_FUNCTION_DURATION.labels(function), DB_FUNCTION_ERRORS.labels(function)
+
+
+def observe_query(record) -> None:
+    """Connection.add_query_logger: record — asyncpg LoggedQuery."""
+    try:
+        children = _query_children[record.query]
+    except KeyError:
+        children = _query_metrics(record.query)
+        if len(_query_children) < MAX_CACHED_QUERIES:
+            _query_children[record.query] = children
+    if children is None:
+        return
+    children[0].observe(record.elapsed)
+    if record.exception is not None:
+        children[1].inc()
+
+
+def preallocate(routes: Iterable, queries: Iterable[str] = ()) -> None:
+    """Создаёт серии заранее: первый запрос не платит за labels(), а в /metrics видны нули."""
+    for route in routes:
+        for method in getattr(route, "methods", None) or ():
+            if method == "HEAD":
+                continue
+            observe_key = (method, route.path, 200)
+            if observe_key not in _http_children:
+                _http_children[observe_key] = HTTP_REQUEST_DURATION.labels(method, route.path, "200")
+    for query in queries:
+        _query_children.setdefault(query, _query_metrics(query))
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+class PoolCollector(Collector):
+    """Метрики пулов читаются из InstrumentedPool.stats() только во время scrape."""
+
+    def __init__(self, pools_stats: Callable[[], List[dict]]):
+        self.pools_stats = pools_stats
+
+    def collect(self):
+        acquires = CounterMetricFamily("db_pool_acquires", "Pool acquire() calls", labels=("pool",))
+        wait = CounterMetricFamily("db_pool_acquire_wait_seconds", "Time spent waiting in acquire()", labels=("pool",))
+        timeouts = CounterMetricFamily("db_pool_acquire_timeouts", "acquire() timeouts", labels=("pool",))
+        in_use = GaugeMetricFamily("db_pool_connections_in_use", "Connections checked out", labels=("pool",))
+        waiting = GaugeMetricFamily("db_pool_waiting", "Tasks waiting for a connection", labels=("pool",))
+        size = GaugeMetricFamily("db_pool_size", "Open connections", labels=("pool",))
+        for pool in self.pools_stats():
+            acquires.add_metric([pool["name"]], pool["acquires"])
+            wait.add_metric([pool["name"]], pool["wait_seconds_total"])
+            timeouts.add_metric([pool["name"]], pool["timeouts"])
+            in_use.add_metric([pool["name"]], pool["in_use"])
+            waiting.add_metric([pool["name"]], pool["waiting"])
+            size.add_metric([pool["name"]], pool["size"])
+        yield from (acquires, wait, timeouts, in_use, waiting, size)
+
+
+class TokenVerifierCollector(Collector):
+    """Счётчики AccessTokenVerifier.stats() — только во время scrape, verify() их лишь инкрементирует."""
+
+    def __init__(self, verifier_stats: Callable[[], Optional[dict]]):
+        self.verifier_stats = verifier_stats
+
+    def collect(self):
+        hits = CounterMetricFamily("access_token_claims_cache_hits", "Access tokens verified from the claims cache")
+        misses = CounterMetricFamily("access_token_claims_cache_misses", "Access tokens decoded (signature checked)")
+        cached = GaugeMetricFamily("access_token_claims_cached", "Decoded access tokens held in memory")
+        revoked = GaugeMetricFamily("access_token_revoked_local", "Revoked jtis held in the local copy")
+        revoked_hits = CounterMetricFamily("access_token_revoked_local_hits", "Requests rejected by the local revocation set")
+        fallbacks = CounterMetricFamily(
+            "access_token_revocation_fallback_checks", "Revocation checked in Redis: local copy was stale",
+        )
+        errors = CounterMetricFamily("access_token_revocation_sync_errors", "Failed XREADs of the revocation stream")
+        staleness = GaugeMetricFamily("access_token_revocation_staleness_seconds", "Age of the local revocation copy")
+        stats = self.verifier_stats()
+        if stats is not None:
+            hits.add_metric([], stats["claims_hits"])
+            misses.add_metric([], stats["claims_misses"])
+            cached.add_metric([], stats["claims_cached"])
+            revoked.add_metric([], stats["revoked"])
+            revoked_hits.add_metric([], stats["revoked_hits"])
+            fallbacks.add_metric([], stats["fallback_checks"])
+            errors.add_metric([], stats["sync_errors"])
+            if stats["staleness_seconds"] is not None:
+                staleness.add_metric([], stats["staleness_seconds"])
+        yield from (hits, misses, cached, revoked, revoked_hits, fallbacks, errors, staleness)
+
+
+def register_pool_collector(pools_stats: Callable[[], List[dict]]) -> None:
+    REGISTRY.register(PoolCollector(pools_stats))
+
+
+def register_token_verifier_collector(verifier_stats: Callable[[], Optional[dict]]) -> None:
+    REGISTRY.register(TokenVerifierCollector(verifier_stats))
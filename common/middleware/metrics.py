@@ -0,0 +1,38 @@
+import time
+from typing import Callable, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# (method, шаблон роута или None, status, длительность в секундах) — observe_request из метрик сервиса
+ObserveRequest = Callable[[str, Optional[str], int, float], None]
+
+
+class MetricsMiddleware:
+    """
+    Чистый ASGI (без BaseHTTPMiddleware): длительность запроса по шаблону роута.
+    scope["route"] заполняет роутер FastAPI — шаблон /users/{user_id}, а не сырой путь.
+    """
+
+    def __init__(self, app: ASGIApp, observe: ObserveRequest):
+        self.app = app
+        self.observe = observe
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            self.observe(scope["method"], getattr(route, "path", None), status, time.perf_counter() - start)
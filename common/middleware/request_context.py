@@ -0,0 +1,110 @@
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from queue import SimpleQueue
+from typing import Optional, Tuple
+
+from loguru import logger
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+request_id_ctx: ContextVar[str] = ContextVar("request_id", default="")
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+# (request_id, method, path, query_string, status, duration_ns, client)
+AccessRecord = Tuple[str, str, str, bytes, int, int, Optional[str]]
+
+_access_queue: "SimpleQueue[Optional[AccessRecord]]" = SimpleQueue()
+_access_writer: Optional[threading.Thread] = None
+
+
+def _emit_access(record: AccessRecord) -> None:
+    request_id, method, path, query, status, duration_ns, client = record
+    if query:
+        path = f"{path}?{query.decode('latin-1')}"
+    duration_ms = duration_ns / 1_000_000
+    logger.bind(
+        request_id=request_id, method=method, path=path, status=status,
+        duration_ms=duration_ms, client=client,
+    ).log(
+        "ERROR" if status >= 500 else "INFO",
+        f"[{request_id}] {method} {path} {status} ({duration_ms:.3f}ms) | Client: {client or 'unknown'}",
+    )
+
+def _write_access_log() -> None:
+    while True:
+        record = _access_queue.get()
+        if record is None:
+            return
+        _emit_access(record)
+
+def init_access_log() -> None:
+    """Поток, который форматирует и пишет access-записи вне event loop."""
+    global _access_writer
+    if _access_writer is None:
+        _access_writer = threading.Thread(target=_write_access_log, name="access-log", daemon=True)
+        _access_writer.start()
+
+def close_access_log() -> None:
+    """Дописывает очередь и останавливает поток."""
+    global _access_writer
+    if _access_writer is not None:
+        _access_queue.put(None)
+        _access_writer.join()
+        _access_writer = None
+
+
+class RequestContextMiddleware:
+    """
+    Чистый ASGI вместо RequestIDMiddleware + LoggingMiddleware (BaseHTTPMiddleware):
+    без отдельной задачи и memory-stream на каждый запрос, стриминговые ответы проходят как есть.
+
+    - request_id из X-Request-ID или новый uuid4 → request_id_ctx, request.state.request_id
+      и заголовок ответа X-Request-ID;
+    - одна access-запись на запрос: в event loop только кортеж в очередь,
+      строку собирает и пишет поток init_access_log().
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                request_id = value.decode("latin-1")
+                break
+        if not request_id:
+            request_id = str(uuid.uuid4())
+        token = request_id_ctx.set(request_id)
+        scope.setdefault("state", {})["request_id"] = request_id  # request.state.request_id в endpoint
+
+        status = 500
+        start = time.perf_counter_ns()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append("X-Request-ID", request_id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            client = scope.get("client")
+            record = (
+                request_id, scope["method"], scope["path"], scope["query_string"],
+                status, time.perf_counter_ns() - start, client[0] if client else None,
+            )
+            if _access_writer is not None:
+                _access_queue.put(record)
+            else:
+                _emit_access(record)  # поток не запущен (тесты, скрипты) — пишем сразу
+            request_id_ctx.reset(token)
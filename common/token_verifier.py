@@ -0,0 +1,299 @@
+"""
+Проверка access-токенов без Redis на каждый запрос — для auth и сервисов за ним (users, служебные роуты
+webhook_2can, см. common/access_token.py). Нужны только PyJWT (с cryptography для RS256 / EdDSA), redis и loguru.
+
+- Ключ — секрет HS256 или JWKSKeys: публичные ключи из /.well-known/jwks.json auth по kid, с фоновым
+  обновлением и дозагрузкой при неизвестном kid (ротация ключей без простоя, секрет сервисам не нужен).
+
+- Разобранные claims кэшируются по строке токена до его exp: повторный запрос с тем же токеном
+  не пересчитывает подпись и не разбирает JSON.
+- Отозванные jti (logout) — локальный словарь jti → exp. Его наполняет фоновая задача из Redis Stream
+  REVOCATION_STREAM (XREAD BLOCK). В стриме только отзывы за время жизни access-токена (MINID при XADD),
+  поэтому на старте он читается целиком, а после разрыва — с последнего id, без пропусков (pub/sub терял бы).
+- Жёсткая граница устаревания: если последний XREAD, после которого копия догнала стрим, начат раньше
+  чем max_staleness назад, локальной копии не доверяем и проверяем jti в Redis, как раньше.
+"""
+import asyncio
+import json
+import time
+import urllib.request
+from typing import Any, Dict, Iterable, Optional
+
+import jwt
+from loguru import logger
+from redis.asyncio import Redis
+
+REVOCATION_STREAM = "access_token_revocations"
+BLACKLIST_KEY_PREFIX = "blacklist:access:"
+SYNC_BATCH_SIZE = 1000
+SYNC_RETRY_SECONDS = 1.0
+PRUNE_INTERVAL_SECONDS = 60.0
+
+
+class TokenRevoked(Exception):
+    """jti отозван (logout)."""
+
+
+async def publish_revocation(redis: Redis, jti: str, expires_at: int, window_seconds: int) -> None:
+    """
+    Отзыв access-токена: ключ для проверки в Redis (до exp токена) и запись в стрим для локальных копий.
+    window_seconds — максимальное время жизни access-токена: более старые записи стрима не нужны.
+    """
+    ttl = max(1, int(expires_at - time.time()))
+    min_id = f"{int((time.time() - window_seconds) * 1000)}-0"
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.setex(f"{BLACKLIST_KEY_PREFIX}{jti}", ttl, "1")
+        pipe.xadd(REVOCATION_STREAM, {"jti": jti, "exp": int(expires_at)}, minid=min_id, approximate=True)
+        await pipe.execute()
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+def _field(fields: dict, name: str):
+    # decode_responses у клиентов разных сервисов может отличаться
+    value = fields.get(name)
+    return fields.get(name.encode()) if value is None else value
+
+
+class JWKSKeys:
+    """
+    kid → ключ из JWKS: с url — GET раз в refresh_seconds (фоном, после start()) и сразу при неизвестном kid,
+    но не чаще min_refetch_seconds: поток токенов с чужим kid не превращается в поток запросов к auth.
+    С jwks — готовый набор без обновлений (auth проверяет свои токены без HTTP к себе).
+    Ключи с alg не из algorithms пропускаются: alg токена должен совпасть с alg ключа.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        *,
+        jwks: Optional[dict] = None,
+        algorithms: Iterable[str] = ("RS256", "EdDSA"),
+        refresh_seconds: float = 300.0,
+        min_refetch_seconds: float = 30.0,
+        timeout_seconds: float = 5.0,
+    ):
+        self.url = url
+        self.algorithms = tuple(algorithms)
+        self.refresh_seconds = refresh_seconds
+        self.min_refetch_seconds = min_refetch_seconds
+        self.timeout_seconds = timeout_seconds
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._fetched_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.fetches = 0
+        self.fetch_errors = 0
+        if jwks is not None:
+            self._load(jwks)
+
+    def start(self) -> None:
+        if self.url is not None and self._task is None:
+            self._task = asyncio.create_task(self._maintain())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def get(self, kid: Optional[str]) -> jwt.PyJWK:
+        jwk = self._keys.get(kid)
+        if jwk is None and self.url is not None:
+            async with self._lock:
+                # Ждавшие за блокировкой берут результат только что завершившегося запроса
+                if self._fetched_at is None or time.monotonic() - self._fetched_at >= self.min_refetch_seconds:
+                    await self._refresh()
+            jwk = self._keys.get(kid)
+        if jwk is None:
+            raise jwt.InvalidTokenError(f"Unknown signing key {kid!r}")
+        return jwk
+
+    async def _maintain(self) -> None:
+        while True:
+            async with self._lock:
+                await self._refresh()
+            await asyncio.sleep(self.refresh_seconds)
+
+    async def _refresh(self) -> None:
+        self._fetched_at = time.monotonic()  # и при ошибке: повтор не раньше min_refetch_seconds
+        self.fetches += 1
+        try:
+            jwks = await asyncio.to_thread(self._fetch)
+        except Exception as e:
+            self.fetch_errors += 1
+            logger.warning(f"Cannot fetch JWKS from {self.url}, keeping {len(self._keys)} known keys: {e}")
+            return
+        self._load(jwks)
+
+    def _fetch(self) -> dict:
+        request = urllib.request.Request(self.url, headers={"Accept": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout_seconds) as response:
+            return json.load(response)
+
+    def _load(self, jwks: dict) -> None:
+        keys: Dict[str, jwt.PyJWK] = {}
+        for data in jwks.get("keys", []):
+            if data.get("use", "sig") != "sig" or "kid" not in data:
+                continue
+            try:
+                jwk = jwt.PyJWK(data)
+            except jwt.PyJWTError as e:
+                logger.warning(f"Skipping JWKS key {data.get('kid')}: {e}")
+                continue
+            if jwk.algorithm_name in self.algorithms:
+                keys[data["kid"]] = jwk
+        self._keys = keys
+
+
+class AccessTokenVerifier:
+    """
+    verify(token) → claims или jwt.InvalidTokenError / TokenRevoked.
+    start() — после создания (в lifespan), close() — на остановке.
+    key — секрет HS256 (или PEM публичного ключа) либо JWKSKeys; algorithms для JWKSKeys берутся из ключа.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        *,
+        key: Any,
+        algorithms: Iterable[str] = ("HS256",),
+        max_staleness_seconds: float = 5.0,
+        claims_cache_size: int = 10_000,
+        block_ms: int = 1000,
+        name: str = "access",
+    ):
+        if max_staleness_seconds * 1000 <= block_ms:
+            raise ValueError("max_staleness_seconds must exceed block_ms, otherwise an idle stream looks stale")
+        self.redis = redis
+        self.key = key
+        self.algorithms = list(algorithms)
+        self.max_staleness_seconds = max_staleness_seconds
+        self.claims_cache_size = claims_cache_size
+        self.block_ms = block_ms
+        self.name = name
+        self._claims: Dict[str, dict] = {}
+        self._revoked: Dict[str, int] = {}
+        self._last_id = "0-0"
+        self._synced_at: Optional[float] = None  # monotonic начала XREAD, после которого копия догнала стрим
+        self._pruned_at = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self.claims_hits = 0
+        self.claims_misses = 0
+        self.revoked_hits = 0
+        self.fallback_checks = 0
+        self.sync_errors = 0
+
+    def start(self) -> None:
+        if isinstance(self.key, JWKSKeys):
+            self.key.start()
+        if self._task is None:
+            self._task = asyncio.create_task(self._sync())
+
+    async def close(self) -> None:
+        if isinstance(self.key, JWKSKeys):
+            await self.key.close()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def verify(self, token: str) -> dict:
+        """Claims из кэша общие для всех запросов с этим токеном — не изменять."""
+        claims = self._claims.get(token)
+        if claims is not None and claims["exp"] > time.time():
+            self.claims_hits += 1
+        else:
+            self.claims_misses += 1
+            self._claims.pop(token, None)
+            claims = await self._decode(token)
+            if len(self._claims) >= self.claims_cache_size:
+                del self._claims[next(iter(self._claims))]  # самая старая запись
+            self._claims[token] = claims
+
+        jti = claims["jti"]
+        if self.fresh:
+            if jti in self._revoked:
+                self.revoked_hits += 1
+                raise TokenRevoked()
+        else:
+            self.fallback_checks += 1
+            if await self.redis.exists(f"{BLACKLIST_KEY_PREFIX}{jti}"):
+                raise TokenRevoked()
+        return claims
+
+    def revoke(self, jti: str, expires_at: int) -> None:
+        """Отзыв, сделанный этим процессом, виден сразу, не дожидаясь стрима."""
+        self._revoked[jti] = int(expires_at)
+
+    @property
+    def fresh(self) -> bool:
+        return self._synced_at is not None and time.monotonic() - self._synced_at <= self.max_staleness_seconds
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "claims_cached": len(self._claims),
+            "revoked": len(self._revoked),
+            "claims_hits": self.claims_hits,
+            "claims_misses": self.claims_misses,
+            "revoked_hits": self.revoked_hits,
+            "fallback_checks": self.fallback_checks,
+            "sync_errors": self.sync_errors,
+            "staleness_seconds": None if self._synced_at is None else time.monotonic() - self._synced_at,
+        }
+
+    async def _decode(self, token: str) -> dict:
+        key, algorithms = self.key, self.algorithms
+        if isinstance(key, JWKSKeys):
+            jwk = await key.get(jwt.get_unverified_header(token).get("kid"))
+            key, algorithms = jwk.key, [jwk.algorithm_name]
+        claims = jwt.decode(token, key, algorithms=algorithms, options={"require": ["exp", "sub", "jti"]})
+        # type появился позже: токены без него выданы auth раньше и тоже access
+        if claims.get("type", "access") != "access":
+            raise jwt.InvalidTokenError("Invalid token type: expected 'access'")
+        return claims
+
+    async def _sync(self) -> None:
+        while True:
+            issued_at = time.monotonic()
+            try:
+                # Первое чтение без BLOCK: пустой стрим на старте не держит проверки в Redis block_ms
+                response = await self.redis.xread(
+                    {REVOCATION_STREAM: self._last_id},
+                    count=SYNC_BATCH_SIZE,
+                    block=self.block_ms if self._synced_at is not None else None,
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.sync_errors += 1
+                logger.warning(f"Access token revocation sync failed, checking Redis per request: {e}")
+                await asyncio.sleep(SYNC_RETRY_SECONDS)
+                continue
+
+            received = 0
+            for _, entries in response or ():
+                for entry_id, fields in entries:
+                    self._last_id = _text(entry_id)
+                    self._revoked[_text(_field(fields, "jti"))] = int(_field(fields, "exp"))
+                    received += 1
+            if received < SYNC_BATCH_SIZE:
+                # Всё, что было в стриме к началу этого XREAD, уже в _revoked
+                self._synced_at = issued_at
+            if issued_at - self._pruned_at > PRUNE_INTERVAL_SECONDS:
+                self._prune()
+
+    def _prune(self) -> None:
+        now = time.time()
+        self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+        self._claims = {token: claims for token, claims in self._claims.items() if claims["exp"] > now}
+        self._pruned_at = time.monotonic()
@@ -0,0 +1,14 @@
+CREATE OR REPLACE FUNCTION "accounts"."create_user_import_job"("p_filename" text, "p_file_path" text)
+  RETURNS "accounts"."user_import_jobs" AS $BODY$
+DECLARE
+    new_job accounts.user_import_jobs;
+BEGIN
+    INSERT INTO accounts.user_import_jobs (filename, file_path)
+    VALUES (p_filename, p_file_path)
+    RETURNING * INTO new_job;
+
+    RETURN new_job;
+END;
+$BODY$
+  LANGUAGE plpgsql VOLATILE
+  COST 100
\ No newline at end of file
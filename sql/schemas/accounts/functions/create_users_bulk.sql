@@ -0,0 +1,100 @@
+CREATE OR REPLACE FUNCTION "accounts"."create_users_bulk"("p_phones" _text, "p_external_ids" _text, "p_group_names" _text)
+  RETURNS TABLE("idx" int4, "status" text, "user_id" uuid, "reason" text) AS $BODY$
+	--Set-based замена построчных вызовов create_user_bulk_stub для POST /accounts/users/bulk.
+	--Пачка (p_phones[i], p_external_ids[i]) одним INSERT ... SELECT из unnest попадает в staging-таблицу
+	--уже размеченной: error — пустой phone, skipped — повтор phone в пачке или активный phone-контакт
+	--уже есть (один LEFT JOIN по idx_user_contacts_active_value_type), created — остальные, им сразу
+	--выдаётся id. Затем три многострочных INSERT: users, user_contacts, user_group_memberships.
+	--Возвращает отчёт по каждой строке входа, idx — позиция в массиве с 1.
+	--Параллельная вставка того же phone даёт unique_violation на всю пачку — повтор на стороне вызывающего.
+DECLARE
+    v_phone_type_id int4;
+    v_group_ids int2[];
+BEGIN
+    IF cardinality(p_phones) IS DISTINCT FROM cardinality(p_external_ids) THEN
+        RAISE EXCEPTION 'p_phones and p_external_ids must have the same length';
+    END IF;
+
+    SELECT ct.id INTO v_phone_type_id FROM accounts.contact_types ct WHERE ct.name = 'phone';
+    IF NOT FOUND THEN RAISE EXCEPTION 'Contact type "phone" not found'; END IF;
+
+    SELECT array_agg(g.id) INTO v_group_ids
+    FROM accounts.user_groups g
+    WHERE g.name = ANY(p_group_names) AND g.is_active = true;
+    IF coalesce(cardinality(v_group_ids), 0) <> (SELECT count(DISTINCT n) FROM unnest(p_group_names) AS n) THEN
+        RAISE EXCEPTION 'Active user group not found among %', p_group_names;
+    END IF;
+
+    -- Живёт до конца сессии, строки чистятся на COMMIT: в пуле соединений каталог не растёт
+    CREATE TEMP TABLE IF NOT EXISTS bulk_users_staging (
+        idx int4 PRIMARY KEY,
+        phone text,
+        profile jsonb,
+        user_id uuid,
+        status text NOT NULL,
+        reason text
+    ) ON COMMIT DELETE ROWS;
+    TRUNCATE bulk_users_staging;
+
+    INSERT INTO bulk_users_staging (idx, phone, profile, user_id, status, reason)
+    SELECT
+        t.ord,
+        t.phone,
+        CASE WHEN t.external_id IS NOT NULL THEN jsonb_build_object('external_id', t.external_id) END,
+        CASE
+            WHEN t.phone IS NULL OR t.rn > 1 THEN NULL
+            WHEN uc.user_id IS NOT NULL THEN uc.user_id
+            ELSE gen_random_uuid()
+        END,
+        CASE
+            WHEN t.phone IS NULL THEN 'error'
+            WHEN t.rn > 1 OR uc.user_id IS NOT NULL THEN 'skipped'
+            ELSE 'created'
+        END,
+        CASE
+            WHEN t.phone IS NULL THEN 'Field "phone" is required'
+            WHEN t.rn > 1 THEN 'Duplicate phone in batch'
+            WHEN uc.user_id IS NOT NULL THEN 'Phone already registered'
+        END
+    FROM (
+        SELECT
+            s.ord::int4 AS ord,
+            s.phone,
+            s.external_id,
+            row_number() OVER (PARTITION BY s.phone ORDER BY s.ord) AS rn
+        FROM (
+            SELECT u.ord, NULLIF(btrim(u.phone), '') AS phone, u.external_id
+            FROM unnest(p_phones, p_external_ids) WITH ORDINALITY AS u(phone, external_id, ord)
+        ) s
+    ) t
+    LEFT JOIN accounts.user_contacts uc
+        ON uc.contact_type_id = v_phone_type_id
+       AND uc.value = t.phone
+       AND uc.is_active = true;
+
+    -- Пользователи без пароля и second_login, как в create_user_bulk_stub
+    INSERT INTO accounts.users (id, profile, password_hash)
+    SELECT s.user_id, s.profile, NULL
+    FROM bulk_users_staging s
+    WHERE s.status = 'created';
+
+    INSERT INTO accounts.user_contacts (user_id, contact_type_id, value, is_active)
+    SELECT s.user_id, v_phone_type_id, s.phone, true
+    FROM bulk_users_staging s
+    WHERE s.status = 'created';
+
+    INSERT INTO accounts.user_group_memberships (user_id, group_id)
+    SELECT s.user_id, g.id
+    FROM bulk_users_staging s
+    CROSS JOIN unnest(v_group_ids) AS g(id)
+    WHERE s.status = 'created';
+
+    RETURN QUERY
+    SELECT s.idx, s.status, s.user_id, s.reason
+    FROM bulk_users_staging s
+    ORDER BY s.idx;
+END;
+$BODY$
+  LANGUAGE plpgsql VOLATILE
+  COST 100
+  ROWS 1000
\ No newline at end of file
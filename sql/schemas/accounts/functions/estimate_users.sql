@@ -0,0 +1,14 @@
+CREATE OR REPLACE FUNCTION "accounts"."estimate_users"()
+  RETURNS "pg_catalog"."int8" AS $BODY$
+	--Оценка числа пользователей из статистики планировщика (ANALYZE / autovacuum) без COUNT(*).
+	--NULL — таблица ещё ни разу не анализировалась.
+BEGIN
+    RETURN (
+        SELECT NULLIF(c.reltuples, -1)::int8
+        FROM pg_catalog.pg_class c
+        WHERE c.oid = 'accounts.users'::regclass
+    );
+END;
+$BODY$
+  LANGUAGE plpgsql STABLE
+  COST 100
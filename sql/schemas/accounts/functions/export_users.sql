@@ -0,0 +1,36 @@
+CREATE OR REPLACE FUNCTION "accounts"."export_users"()
+  RETURNS TABLE("id" uuid, "is_active" bool, "created_at" timestamptz, "updated_at" timestamptz, "profile" jsonb, "contacts" jsonb, "groups" _text) AS $BODY$
+	--Полная выгрузка для GET /accounts/users/export через серверный курсор.
+	--LANGUAGE sql + STABLE: функция инлайнится в запрос, строки идут в курсор по мере чтения
+	--(plpgsql RETURN QUERY сначала собрал бы весь результат в tuplestore).
+	--Порядок — по idx_users_created_at_id, без сортировки.
+    SELECT
+        u.id,
+        u.is_active,
+        u.created_at,
+        u.updated_at,
+        u.profile,
+        c.contacts,
+        g.groups
+    FROM accounts.users u
+    LEFT JOIN LATERAL (
+        -- Массив, а не объект по типу: у пользователя может быть несколько контактов одного типа
+        SELECT COALESCE(
+            jsonb_agg(jsonb_build_object('type', ct.name, 'value', uc.value) ORDER BY ct.name, uc.value),
+            '[]'::jsonb
+        ) AS contacts
+        FROM accounts.user_contacts uc
+        JOIN accounts.contact_types ct ON ct.id = uc.contact_type_id
+        WHERE uc.user_id = u.id AND uc.is_active = true
+    ) c ON true
+    LEFT JOIN LATERAL (
+        SELECT COALESCE(ARRAY_AGG(ug.name), '{}'::text[]) AS groups
+        FROM accounts.user_group_memberships m
+        JOIN accounts.user_groups ug ON ug.id = m.group_id
+        WHERE m.user_id = u.id AND m.is_active = true
+    ) g ON true
+    ORDER BY u.created_at DESC, u.id DESC
+$BODY$
+  LANGUAGE sql STABLE
+  COST 100
+  ROWS 100000
@@ -0,0 +1,26 @@
+CREATE OR REPLACE FUNCTION "accounts"."finish_user_import_job"("p_id" uuid, "p_status" text, "p_error" text=NULL::text)
+  RETURNS "accounts"."user_import_jobs" AS $BODY$
+DECLARE
+    job accounts.user_import_jobs;
+BEGIN
+    IF p_status NOT IN ('done', 'failed') THEN
+        RAISE EXCEPTION 'Invalid final status %', p_status;
+    END IF;
+
+    UPDATE accounts.user_import_jobs
+    SET status = p_status,
+        error = p_error,
+        finished_at = now(),
+        updated_at = now()
+    WHERE id = p_id
+    RETURNING * INTO job;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Import job % not found', p_id;
+    END IF;
+
+    RETURN job;
+END;
+$BODY$
+  LANGUAGE plpgsql VOLATILE
+  COST 100
\ No newline at end of file
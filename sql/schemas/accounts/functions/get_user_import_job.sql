@@ -0,0 +1,8 @@
+CREATE OR REPLACE FUNCTION "accounts"."get_user_import_job"("p_id" uuid)
+  RETURNS SETOF "accounts"."user_import_jobs" AS $BODY$
+	--GET /accounts/users/bulk/jobs/{id}; нет задачи — пустой результат (404 в сервисе).
+    SELECT * FROM accounts.user_import_jobs WHERE id = p_id;
+$BODY$
+  LANGUAGE sql STABLE
+  COST 100
+  ROWS 1
\ No newline at end of file
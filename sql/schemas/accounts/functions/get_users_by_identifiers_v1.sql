@@ -0,0 +1,60 @@
+CREATE OR REPLACE FUNCTION "accounts"."get_users_by_identifiers_v1"("p_identifiers" _text)
+  RETURNS TABLE("identifier" text, "id" uuid, "created_at" timestamptz, "updated_at" timestamptz, "is_active" bool, "profile" jsonb, "groups" json, "contacts" json) AS $BODY$
+	--POST /accounts/users/by-identifiers: пачка identifier одним запросом, правила — как в get_user_by_identifier_v1
+	--(UUID → users.id; +E164 → phone; email → email; остальное → second_login; только активные).
+	--Строка на каждый найденный identifier (повторы во входе схлопываются); ненайденных в результате нет.
+	--UUID определяем pg_input_is_valid (в одном запросе нельзя поймать ошибку приведения, как в v1):
+	--она принимает ровно то же, что и ::uuid в v1, — фигурные скобки, дефисы через каждые 4 символа, регистр.
+    WITH input AS (
+        SELECT DISTINCT
+            i.identifier,
+            pg_input_is_valid(i.identifier, 'uuid') AS is_uuid,
+            i.identifier ~ '^\+[1-9]\d{1,14}$' AS is_phone,  -- E.164
+            i.identifier ~ '^[^@]+@[^@]+\.[^@]+$' AS is_email
+        FROM unnest(p_identifiers) AS i(identifier)
+    ),
+    matched AS (
+        SELECT i.identifier, i.identifier::uuid AS user_id
+        FROM input i
+        WHERE i.is_uuid
+        UNION ALL
+        -- активный контакт с данным значением и типом один (idx_user_contacts_active_value_type)
+        SELECT i.identifier, c.user_id
+        FROM input i
+        JOIN accounts.user_contacts c ON c.value = i.identifier AND c.is_active = TRUE
+        JOIN accounts.contact_types ct ON ct.id = c.contact_type_id
+        WHERE NOT i.is_uuid
+          AND (
+                (i.is_phone AND ct.name = 'phone')
+                OR (i.is_email AND ct.name = 'email')
+                OR (NOT i.is_phone AND NOT i.is_email AND ct.name = 'second_login')
+          )
+    )
+    SELECT
+        m.identifier,
+        u.id,
+        u.created_at,
+        u.updated_at,
+        u.is_active,
+        u.profile,
+        COALESCE(
+            (SELECT json_agg(json_build_object('id', g.id, 'name', g.name))
+             FROM accounts.user_group_memberships gm
+             JOIN accounts.user_groups g ON gm.group_id = g.id
+             WHERE gm.user_id = u.id AND gm.is_active = TRUE),
+            '[]'::JSON
+        ) AS groups,
+        COALESCE(
+            (SELECT json_agg(json_build_object('id', uc.id, 'type', ct.name, 'value', uc.value))
+             FROM accounts.user_contacts uc
+             JOIN accounts.contact_types ct ON uc.contact_type_id = ct.id
+             WHERE uc.user_id = u.id AND uc.is_active = TRUE),
+            '[]'::JSON
+        ) AS contacts
+    FROM matched m
+    JOIN accounts.users u ON u.id = m.user_id
+    WHERE u.is_active = TRUE
+$BODY$
+  LANGUAGE sql STABLE
+  COST 100
+  ROWS 1000
\ No newline at end of file
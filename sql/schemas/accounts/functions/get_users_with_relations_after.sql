@@ -0,0 +1,45 @@
+CREATE OR REPLACE FUNCTION "accounts"."get_users_with_relations_after"("p_limit" int4, "p_created_at" timestamptz, "p_id" uuid)
+  RETURNS TABLE("id" uuid, "username" text, "is_active" bool, "created_at" timestamptz, "updated_at" timestamptz, "profile" jsonb, "contacts" jsonb, "groups" _text) AS $BODY$
+	--Keyset-пагинация: сначала страница accounts.users по idx_users_created_at_id
+	--строго после курсора (created_at, id), затем контакты и группы только для её строк.
+	--Первая страница — p_created_at = 'infinity', p_id = 'ffffffff-ffff-ffff-ffff-ffffffffffff'.
+	--Пользователи с created_at IS NULL в выдачу не попадают (created_at DEFAULT now()).
+BEGIN
+    RETURN QUERY
+    WITH page AS (
+        SELECT u.id, u.username, u.is_active, u.created_at, u.updated_at, u.profile
+        FROM accounts.users u
+        WHERE (u.created_at, u.id) < (p_created_at, p_id)
+        ORDER BY u.created_at DESC, u.id DESC
+        LIMIT p_limit
+    )
+    SELECT
+        p.id,
+        p.username,
+        p.is_active,
+        p.created_at,
+        p.updated_at,
+        p.profile,
+        c.contacts,
+        g.groups
+    FROM page p
+    -- Контакты: contact_type.name → contact_value
+    LEFT JOIN LATERAL (
+        SELECT COALESCE(jsonb_object_agg(ct.name, uc.value), '{}'::jsonb) AS contacts
+        FROM accounts.user_contacts uc
+        JOIN accounts.contact_types ct ON ct.id = uc.contact_type_id
+        WHERE uc.user_id = p.id AND uc.is_active = true
+    ) c ON true
+    -- Группы: массив имён
+    LEFT JOIN LATERAL (
+        SELECT COALESCE(ARRAY_AGG(ug.name), '{}'::text[]) AS groups
+        FROM accounts.user_group_memberships m
+        JOIN accounts.user_groups ug ON ug.id = m.group_id
+        WHERE m.user_id = p.id AND m.is_active = true
+    ) g ON true
+    ORDER BY p.created_at DESC, p.id DESC;
+END;
+$BODY$
+  LANGUAGE plpgsql STABLE
+  COST 100
+  ROWS 100
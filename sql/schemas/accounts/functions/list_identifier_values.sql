@@ -0,0 +1,15 @@
+CREATE OR REPLACE FUNCTION "accounts"."list_identifier_values"()
+  RETURNS TABLE("value" text) AS $BODY$
+	--Значения активных контактов, по которым ищет get_user_by_identifier_v1 (phone, email, second_login):
+	--из них строится Bloom-фильтр кэша by-identifier (src/cashe/identifier_bloom.py).
+	--users.is_active не проверяем: фильтру можно быть шире, а реактивация пользователя его не обновляет.
+	--LANGUAGE sql + STABLE: инлайнится, строки идут в серверный курсор по мере чтения.
+    SELECT c.value
+    FROM accounts.user_contacts c
+    JOIN accounts.contact_types ct ON ct.id = c.contact_type_id
+    WHERE c.is_active = true
+      AND ct.name IN ('phone', 'email', 'second_login')
+$BODY$
+  LANGUAGE sql STABLE
+  COST 100
+  ROWS 1000000
\ No newline at end of file
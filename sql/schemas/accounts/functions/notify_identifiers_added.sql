@@ -0,0 +1,25 @@
+CREATE OR REPLACE FUNCTION "accounts"."notify_identifiers_added"()
+  RETURNS "pg_catalog"."trigger" AS $BODY$
+BEGIN
+	--users слушает канал: снимает отрицательные записи кэша by-identifier и добавляет значения
+	--в Bloom-фильтр (src/cashe/identifier_notify.py) — для контактов, созданных не через users
+	--(регистрация в auth, ручные вставки). Те же типы, что в accounts.list_identifier_values().
+	--Payload NOTIFY ограничен 8000 байт: JSON-массив пачками по 20 значений;
+	--пачка со слишком длинным значением уходит пустой строкой — users тогда сбрасывает фильтр.
+    PERFORM pg_notify(
+        'accounts_identifiers_added',
+        CASE WHEN bool_or(octet_length(v.value) > 300) THEN '' ELSE json_agg(v.value)::text END
+    )
+    FROM (
+        SELECT n.value, (row_number() OVER () - 1) / 20 AS chunk
+        FROM new_rows n
+        JOIN accounts.contact_types ct ON ct.id = n.contact_type_id
+        WHERE n.is_active = true
+          AND ct.name IN ('phone', 'email', 'second_login')
+    ) v
+    GROUP BY v.chunk;
+    RETURN NULL;
+END;
+$BODY$
+  LANGUAGE plpgsql VOLATILE
+  COST 100
\ No newline at end of file
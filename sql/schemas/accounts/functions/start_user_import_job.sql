@@ -0,0 +1,25 @@
+CREATE OR REPLACE FUNCTION "accounts"."start_user_import_job"("p_id" uuid)
+  RETURNS SETOF "accounts"."user_import_jobs" AS $BODY$
+	--Воркер берёт задачу: queued → running, счётчики с нуля.
+	--running тоже берётся — повторная доставка после падения воркера, импорт идёт заново
+	--(уже созданные телефоны станут skipped). done/failed — пустой результат, сообщение просто ack.
+BEGIN
+    RETURN QUERY
+    UPDATE accounts.user_import_jobs
+    SET status = 'running',
+        total_rows = 0,
+        created_count = 0,
+        skipped_count = 0,
+        error_count = 0,
+        errors = '[]'::jsonb,
+        error = NULL,
+        started_at = now(),
+        updated_at = now()
+    WHERE id = p_id
+      AND status IN ('queued', 'running')
+    RETURNING *;
+END;
+$BODY$
+  LANGUAGE plpgsql VOLATILE
+  COST 100
+  ROWS 1
\ No newline at end of file
@@ -0,0 +1,17 @@
+CREATE OR REPLACE FUNCTION "accounts"."update_user_import_job_progress"("p_id" uuid, "p_total_rows" int4, "p_created_count" int4, "p_skipped_count" int4, "p_error_count" int4, "p_new_errors" jsonb)
+  RETURNS void AS $BODY$
+	--Прогресс после каждой порции: счётчики — накопленные значения, p_new_errors — только
+	--ошибки этой порции (массив строк), дописываются к уже сохранённым.
+BEGIN
+    UPDATE accounts.user_import_jobs
+    SET total_rows = p_total_rows,
+        created_count = p_created_count,
+        skipped_count = p_skipped_count,
+        error_count = p_error_count,
+        errors = errors || COALESCE(p_new_errors, '[]'::jsonb),
+        updated_at = now()
+    WHERE id = p_id;
+END;
+$BODY$
+  LANGUAGE plpgsql VOLATILE
+  COST 100
\ No newline at end of file
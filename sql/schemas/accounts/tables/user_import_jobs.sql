@@ -0,0 +1,21 @@
+CREATE TABLE "accounts"."user_import_jobs" (
+  "id" uuid NOT NULL DEFAULT gen_random_uuid(),
+  "status" text COLLATE "pg_catalog"."default" NOT NULL DEFAULT 'queued'::text,
+  "filename" text COLLATE "pg_catalog"."default" NOT NULL,
+  "file_path" text COLLATE "pg_catalog"."default" NOT NULL,
+  "total_rows" int4 NOT NULL DEFAULT 0,
+  "created_count" int4 NOT NULL DEFAULT 0,
+  "skipped_count" int4 NOT NULL DEFAULT 0,
+  "error_count" int4 NOT NULL DEFAULT 0,
+  "errors" jsonb NOT NULL DEFAULT '[]'::jsonb,
+  "error" text COLLATE "pg_catalog"."default",
+  "created_at" timestamptz(6) NOT NULL DEFAULT now(),
+  "started_at" timestamptz(6),
+  "finished_at" timestamptz(6),
+  "updated_at" timestamptz(6) NOT NULL DEFAULT now(),
+  CONSTRAINT "user_import_jobs_pkey" PRIMARY KEY ("id"),
+  CONSTRAINT "user_import_jobs_status_check" CHECK ("status" = ANY (ARRAY['queued'::text, 'running'::text, 'done'::text, 'failed'::text]))
+)
+;
+
+COMMENT ON TABLE "accounts"."user_import_jobs" IS 'Фоновые импорты POST /accounts/users/bulk/upload: статус, счётчики и первые ошибки';
\ No newline at end of file
@@ -8,4 +8,10 @@ CREATE TABLE "accounts"."users" (
   "password_updated_at" timestamptz(0),
   CONSTRAINT "users_pkey" PRIMARY KEY ("id")
 )
-;
\ No newline at end of file
+;
+
+-- Keyset-пагинация (accounts.get_users_with_relations_after)
+CREATE INDEX "idx_users_created_at_id" ON "accounts"."users" USING btree (
+  "created_at" "pg_catalog"."timestamptz_ops" DESC NULLS FIRST,
+  "id" "pg_catalog"."uuid_ops" DESC NULLS FIRST
+);
@@ -0,0 +1,13 @@
+-- Уведомление users о новых и реактивированных значениях контактов (кэш by-identifier, Bloom-фильтр).
+-- FOR EACH STATEMENT с таблицей переходов: пачка NOTIFY на оператор, а не по одному на строку.
+-- UPDATE — без списка столбцов (с ним таблицы переходов недоступны): функция сама берёт только активные.
+
+CREATE TRIGGER "trg_user_contacts_identifiers_inserted" AFTER INSERT ON "accounts"."user_contacts"
+REFERENCING NEW TABLE AS "new_rows"
+FOR EACH STATEMENT
+EXECUTE PROCEDURE "accounts"."notify_identifiers_added"();
+
+CREATE TRIGGER "trg_user_contacts_identifiers_updated" AFTER UPDATE ON "accounts"."user_contacts"
+REFERENCING NEW TABLE AS "new_rows"
+FOR EACH STATEMENT
+EXECUTE PROCEDURE "accounts"."notify_identifiers_added"();
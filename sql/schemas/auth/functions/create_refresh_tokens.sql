@@ -0,0 +1,11 @@
+CREATE OR REPLACE FUNCTION "auth"."create_refresh_tokens"("p_user_ids" uuid[], "p_token_hashes" text[], "p_expires_at" timestamptz[])
+  RETURNS "pg_catalog"."void" AS $BODY$
+	--Пачка refresh-токенов одним INSERT (app/db/refresh_token_writer.py): элементы массивов с одним индексом — один токен.
+BEGIN
+    INSERT INTO auth.refresh_tokens (token_hash, user_id, expires_at)
+    SELECT t.token_hash, t.user_id, t.expires_at
+    FROM unnest(p_token_hashes, p_user_ids, p_expires_at) AS t(token_hash, user_id, expires_at);
+END;
+$BODY$
+  LANGUAGE plpgsql VOLATILE
+  COST 100
\ No newline at end of file
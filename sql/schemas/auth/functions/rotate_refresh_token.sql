@@ -0,0 +1,22 @@
+CREATE OR REPLACE FUNCTION "auth"."rotate_refresh_token"("p_old_hash" text, "p_new_hash" text, "p_expires_at" timestamptz)
+  RETURNS "pg_catalog"."uuid" AS $BODY$
+	--Ротация refresh-токена одним запросом: старый помечается revoked, новый вставляется для того же user_id.
+	--Возвращает user_id; NULL — старый токен не найден, уже использован или истёк (ничего не вставлено).
+	--Два одновременных /refresh с одним токеном: второй UPDATE ждёт блокировку строки, перепроверяет revoked и ничего не находит.
+    WITH consumed AS (
+        UPDATE auth.refresh_tokens
+        SET revoked = true
+        WHERE token_hash = p_old_hash
+          AND revoked IS NOT TRUE
+          AND expires_at > NOW()
+        RETURNING user_id
+    ), inserted AS (
+        INSERT INTO auth.refresh_tokens (token_hash, user_id, expires_at)
+        SELECT p_new_hash, consumed.user_id, p_expires_at
+        FROM consumed
+        RETURNING user_id
+    )
+    SELECT user_id FROM inserted;
+$BODY$
+  LANGUAGE sql VOLATILE
+  COST 100
\ No newline at end of file
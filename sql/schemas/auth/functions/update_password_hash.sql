@@ -0,0 +1,16 @@
+CREATE OR REPLACE FUNCTION "auth"."update_password_hash"("p_user_id" uuid, "p_old_hash" text, "p_new_hash" text)
+  RETURNS "pg_catalog"."bool" AS $BODY$
+	--Перехэширование пароля после успешного логина (новая схема или стоимость, app/services/auth_service.py).
+	--Пароль тот же: password_updated_at и updated_at не меняются.
+	--Условие на старый хэш: смена пароля между проверкой и записью не перезаписывается (вернёт false).
+BEGIN
+    UPDATE accounts.users
+    SET password_hash = p_new_hash
+    WHERE id = p_user_id
+      AND password_hash = p_old_hash;
+
+    RETURN FOUND;
+END;
+$BODY$
+  LANGUAGE plpgsql VOLATILE
+  COST 100
\ No newline at end of file
@@ -0,0 +1,32 @@
+CREATE OR REPLACE FUNCTION "to_can"."f_payment_resolved"("x_ins" jsonb, "x_resolved" jsonb)
+  RETURNS "pg_catalog"."json" AS $BODY$
+	--То же, что f_payment, но параметры мерчанта/фирмы/тарифа уже разрешены
+	--на стороне сервиса (см. to_can.get_payment_resolution) — одна вставка без джойнов.
+	--input data:
+	--x_resolved: {"principal", "idmerch", "comm_json", "firm_json", "merch_json", "tarif_json", "e_kassa"}
+BEGIN
+    INSERT INTO reports.payment (
+        data_json, year, idpaymerch, comm_json, firm_json, merch_json, tarif_json, e_kassa
+    )
+    VALUES (
+        (x_ins ||
+         jsonb_build_object('id_paybank', x_ins ->> 'Id', 'principal', x_resolved ->> 'principal')
+        ) - 'RRN' - 'TID' - 'Card' - 'Device' - 'Invoice' - 'MIDName' -
+          'BranchID' - 'CardType' - 'EventType' - 'Operation' -
+          'BranchName' - 'DvcAppBuild' - 'OfflineMode' - 'PaymentService',
+        LEFT(x_ins ->> 'PaidAt', 4)::integer,
+        jsonb_build_object('id_order', x_ins ->> 'Id', 'merch', (x_resolved ->> 'idmerch')::integer),
+        NULLIF(x_resolved -> 'comm_json', 'null'::jsonb),
+        NULLIF(x_resolved -> 'firm_json', 'null'::jsonb),
+        NULLIF(x_resolved -> 'merch_json', 'null'::jsonb),
+        NULLIF(x_resolved -> 'tarif_json', 'null'::jsonb),
+        NULLIF(x_resolved -> 'e_kassa', 'null'::jsonb)
+    )
+    ON CONFLICT DO NOTHING;
+
+    -- Возвращаем исходный JSON — как f_payment
+    RETURN x_ins;
+END;
+$BODY$
+  LANGUAGE plpgsql VOLATILE
+  COST 100
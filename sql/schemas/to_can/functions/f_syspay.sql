@@ -9,9 +9,11 @@ CREATE OR REPLACE FUNCTION "to_can"."f_syspay"("x_json" json)
 	--{
     --}
 BEGIN
-	xid := (x_json::jsonb ->> 'Id')::uuid;
+	-- Текст разбирается в jsonb один раз: и для вставки, и для f_payment
+	xjson := x_json::jsonb;
+	xid := (xjson ->> 'Id')::uuid;
 	INSERT INTO "to_can".syspay (json_inside, id_uuid)
-    VALUES (x_json, xid)
+    VALUES (xjson, xid)
     ON CONFLICT (id_uuid) DO NOTHING;
 
     GET DIAGNOSTICS inserted_rows = ROW_COUNT;
@@ -19,7 +21,6 @@ BEGIN
     IF inserted_rows = 0 THEN
         xans := json_build_object('ans', 'duplicated', 'id', xid);
 		ELSE
-				xjson := x_json::jsonb;
 				xans := to_can.f_payment(xjson);
         --xans := json_build_object('ans', 'ok', 'id', xid);
     END IF;
@@ -0,0 +1,46 @@
+CREATE OR REPLACE FUNCTION "to_can"."f_syspay_batch"("x_jsons" jsonb[], "x_resolved" jsonb[]=NULL::jsonb[])
+  RETURNS TABLE("idx" int4, "status" text, "ans" json) AS $BODY$
+	DECLARE
+		xid UUID;
+		inserted_rows INTEGER;
+	--input data:
+	--массив вебхуков (как в f_syspay), пишется одной транзакцией;
+	--x_resolved[i] (необязательно) — разрешённые параметры, см. f_payment_resolved
+	--output data:
+	--по строке на элемент: idx (с 1), status и ответ как у f_syspay;
+	--status: ok | duplicated | invalid (данные элемента отвергнуты, ans = {"error", "sqlstate"}).
+	--Прочие ошибки (deadlock, serialization_failure, lock_not_available, обрыв) не ловятся:
+	--пачка откатывается целиком, сервис отвечает как при ошибке f_syspay (503 / повтор из очереди).
+BEGIN
+    FOR i IN 1 .. COALESCE(array_length(x_jsons, 1), 0) LOOP
+        idx := i;
+        -- Ошибка одного элемента не должна откатывать всю пачку
+        BEGIN
+            xid := (x_jsons[i] ->> 'Id')::uuid;
+            INSERT INTO "to_can".syspay (json_inside, id_uuid)
+            VALUES (x_jsons[i], xid)
+            ON CONFLICT (id_uuid) DO NOTHING;
+
+            GET DIAGNOSTICS inserted_rows = ROW_COUNT;
+
+            IF inserted_rows = 0 THEN
+                status := 'duplicated';
+                ans := json_build_object('ans', 'duplicated', 'id', xid);
+            ELSIF x_resolved[i] IS NOT NULL THEN
+                status := 'ok';
+                ans := to_can.f_payment_resolved(x_jsons[i], x_resolved[i]);
+            ELSE
+                status := 'ok';
+                ans := to_can.f_payment(x_jsons[i]);
+            END IF;
+        EXCEPTION WHEN data_exception OR check_violation OR not_null_violation THEN
+            status := 'invalid';
+            ans := json_build_object('error', SQLERRM, 'sqlstate', SQLSTATE);
+        END;
+        RETURN NEXT;
+    END LOOP;
+END;
+$BODY$
+  LANGUAGE plpgsql VOLATILE
+  COST 100
+  ROWS 100
@@ -0,0 +1,31 @@
+CREATE OR REPLACE FUNCTION "to_can"."f_syspay_resolved"("x_json" json, "x_resolved" jsonb)
+  RETURNS "pg_catalog"."json" AS $BODY$
+	DECLARE
+		xans JSON DEFAULT '{"ans":"ok"}' ;
+		xid UUID;
+		inserted_rows INTEGER;
+		xjson JSONB;
+	--input data:
+	--x_json — как в f_syspay, x_resolved — см. f_payment_resolved
+BEGIN
+	xjson := x_json::jsonb;
+	xid := (xjson ->> 'Id')::uuid;
+	INSERT INTO "to_can".syspay (json_inside, id_uuid)
+    VALUES (xjson, xid)
+    ON CONFLICT (id_uuid) DO NOTHING;
+
+    GET DIAGNOSTICS inserted_rows = ROW_COUNT;
+
+    IF inserted_rows = 0 THEN
+        xans := json_build_object('ans', 'duplicated', 'id', xid);
+    ELSE
+        xans := to_can.f_payment_resolved(xjson, x_resolved);
+    END IF;
+
+    RETURN xans;
+END;
+--output data:
+--как у f_syspay
+$BODY$
+  LANGUAGE plpgsql VOLATILE
+  COST 100
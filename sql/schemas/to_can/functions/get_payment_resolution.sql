@@ -0,0 +1,57 @@
+CREATE OR REPLACE FUNCTION "to_can"."get_payment_resolution"()
+  RETURNS TABLE("mid" text, "resolved" jsonb) AS $BODY$
+	--Снимок справочников для кэша webhook_2can: MID → всё, что f_payment
+	--вычисляет джойнами (мерчант, фирма, комиссия, ratio, касса и тарифы-кандидаты).
+	--Тариф зависит от суммы, поэтому отдаётся списком с границами Minsum/Maxsum.
+	--ekassa.ekassa джойнится так же, как в f_payment (LEFT JOIN по первой кассе из mytosb.info.ecassa):
+	--несколько касс с одним id_kass дают несколько строк на MID — кэш считает его неоднозначным (полный путь).
+	--MID, у которого первая касса не приводится к integer, в снимок не попадает: f_payment на нём падает.
+BEGIN
+    RETURN QUERY
+    SELECT
+        mt.mid::text,
+        jsonb_build_object(
+            'principal', (mt.accesuaries ->> 'account')::text,
+            'idmerch', mt.syspay_merch::integer,
+            'ratio', (m.accesuaries ->> 'format_amount')::numeric,
+            'comm_json', cp.json_commparam,
+            'firm_json', (fs.fljson_firm::jsonb || COALESCE(u.attributies::jsonb, '{}'::jsonb)),
+            'merch_json', m.accesuaries,
+            'e_kassa', mi.ecassa::jsonb,
+            'tariffs', COALESCE(
+                (SELECT jsonb_agg(jsonb_build_object(
+                            'minsum', (bs.json_breakesum ->> 'Minsum')::numeric,
+                            'maxsum', (bs.json_breakesum ->> 'Maxsum')::numeric,
+                            'tarif_json', t.json_tarif))
+                 FROM common.tranztarif tt
+                 JOIN common.breakesum bs ON tt."Breakesum" = bs.idbreake
+                 LEFT JOIN common.tarif t ON t.idtarif = tt."Tarif"
+                 WHERE tt."Firm" = LEFT(mt.accesuaries ->> 'account', 6)
+                   AND tt."Syspay" = mt.syspay_merch::integer
+                   AND tt."Enable" = 1),
+                '[]'::jsonb
+            )
+        ) AS resolved
+    FROM to_can.merchant_tap2go mt
+    JOIN common.firmservice fs
+        ON fs.idfirm = LEFT(mt.accesuaries ->> 'account', 6)
+    JOIN common.commparam cp
+        ON cp.idcommparam = fs.idcommparam AND cp."enable" = TRUE
+    LEFT JOIN auth.users u
+        ON u.login_master = (fs.fljson_firm ->> 'login')::text
+    JOIN common.merchant m
+        ON m.idmerch = mt.syspay_merch::integer
+    LEFT JOIN mytosb.info mi
+        ON mi.syspay = mt.syspay_merch::integer AND mi.service = fs.service
+    LEFT JOIN ekassa.ekassa ek
+        ON ek.id_kass = CASE
+            WHEN pg_input_is_valid(mi.ecassa::jsonb -> 'ecassa' ->> 0, 'integer')
+            THEN (mi.ecassa::jsonb -> 'ecassa' ->> 0)::integer
+        END
+    WHERE (mi.ecassa::jsonb -> 'ecassa' ->> 0) IS NULL
+       OR pg_input_is_valid(mi.ecassa::jsonb -> 'ecassa' ->> 0, 'integer');
+END;
+$BODY$
+  LANGUAGE plpgsql STABLE
+  COST 100
+  ROWS 1000
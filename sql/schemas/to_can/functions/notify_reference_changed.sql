@@ -0,0 +1,10 @@
+CREATE OR REPLACE FUNCTION "to_can"."notify_reference_changed"()
+  RETURNS "pg_catalog"."trigger" AS $BODY$
+BEGIN
+    -- webhook_2can слушает канал и перечитывает снимок to_can.get_payment_resolution()
+    PERFORM pg_notify('to_can_reference_changed', TG_TABLE_SCHEMA || '.' || TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$BODY$
+  LANGUAGE plpgsql VOLATILE
+  COST 100
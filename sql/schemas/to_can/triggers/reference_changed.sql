@@ -0,0 +1,42 @@
+-- Уведомление webhook_2can об изменении справочников, участвующих в f_payment.
+-- FOR EACH STATEMENT: один NOTIFY на оператор, а не на строку.
+
+CREATE TRIGGER "trg_merchant_tap2go_reference_changed" AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "to_can"."merchant_tap2go"
+FOR EACH STATEMENT
+EXECUTE PROCEDURE "to_can"."notify_reference_changed"();
+
+CREATE TRIGGER "trg_firmservice_reference_changed" AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "common"."firmservice"
+FOR EACH STATEMENT
+EXECUTE PROCEDURE "to_can"."notify_reference_changed"();
+
+CREATE TRIGGER "trg_commparam_reference_changed" AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "common"."commparam"
+FOR EACH STATEMENT
+EXECUTE PROCEDURE "to_can"."notify_reference_changed"();
+
+CREATE TRIGGER "trg_merchant_reference_changed" AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "common"."merchant"
+FOR EACH STATEMENT
+EXECUTE PROCEDURE "to_can"."notify_reference_changed"();
+
+CREATE TRIGGER "trg_tranztarif_reference_changed" AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "common"."tranztarif"
+FOR EACH STATEMENT
+EXECUTE PROCEDURE "to_can"."notify_reference_changed"();
+
+CREATE TRIGGER "trg_breakesum_reference_changed" AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "common"."breakesum"
+FOR EACH STATEMENT
+EXECUTE PROCEDURE "to_can"."notify_reference_changed"();
+
+CREATE TRIGGER "trg_tarif_reference_changed" AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "common"."tarif"
+FOR EACH STATEMENT
+EXECUTE PROCEDURE "to_can"."notify_reference_changed"();
+
+CREATE TRIGGER "trg_info_reference_changed" AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "mytosb"."info"
+FOR EACH STATEMENT
+EXECUTE PROCEDURE "to_can"."notify_reference_changed"();
+
+CREATE TRIGGER "trg_users_reference_changed" AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "auth"."users"
+FOR EACH STATEMENT
+EXECUTE PROCEDURE "to_can"."notify_reference_changed"();
+
+CREATE TRIGGER "trg_ekassa_reference_changed" AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "ekassa"."ekassa"
+FOR EACH STATEMENT
+EXECUTE PROCEDURE "to_can"."notify_reference_changed"();
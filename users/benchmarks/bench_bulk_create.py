@@ -0,0 +1,155 @@
+"""
+POST /accounts/users/bulk: построчные вызовы create_user_bulk_stub в одной транзакции
+(как было) vs один вызов accounts.create_users_bulk (staging + три многострочных INSERT).
+
+Запуск (из users/, локальная БД с накачанными функциями, группами driver/courier и типом контакта phone):
+    python -m benchmarks.bench_bulk_create                       # 1k, 10k, 100k
+    python -m benchmarks.bench_bulk_create --sizes 1000 10000 --repeats 5
+
+Каждый замер идёт в транзакции, которая откатывается: БД после запуска не меняется.
+Старый путь — копия create_user_bulk_stub во временной схеме (pg_temp) с исправленной
+таблицей контактов, иначе сравнивать было бы не с чем.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from typing import List, Optional, Tuple
+
+import asyncpg
+from loguru import logger
+
+from src.db.codecs import register_json_codecs
+from src.db.queries import CREATE_USERS_BULK
+from src.settings import settings
+
+# Каждая DUPLICATE_EVERY-я строка повторяет телефон предыдущей — путь skipped тоже в замере
+DUPLICATE_EVERY = 20
+
+LEGACY_STUB = """
+CREATE OR REPLACE FUNCTION pg_temp.create_user_bulk_stub(p_payload jsonb)
+  RETURNS TABLE(status text, user_id uuid) AS $BODY$
+DECLARE
+    v_phone TEXT;
+    v_group_names TEXT[];
+    v_exists BOOLEAN;
+    v_new_user_id UUID;
+    v_contact_type_id INT;
+    group_name TEXT;
+    v_group_id INT2;
+BEGIN
+    v_phone := NULLIF(p_payload->>'phone', '');
+    v_group_names := ARRAY(SELECT jsonb_array_elements_text(p_payload->'group_names'));
+    SELECT EXISTS(
+        SELECT 1
+        FROM accounts.user_contacts c
+        JOIN accounts.contact_types ct ON c.contact_type_id = ct.id
+        WHERE ct.name = 'phone' AND c.value = v_phone AND c.is_active = true
+    ) INTO v_exists;
+    IF v_exists THEN
+        status := 'skipped';
+        user_id := NULL;
+        RETURN NEXT;
+        RETURN;
+    END IF;
+    INSERT INTO accounts.users (profile, password_hash)
+    VALUES (p_payload->'profile', NULL)
+    RETURNING id INTO v_new_user_id;
+    SELECT id INTO v_contact_type_id FROM accounts.contact_types WHERE name = 'phone';
+    PERFORM accounts.create_user_contact(v_new_user_id, v_contact_type_id, v_phone);
+    FOREACH group_name IN ARRAY v_group_names
+    LOOP
+        SELECT id INTO v_group_id FROM accounts.user_groups WHERE name = group_name AND is_active = true;
+        PERFORM accounts.add_user_to_group(v_new_user_id, v_group_id);
+    END LOOP;
+    status := 'created';
+    user_id := v_new_user_id;
+    RETURN NEXT;
+END;
+$BODY$ LANGUAGE plpgsql VOLATILE
+"""
+LEGACY_CALL = "SELECT status, user_id FROM pg_temp.create_user_bulk_stub($1::jsonb)"
+
+
+class _Rollback(Exception):
+    pass
+
+
+def make_batch(size: int) -> Tuple[List[str], List[Optional[str]]]:
+    # Диапазон +7 990 ... — заведомо не пересекается с реальными номерами в локальной БД
+    base = random.randrange(0, 9_000_000 - size)
+    phones = []
+    for n in range(size):
+        if n and n % DUPLICATE_EVERY == 0:
+            phones.append(phones[-1])
+        else:
+            phones.append(f"+7990{base + n:07d}")
+    return phones, [f"bench-{n}" for n in range(size)]
+
+
+async def run_legacy(conn: asyncpg.Connection, interface: str, phones, external_ids) -> None:
+    for phone, external_id in zip(phones, external_ids):
+        payload = {"phone": phone, "group_names": [interface], "profile": {"external_id": external_id}}
+        await conn.fetchrow(LEGACY_CALL, json.dumps(payload))
+
+
+async def run_set_based(conn: asyncpg.Connection, interface: str, phones, external_ids) -> None:
+    await conn.fetch(CREATE_USERS_BULK, phones, external_ids, [interface])
+
+
+async def timed(conn: asyncpg.Connection, repeats: int, runner, *args) -> float:
+    """Медиана, мс; каждый прогон откатывается."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        try:
+            async with conn.transaction():
+                await runner(conn, *args)
+                timings.append((time.perf_counter() - start) * 1000)
+                raise _Rollback
+        except _Rollback:
+            pass
+    return statistics.median(timings)
+
+
+async def bench(sizes: List[int], repeats: int, interface: str) -> None:
+    conn = await asyncpg.connect(str(settings.database_write_url))
+    await register_json_codecs(conn)
+    try:
+        await conn.execute(LEGACY_STUB)
+        for size in sizes:
+            phones, external_ids = make_batch(size)
+            # прогрев: планы plpgsql, staging-таблица сессии
+            await timed(conn, 1, run_set_based, interface, phones[:100], external_ids[:100])
+            await timed(conn, 1, run_legacy, interface, phones[:100], external_ids[:100])
+
+            set_ms = await timed(conn, repeats, run_set_based, interface, phones, external_ids)
+            legacy_ms = await timed(conn, repeats, run_legacy, interface, phones, external_ids)
+            logger.info(
+                f"{size} rows: per-row {legacy_ms:.0f} ms ({size / legacy_ms * 1000:.0f} rows/s), "
+                f"set-based {set_ms:.0f} ms ({size / set_ms * 1000:.0f} rows/s), "
+                f"x{legacy_ms / set_ms:.1f}"
+            )
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--interface", default="driver")
+    args = parser.parse_args()
+
+    # Минимальная настройка логгера (без файлов — только в консоль)
+    logger.remove()
+    logger.add(
+        sink=sys.stderr,
+        level="INFO",
+        format="<green>{time:HH:mm:ss}</green> | <level>{message}</level>"
+    )
+
+    asyncio.run(bench(args.sizes, args.repeats, args.interface))
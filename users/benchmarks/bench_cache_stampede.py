@@ -0,0 +1,130 @@
+"""
+GET /accounts/users/by-identifier: сколько запросов к БД стоит одновременный промах кэша
+по одному identifier (истёк TTL популярного пользователя) — без защиты и с single-flight
+в процессе + блокировкой в Redis между процессами (user_cache_coalescing_enabled).
+
+Запуск (из users/, нужен Redis из REDIS_URL; БД не нужна):
+    python -m benchmarks.bench_cache_stampede                          # 4 процесса × 50 запросов
+    python -m benchmarks.bench_cache_stampede --workers 8 --concurrency 100 --db-latency-ms 50
+
+БД заменена пулом-заглушкой с задержкой --db-latency-ms, который считает вызовы
+accounts.get_user_by_identifier_v1 во всех процессах. Перед каждым залпом ключ кэша удаляется,
+процессы стартуют залп одновременно (Barrier). L1 выключен (подписки на инвалидации нет) —
+замер только промахов Redis.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from loguru import logger
+
+from src.settings import settings
+
+IDENTIFIER = "+79160000000"
+
+
+class _CountingPool:
+    """Вместо asyncpg.Pool: fetchrow с задержкой и общим на все процессы счётчиком вызовов."""
+
+    def __init__(self, calls, latency: float):
+        self.calls = calls
+        self.latency = latency
+        self.user_id = uuid4()
+
+    def acquire(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def fetchrow(self, query, identifier):
+        with self.calls.get_lock():
+            self.calls.value += 1
+        await asyncio.sleep(self.latency)
+        now = datetime.now(timezone.utc)
+        return {
+            "id": self.user_id, "created_at": now, "updated_at": now, "is_active": True,
+            "profile": '{"name": "bench"}', "groups": "[]",
+            "contacts": f'[{{"id": "{uuid4()}", "type": "phone", "value": "{identifier}"}}]',
+        }
+
+
+async def _worker_bursts(rank, coalescing, args, calls, barrier, latencies) -> None:
+    from src.cashe import user_cashe
+    from src.db.redis import redis
+
+    settings.user_cache_coalescing_enabled = coalescing
+    pool = _CountingPool(calls, args.db_latency_ms / 1000)
+    loop = asyncio.get_running_loop()
+
+    async def one() -> float:
+        start = time.perf_counter()
+        await user_cashe.get_user_by_identifier_cached(IDENTIFIER, pool)
+        return time.perf_counter() - start
+
+    for _ in range(args.bursts):
+        await loop.run_in_executor(None, barrier.wait)
+        if rank == 0:
+            await redis.delete(
+                f"{user_cashe.CACHE_KEY_PREFIX}{IDENTIFIER}", f"{user_cashe.LOCK_KEY_PREFIX}{IDENTIFIER}",
+            )
+        await loop.run_in_executor(None, barrier.wait)
+        latencies.extend(await asyncio.gather(*(one() for _ in range(args.concurrency))))
+    await redis.aclose()
+
+def _run_worker(rank, coalescing, args, calls, barrier, latencies) -> None:
+    logger.remove()
+    asyncio.run(_worker_bursts(rank, coalescing, args, calls, barrier, latencies))
+
+
+def bench(coalescing: bool, args) -> None:
+    ctx = multiprocessing.get_context("spawn")
+    calls = ctx.Value("i", 0)
+    barrier = ctx.Barrier(args.workers)
+    with ctx.Manager() as manager:
+        latencies = manager.list()
+        workers = [
+            ctx.Process(target=_run_worker, args=(rank, coalescing, args, calls, barrier, latencies))
+            for rank in range(args.workers)
+        ]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        if any(w.exitcode for w in workers):
+            raise SystemExit("worker failed")
+        latencies = sorted(latencies)
+
+    label = "coalescing + lock" if coalescing else "no protection"
+    logger.bind(bench=True).info(
+        f"{label}: {calls.value / args.bursts:.1f} DB calls per burst of "
+        f"{args.workers * args.concurrency} requests ({args.workers} workers), "
+        f"latency p50 {statistics.median(latencies) * 1000:.0f} ms, max {latencies[-1] * 1000:.0f} ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4, help="процессов (как воркеров uvicorn)")
+    parser.add_argument("--concurrency", type=int, default=50, help="одновременных запросов в процессе")
+    parser.add_argument("--bursts", type=int, default=5)
+    parser.add_argument("--db-latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(
+        sink=sys.stderr,
+        level="INFO",
+        format="<green>{time:HH:mm:ss}</green> | <level>{message}</level>",
+        filter=lambda record: "bench" in record["extra"],
+    )
+    bench(False, args)
+    bench(True, args)
@@ -0,0 +1,130 @@
+"""
+GET /accounts/users: OFFSET-пагинация (get_users_with_relations + count_users)
+vs keyset (get_users_with_relations_after) на первой и глубокой странице.
+
+Запуск (из users/, локальная БД с накачанными функциями и индексом idx_users_created_at_id):
+    python -m benchmarks.bench_pagination --seed 1000000      # один раз: синтетические пользователи
+    python -m benchmarks.bench_pagination --page 10000 --size 100
+    python -m benchmarks.bench_pagination --cleanup           # удалить синтетических пользователей
+
+Синтетические пользователи помечаются profile->>'bench' = 'pagination'; --seed только для локальной БД.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+import asyncpg
+from loguru import logger
+
+from src.db.codecs import register_json_codecs
+from src.db.queries import (
+    COUNT_USERS,
+    ESTIMATE_USERS,
+    GET_USERS_WITH_RELATIONS,
+    GET_USERS_WITH_RELATIONS_AFTER,
+)
+from src.settings import settings
+from src.utils.cursor import FIRST_PAGE_CURSOR
+
+SEED_QUERY = """
+INSERT INTO accounts.users (profile, created_at, updated_at)
+SELECT jsonb_build_object('bench', 'pagination', 'n', g),
+       now() - g * interval '1 second',
+       now() - g * interval '1 second'
+FROM generate_series(1, $1) AS g
+"""
+CLEANUP_QUERY = "DELETE FROM accounts.users WHERE profile->>'bench' = 'pagination'"
+# Курсор глубокой страницы берём заранее: в реальном клиенте он пришёл бы с предыдущей страницы
+CURSOR_AT_OFFSET = """
+SELECT created_at, id FROM accounts.users
+ORDER BY created_at DESC, id DESC
+OFFSET $1 LIMIT 1
+"""
+
+
+async def timed(conn: asyncpg.Connection, repeats: int, query: str, *args) -> float:
+    """Медиана, мс."""
+    await conn.fetch(query, *args)  # прогрев: план и страницы в кэше
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        await conn.fetch(query, *args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+async def bench(page: int, size: int, repeats: int) -> None:
+    conn = await asyncpg.connect(str(settings.database_read_url))
+    await register_json_codecs(conn)
+    try:
+        total = await conn.fetchval(ESTIMATE_USERS)
+        logger.info(f"accounts.users ≈ {total} rows")
+        offset = (page - 1) * size
+        deep_cursor = await conn.fetchrow(CURSOR_AT_OFFSET, offset - 1)
+        if deep_cursor is None:
+            logger.error(f"Not enough users for page {page} (size {size}); run with --seed")
+            return
+
+        count_ms = await timed(conn, repeats, COUNT_USERS)
+        estimate_ms = await timed(conn, repeats, ESTIMATE_USERS)
+        for label, page_offset, cursor in (
+            ("page 1", 0, FIRST_PAGE_CURSOR),
+            (f"page {page}", offset, (deep_cursor["created_at"], deep_cursor["id"])),
+        ):
+            offset_ms = await timed(conn, repeats, GET_USERS_WITH_RELATIONS, size, page_offset)
+            keyset_ms = await timed(conn, repeats, GET_USERS_WITH_RELATIONS_AFTER, size + 1, *cursor)
+            logger.info(
+                f"{label}: offset {offset_ms:.2f} ms + count {count_ms:.2f} ms, "
+                f"keyset {keyset_ms:.2f} ms + estimate {estimate_ms:.2f} ms"
+            )
+    finally:
+        await conn.close()
+
+
+async def seed(count: int) -> None:
+    conn = await asyncpg.connect(str(settings.database_write_url))
+    try:
+        await conn.execute(SEED_QUERY, count)
+        await conn.execute("ANALYZE accounts.users")
+        logger.info(f"Inserted {count} synthetic users")
+    finally:
+        await conn.close()
+
+
+async def cleanup() -> None:
+    conn = await asyncpg.connect(str(settings.database_write_url))
+    try:
+        status = await conn.execute(CLEANUP_QUERY)
+        await conn.execute("ANALYZE accounts.users")
+        logger.info(f"Removed synthetic users: {status}")
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--page", type=int, default=10000)
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--seed", type=int, help="вставить N синтетических пользователей и выйти")
+    parser.add_argument("--cleanup", action="store_true", help="удалить синтетических пользователей и выйти")
+    args = parser.parse_args()
+    if args.page < 2:
+        parser.error("--page must be >= 2")
+
+    # Минимальная настройка логгера (без файлов — только в консоль)
+    logger.remove()
+    logger.add(
+        sink=sys.stderr,
+        level="INFO",
+        format="<green>{time:HH:mm:ss}</green> | <level>{message}</level>"
+    )
+
+    if args.seed:
+        asyncio.run(seed(args.seed))
+    elif args.cleanup:
+        asyncio.run(cleanup())
+    else:
+        asyncio.run(bench(args.page, args.size, args.repeats))
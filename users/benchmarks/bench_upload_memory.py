@@ -0,0 +1,140 @@
+"""
+POST /accounts/users/bulk/upload: пик памяти и время на файле ~10 МБ.
+До — read_file_to_dicts (файл целиком в bytes → pandas DataFrame → list[dict]) и
+построчная валидация на event loop; после — потоковый конвейер bulk_create_users_from_file.
+
+Запуск (из users/):
+    python -m benchmarks.bench_upload_memory                      # CSV 10 МБ
+    python -m benchmarks.bench_upload_memory --format xlsx --size-mb 10
+    python -m benchmarks.bench_upload_memory --workers 2          # валидация в процессах
+
+Без БД: запись в БД заменена пулом-заглушкой, который отвечает "created" на каждую строку, —
+в замер попадают только чтение, валидация и конвейер. Пик памяти — tracemalloc в этом процессе
+(при --workers память воркеров не учитывается, в них живёт не больше порции).
+Для "до" нужен pandas (в requirements его нет): без него замер пропускается.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from fastapi import UploadFile
+from loguru import logger
+
+from src.schemas.users import UploadResult
+from src.services import users_upload
+from src.services.users_upload import REQUIRED_COLUMNS, bulk_create_users_from_file
+from src.settings import settings
+from src.utils.file_parsing import normalize_columns
+from src.utils.upload_validation import validate_upload_rows
+from src.utils.xlsx_stream import XlsxStreamWriter
+
+GROUPS = ("driver", "courier", "client,driver")
+
+
+def _rows(size_bytes: int):
+    written = 0
+    while written < size_bytes:
+        row = (f"+7916{random.randrange(10_000_000):07d}", random.choice(GROUPS), "bench upload row")
+        written += sum(len(v) for v in row) + 3
+        yield row
+
+def make_file(directory: Path, fmt: str, size_mb: int) -> Path:
+    header = ("phone", "user_groups", "comment")
+    path = directory / f"users.{fmt}"
+    if fmt == "csv":
+        with path.open("w", encoding="utf-8") as f:
+            f.write(",".join(header) + "\n")
+            for row in _rows(size_mb * 1024 * 1024):
+                f.write(f'{row[0]},"{row[1]}",{row[2]}\n')
+    else:
+        # размер сжатого xlsx не зависит от числа строк линейно — добираем строками до size_mb
+        writer = XlsxStreamWriter("users")
+        with path.open("wb") as f:
+            f.write(writer.write_rows([header]))
+            while f.tell() < size_mb * 1024 * 1024:
+                f.write(writer.write_rows(_rows(256 * 1024)))
+            f.write(writer.close())
+    return path
+
+
+class _NullPool:
+    """Вместо asyncpg.Pool: каждая строка — created."""
+
+    async def fetch(self, query, phones, external_ids, group_names):
+        return [{"idx": n, "status": "created", "user_id": None, "reason": None} for n in range(1, len(phones) + 1)]
+
+
+async def before(path: Path) -> UploadResult:
+    import pandas as pd
+
+    contents = path.read_bytes()
+    if path.suffix == ".csv":
+        df = pd.read_csv(BytesIO(contents), encoding="utf-8-sig", dtype=str)
+    else:
+        df = pd.read_excel(BytesIO(contents), dtype=str)
+    df.columns = normalize_columns(list(df.columns))
+    rows: List[Dict] = df.to_dict(orient="records")
+    valid, errors = validate_upload_rows(
+        [(line, {k: row[k] for k in REQUIRED_COLUMNS}) for line, row in enumerate(rows, start=2)],
+        settings.users_upload_phone_region,
+    )
+    return UploadResult(success_count=len(valid), error_count=len(errors), total_rows=len(rows), errors=errors)
+
+async def after(path: Path) -> UploadResult:
+    with path.open("rb") as f:
+        return await bulk_create_users_from_file(UploadFile(file=f, filename=path.name), _NullPool())
+
+
+async def measure(label: str, run: Callable, path: Path) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = await run(path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    logger.bind(bench=True).info(
+        f"{label}: {result.total_rows} rows ({result.success_count} ok, {result.error_count} errors) "
+        f"in {elapsed:.1f} s, peak {peak / 1024 / 1024:.1f} MB"
+    )
+
+
+async def bench(fmt: str, size_mb: int) -> None:
+    with tempfile.TemporaryDirectory(prefix="bench_upload_") as tmp:
+        path = make_file(Path(tmp), fmt, size_mb)
+        logger.bind(bench=True).info(f"{path.name}: {path.stat().st_size / 1024 / 1024:.1f} MB")
+        try:
+            await measure("before (pandas, whole file)", before, path)
+        except ImportError:
+            logger.bind(bench=True).warning("before: pandas is not installed, skipped")
+        await measure(f"after (chunks of {settings.users_upload_chunk_size})", after, path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--format", choices=("csv", "xlsx"), default="csv")
+    parser.add_argument("--size-mb", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=0, help="процессов для валидации (0 — пул потоков)")
+    args = parser.parse_args()
+
+    logger.remove()
+    # Прогресс конвейера не нужен — в консоль только отчёт
+    logger.add(
+        sink=sys.stderr,
+        level="INFO",
+        format="<green>{time:HH:mm:ss}</green> | <level>{message}</level>",
+        filter=lambda record: "bench" in record["extra"],
+    )
+
+    settings.users_upload_workers = args.workers
+    users_upload.init_upload_workers()
+    try:
+        asyncio.run(bench(args.format, args.size_mb))
+    finally:
+        users_upload.close_upload_workers()
@@ -0,0 +1,215 @@
+"""
+Bloom-фильтр значений контактов (phone, email, second_login) для кэша by-identifier:
+«точно нет» — 404 без Postgres. Битовая карта одна на все процессы (API и воркер импортов) —
+строка Redis; проверка и добавление k бит — Lua-скриптами за один вызов.
+
+Размер (m бит) и число хэшей (k) считаются из user_cache_bloom_capacity и
+user_cache_bloom_error_rate и входят в имена ключей: процесс с другими настройками
+не читает чужую карту, а до её пересборки просто идёт в БД.
+"""
+import asyncio
+import math
+import time
+from hashlib import blake2b
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from asyncpg import Pool
+from loguru import logger
+from redis.exceptions import RedisError
+
+from src.db.queries import LIST_IDENTIFIER_VALUES
+from src.db.redis import redis
+from src.metrics import BLOOM_BYTES, BLOOM_ESTIMATED_ERROR_RATE, BLOOM_ITEMS
+from src.settings import settings
+
+REBUILD_BATCH_SIZE = 10_000
+REBUILD_LOCK_SECONDS = 600
+MAINTENANCE_INTERVAL_SECONDS = 60
+
+
+def bloom_parameters(capacity: int, error_rate: float) -> Tuple[int, int]:
+    """(m, k) для capacity значений при доле ложных срабатываний error_rate; m кратно 8."""
+    m = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+    m = (m + 7) // 8 * 8
+    k = max(1, round(m / capacity * math.log(2)))
+    return m, k
+
+def estimated_error_rate(items: int, m: int, k: int) -> float:
+    return (1 - math.exp(-k * items / m)) ** k
+
+def bit_offsets(value: str, m: int, k: int) -> List[int]:
+    # Двойное хэширование: k позиций из одного blake2b (одинаково во всех процессах, в отличие от hash())
+    digest = blake2b(value.encode(), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:], "little") | 1
+    return [(h1 + i * h2) % m for i in range(k)]
+
+def _is_uuid(identifier: str) -> bool:
+    # UUID get_user_by_identifier_v1 ищет по users.id, в фильтр такие значения не попадают
+    try:
+        UUID(identifier)
+    except ValueError:
+        return False
+    return True
+
+
+M, K = bloom_parameters(settings.user_cache_bloom_capacity, settings.user_cache_bloom_error_rate)
+BLOOM_KEY = f"user_identifier_bloom:{M}:{K}"
+BUILD_KEY = f"{BLOOM_KEY}:build"
+PENDING_KEY = f"{BLOOM_KEY}:pending"  # добавления, пришедшие во время пересборки
+META_KEY = f"{BLOOM_KEY}:meta"
+REBUILD_LOCK_KEY = f"{BLOOM_KEY}:lock"
+
+# 1 — все k бит стоят (значение, возможно, есть), 0 — точно нет, -1 — карты нет (ещё не построена)
+_CHECK_SCRIPT = redis.register_script("""
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return -1
+end
+for i = 1, #ARGV do
+    if redis.call('GETBIT', KEYS[1], ARGV[i]) == 0 then
+        return 0
+    end
+end
+return 1
+""")
+# KEYS: карта, pending, meta; ARGV[1] — число значений, дальше позиции бит.
+# Карты, которой нет, не создаём: её построит пересборка.
+_ADD_SCRIPT = redis.register_script("""
+for j = 1, 2 do
+    if redis.call('EXISTS', KEYS[j]) == 1 then
+        for i = 2, #ARGV do
+            redis.call('SETBIT', KEYS[j], ARGV[i], 1)
+        end
+    end
+end
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('HINCRBY', KEYS[3], 'items', ARGV[1])
+end
+return 0
+""")
+# Атомарная подмена: собранная карта + добавления за время сборки → рабочая карта
+_SWAP_SCRIPT = redis.register_script("""
+redis.call('BITOP', 'OR', KEYS[1], KEYS[1], KEYS[2])
+redis.call('RENAME', KEYS[1], KEYS[3])
+redis.call('DEL', KEYS[2])
+redis.call('HSET', KEYS[4], 'items', ARGV[1], 'built_at', ARGV[2])
+return 0
+""")
+
+_maintenance: Optional[asyncio.Task] = None
+
+
+async def check(identifier: str) -> Optional[bool]:
+    """
+    False — такого phone/email/second_login точно нет; True — возможно есть;
+    None — не проверяли (фильтр выключен или ещё не построен, UUID).
+    """
+    if not settings.user_cache_bloom_enabled or _is_uuid(identifier):
+        return None
+    result = await _CHECK_SCRIPT(keys=[BLOOM_KEY], args=bit_offsets(identifier, M, K))
+    return None if result < 0 else bool(result)
+
+async def add_identifiers(values: Iterable[str]) -> None:
+    """
+    Новые значения контактов. Пропущенное добавление — ложный 404 до пересборки,
+    поэтому при ошибке Redis карта удаляется (до пересборки все промахи идут в БД).
+    """
+    if not settings.user_cache_bloom_enabled:
+        return
+    values = [v for v in values if not _is_uuid(v)]
+    if not values:
+        return
+    offsets = [off for v in values for off in bit_offsets(v, M, K)]
+    try:
+        await _ADD_SCRIPT(keys=[BLOOM_KEY, PENDING_KEY, META_KEY], args=[len(values), *offsets])
+    except RedisError as e:
+        logger.error(f"Cannot add {len(values)} identifiers to bloom filter, dropping it: {e}")
+        await drop_identifier_bloom()
+
+async def drop_identifier_bloom() -> None:
+    """Удаляет карту: до пересборки (_maintain, не позже MAINTENANCE_INTERVAL_SECONDS) промахи идут в БД."""
+    try:
+        await redis.delete(BLOOM_KEY)
+    except RedisError as e:
+        logger.error(f"Cannot drop bloom filter: {e}")
+
+
+async def rebuild_identifier_bloom(pool: Pool) -> int:
+    """
+    Пересборка из accounts.list_identifier_values() (серверный курсор, один снимок) в памяти процесса,
+    затем атомарная подмена карты в Redis. Возвращает число значений.
+    """
+    # Пустая карта pending до снимка: контакт, закоммиченный после снимка, добавится в неё
+    await redis.delete(PENDING_KEY)
+    await redis.setbit(PENDING_KEY, M - 1, 0)
+    await redis.expire(PENDING_KEY, REBUILD_LOCK_SECONDS)
+
+    bits = bytearray(M // 8)
+    items = 0
+    started = time.perf_counter()
+    async with pool.acquire() as conn:
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            cursor = await conn.cursor(LIST_IDENTIFIER_VALUES)
+            while True:
+                records = await cursor.fetch(REBUILD_BATCH_SIZE)
+                if not records:
+                    break
+                for record in records:
+                    for off in bit_offsets(record["value"], M, K):
+                        bits[off >> 3] |= 0x80 >> (off & 7)  # порядок бит как у SETBIT: старший бит — 0
+                items += len(records)
+
+    await redis.set(BUILD_KEY, bytes(bits), ex=REBUILD_LOCK_SECONDS)
+    await _SWAP_SCRIPT(keys=[BUILD_KEY, PENDING_KEY, BLOOM_KEY, META_KEY], args=[items, time.time()])
+    logger.info(
+        f"Identifier bloom filter rebuilt: {items} values in {time.perf_counter() - started:.1f} s, "
+        f"{M // 8 / 1024 / 1024:.1f} MB, k={K}, estimated error rate {estimated_error_rate(items, M, K):.4f}"
+    )
+    return items
+
+def _report(meta: Dict[str, str]) -> None:
+    items = int(meta.get("items", 0))
+    BLOOM_ITEMS.set(items)
+    BLOOM_BYTES.set(M // 8)
+    BLOOM_ESTIMATED_ERROR_RATE.set(estimated_error_rate(items, M, K))
+
+async def _maintain(pool: Pool) -> None:
+    """Пересборка раз в user_cache_bloom_rebuild_interval_seconds (или если карты нет) — одним процессом."""
+    while True:
+        try:
+            meta = await redis.hgetall(META_KEY)
+            stale = (
+                not meta
+                or not await redis.exists(BLOOM_KEY)
+                or time.time() - float(meta["built_at"]) > settings.user_cache_bloom_rebuild_interval_seconds
+            )
+            if stale and await redis.set(REBUILD_LOCK_KEY, "1", nx=True, ex=REBUILD_LOCK_SECONDS):
+                try:
+                    await rebuild_identifier_bloom(pool)
+                finally:
+                    await redis.delete(REBUILD_LOCK_KEY)
+                meta = await redis.hgetall(META_KEY)
+            _report(meta)
+        except Exception as e:
+            logger.error(f"Identifier bloom filter maintenance failed: {e}")
+        await asyncio.sleep(MAINTENANCE_INTERVAL_SECONDS)
+
+def init_identifier_bloom(pool: Pool) -> None:
+    global _maintenance
+    if _maintenance is None and settings.user_cache_bloom_enabled:
+        logger.info(
+            f"Identifier bloom filter: capacity {settings.user_cache_bloom_capacity}, "
+            f"error rate {settings.user_cache_bloom_error_rate}, {M // 8 / 1024 / 1024:.1f} MB, k={K}"
+        )
+        _maintenance = asyncio.create_task(_maintain(pool))
+
+async def close_identifier_bloom() -> None:
+    global _maintenance
+    if _maintenance is not None:
+        _maintenance.cancel()
+        try:
+            await _maintenance
+        except asyncio.CancelledError:
+            pass
+        _maintenance = None
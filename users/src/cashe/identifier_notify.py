@@ -0,0 +1,74 @@
+"""
+Значения контактов, созданные не через users (регистрация в auth, ручные вставки): триггеры на
+accounts.user_contacts шлют NOTIFY accounts_identifiers_added, а процесс API делает то же, что
+register_identifiers для своих записей, — снимает отрицательные записи и добавляет значения в Bloom-фильтр.
+"""
+import asyncio
+import json
+from typing import Optional, Set
+
+import asyncpg
+from loguru import logger
+
+from src.cashe.user_cashe import forget_missing_identifiers, register_identifiers
+from src.settings import settings
+
+NOTIFY_CHANNEL = "accounts_identifiers_added"
+RECONNECT_SECONDS = 5
+
+_listener: Optional[asyncio.Task] = None
+_handlers: Set[asyncio.Task] = set()
+
+
+def _spawn(coro) -> None:
+    task = asyncio.create_task(coro)
+    _handlers.add(task)
+    task.add_done_callback(_handlers.discard)
+
+def _on_notify(connection, pid, channel, payload) -> None:
+    if not payload:
+        # В пачке было слишком длинное значение — какие именно, неизвестно
+        _spawn(forget_missing_identifiers())
+        return
+    _spawn(register_identifiers(json.loads(payload)))
+
+async def _listen(dsn: str) -> None:
+    connected_before = False
+    while True:
+        conn: Optional[asyncpg.Connection] = None
+        lost = asyncio.Event()
+        try:
+            conn = await asyncpg.connect(dsn)
+            conn.add_termination_listener(lambda _: lost.set())
+            await conn.add_listener(NOTIFY_CHANNEL, _on_notify)
+            if connected_before:
+                # Пока LISTEN не было, добавления могли пройти мимо
+                await forget_missing_identifiers()
+            connected_before = True
+            logger.info(f"Listening for {NOTIFY_CHANNEL}")
+            await lost.wait()
+            logger.warning(f"Lost LISTEN connection for {NOTIFY_CHANNEL}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"{NOTIFY_CHANNEL} listener failed: {e}")
+        finally:
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+        await asyncio.sleep(RECONNECT_SECONDS)
+
+def init_identifier_listener() -> None:
+    """LISTEN на мастере (NOTIFY уходит при коммите на нём); нужен, только если есть что чистить."""
+    global _listener
+    if _listener is None and (settings.user_cache_negative_ttl_seconds > 0 or settings.user_cache_bloom_enabled):
+        _listener = asyncio.create_task(_listen(str(settings.database_write_url)))
+
+async def close_identifier_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.cancel()
+        try:
+            await _listener
+        except asyncio.CancelledError:
+            pass
+        _listener = None
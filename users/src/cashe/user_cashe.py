@@ -1,50 +1,382 @@
-import json
-from uuid import UUID
-from asyncpg import Pool
+import asyncio
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID, uuid4
+from asyncpg import Pool, Record
 from loguru import logger
+from redis.exceptions import RedisError
 from src.db.redis import redis
-from src.utils.json_utils import maybe_json_dumps, maybe_json_loads
+from src.db.queries import GET_USER_BY_IDENTIFIER, GET_USERS_BY_IDENTIFIERS
+from src.metrics import (
+    CACHE_ENTRIES,
+    USER_CACHE_COALESCED,
+    USER_CACHE_HIT,
+    USER_CACHE_L1_HIT,
+    USER_CACHE_L1_MISS,
+    USER_CACHE_LOCK_WAIT,
+    USER_CACHE_MISS,
+    USER_CACHE_NEGATIVE_HIT,
+    USER_BLOOM_FALSE_POSITIVE,
+    USER_BLOOM_NEGATIVE,
+)
+from src.settings import settings
+from src.cashe import identifier_bloom
+from src.cashe.local_cache import LocalCache
+from src.utils.json_utils import maybe_json_loads
 from src.exceptions.exceptions import UserNotFound
 from src.schemas.users import UserDetailRead
 
-CACHE_TTL_SECONDS = 600  # 10 минут
+# Ключи Redis: запись по идентификатору (UUID, phone, email, second_login), обратный индекс
+# user_id → ключи его записей и маркер «только что инвалидирован» (см. _CACHE_SET_SCRIPT)
+CACHE_KEY_PREFIX = "user_by_identifier:"
+INDEX_KEY_PREFIX = "user_cache_keys:"
+INVALIDATED_KEY_PREFIX = "user_cache_invalidated:"
+LOCK_KEY_PREFIX = "user_cache_lock:"
+NOT_FOUND_KEY_PREFIX = "user_not_found:"  # отрицательная запись: такого identifier нет
+FLUSH_ALL = "*"  # сообщение в канал инвалидаций: очистить L1 целиком
+
+# Запись в кэш атомарно с индексом. Пока стоит маркер инвалидации, не пишем: значение могло быть
+# прочитано из БД до изменения пользователя и без маркера прожило бы весь TTL.
+_CACHE_SET_SCRIPT = redis.register_script("""
+if redis.call('EXISTS', KEYS[3]) == 1 then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+redis.call('SADD', KEYS[2], KEYS[1])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+return 1
+""")
+# Снять блокировку, только если она ещё наша (могла истечь и достаться другому воркеру)
+_RELEASE_LOCK_SCRIPT = redis.register_script("""
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+""")
+
+# L1: identifier → готовый UserDetailRead, тег — user_id (инвалидация по всем идентификаторам сразу)
+_l1 = LocalCache(settings.user_cache_l1_max_size, settings.user_cache_l1_ttl_seconds)
+CACHE_ENTRIES.labels("user_by_identifier_l1").set_function(lambda: len(_l1))
+# L1 используется только пока подписка на инвалидации жива: иначе изменение
+# пользователя в другом процессе мы бы не увидели до истечения TTL
+_l1_active = False
+# Счётчик инвалидаций: значение, прочитанное до Redis/БД, не кладём в L1, если за это время
+# пришла инвалидация (иначе L1 мог бы сохранить уже устаревшую запись до конца TTL)
+_invalidations = 0
+_listener: Optional[asyncio.Task] = None
+# Single-flight: identifier → идущая загрузка из БД, одновременные промахи ждут её
+_inflight: Dict[str, "asyncio.Task[UserDetailRead]"] = {}
+
 
 async def get_user_by_identifier_cached(identifier: str, pool: Pool) -> UserDetailRead:
-    cache_key = f"user_by_id:{identifier}"
-    cached = await redis.get(cache_key)
+    seen_invalidations = _invalidations
+    if _l1_active:
+        user = _l1.get(identifier)
+        if user is not None:
+            USER_CACHE_L1_HIT.inc()
+            return user
+        USER_CACHE_L1_MISS.inc()
+
+    cached, not_found = await _get_cached(identifier)
     if cached:
+        USER_CACHE_HIT.inc()
         logger.debug(f"Cache hit for identifier: {identifier}")
-        data = json.loads(cached)
-        data["profile"] = maybe_json_loads(data.get("profile"))
-        return UserDetailRead(**data)
+        user = UserDetailRead.model_validate_json(cached)
+        _remember(identifier, user, seen_invalidations)
+        return user
+    if not_found:
+        USER_CACHE_NEGATIVE_HIT.inc()
+        raise UserNotFound(user_id=identifier)
+    USER_CACHE_MISS.inc()
+
+    bloom = await identifier_bloom.check(identifier)
+    if bloom is False:
+        USER_BLOOM_NEGATIVE.inc()
+        raise UserNotFound(user_id=identifier)
+
+    try:
+        if settings.user_cache_coalescing_enabled:
+            user = await _load_coalesced(identifier, pool)
+        else:
+            user = await _load(identifier, pool)
+    except UserNotFound:
+        if bloom:
+            USER_BLOOM_FALSE_POSITIVE.inc()
+        raise
+    _remember(identifier, user, seen_invalidations)
+    return user
+
+
+async def _get_cached(identifier: str) -> Tuple[Optional[str], Optional[str]]:
+    """(JSON пользователя, отрицательная запись) одним MGET."""
+    return await redis.mget(f"{CACHE_KEY_PREFIX}{identifier}", f"{NOT_FOUND_KEY_PREFIX}{identifier}")
+
+async def _load_coalesced(identifier: str, pool: Pool) -> UserDetailRead:
+    task = _inflight.get(identifier)
+    if task is None:
+        task = asyncio.ensure_future(_load_locked(identifier, pool))
+        _inflight[identifier] = task
+        task.add_done_callback(lambda t: _forget_inflight(identifier, t))
+    else:
+        USER_CACHE_COALESCED.inc()
+    # shield: отменённый клиент не отменяет загрузку для остальных ожидающих
+    return await asyncio.shield(task)
 
+def _forget_inflight(identifier: str, task: asyncio.Task) -> None:
+    if _inflight.get(identifier) is task:
+        del _inflight[identifier]
+    if not task.cancelled():
+        task.exception()  # если ждать было уже некому — не логировать "exception was never retrieved"
+
+async def _load_locked(identifier: str, pool: Pool) -> UserDetailRead:
+    """
+    Между воркерами: в БД идёт только владелец короткой блокировки user_cache_lock:{identifier},
+    остальные до user_cache_lock_wait_ms ждут его запись в Redis, потом читают из БД сами.
+    """
+    lock_key = f"{LOCK_KEY_PREFIX}{identifier}"
+    token = uuid4().hex
+    locked = await redis.set(lock_key, token, nx=True, px=settings.user_cache_lock_ttl_ms)
+    if not locked:
+        USER_CACHE_LOCK_WAIT.inc()
+        cached, not_found = await _wait_for_cache(identifier)
+        if cached:
+            return UserDetailRead.model_validate_json(cached)
+        if not_found:
+            raise UserNotFound(user_id=identifier)
+    try:
+        return await _load(identifier, pool)
+    finally:
+        if locked:
+            await _RELEASE_LOCK_SCRIPT(keys=[lock_key], args=[token])
+
+async def _wait_for_cache(identifier: str) -> Tuple[Optional[str], Optional[str]]:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.user_cache_lock_wait_ms / 1000
+    while loop.time() < deadline:
+        await asyncio.sleep(settings.user_cache_lock_poll_ms / 1000)
+        cached, not_found = await _get_cached(identifier)
+        if cached or not_found:
+            return cached, not_found
+    return None, None
+
+async def _load(identifier: str, pool: Pool) -> UserDetailRead:
+    """Чтение из БД и запись в Redis."""
     # Запрос к БД через функцию
     async with pool.acquire() as conn:
-        row = await conn.fetchrow(
-            "SELECT * FROM accounts.get_user_by_identifier_v1($1)",
-            identifier
-        )
-        if not row:
-            raise UserNotFound(user_id=identifier)
+        row = await conn.fetchrow(GET_USER_BY_IDENTIFIER, identifier)
+    if not row:
+        if settings.user_cache_negative_ttl_seconds > 0:
+            await redis.set(f"{NOT_FOUND_KEY_PREFIX}{identifier}", "1", ex=settings.user_cache_negative_ttl_seconds)
+        raise UserNotFound(user_id=identifier)
+
+    user = _user_from_row(row)
+    # Кэшируем вместе с обратным индексом user_id → ключи
+    stored = await _CACHE_SET_SCRIPT(
+        keys=_cache_set_keys(identifier, user), args=[user.model_dump_json(), settings.user_cache_ttl_seconds],
+    )
+    if stored:
+        logger.info(f"Cached user by identifier: {identifier}")
+    return user
+
+def _user_from_row(row: Record) -> UserDetailRead:
+    return UserDetailRead(
+        id=row["id"],
+        created_at=row["created_at"],
+        updated_at=row["updated_at"],
+        is_active=row["is_active"],
+        profile=maybe_json_loads(row["profile"]),
+        groups=maybe_json_loads(row["groups"]),
+        contacts=maybe_json_loads(row["contacts"]),
+    )
 
-    user_dict = {
-        "id": row["id"],
-        "created_at": row["created_at"],
-        "updated_at": row["updated_at"],
-        "is_active": row["is_active"],
-        "profile": row["profile"],
-        "groups": row["groups"],
-        "contacts": row["contacts"],
-    }
+def _cache_set_keys(identifier: str, user: UserDetailRead) -> List[str]:
+    return [f"{CACHE_KEY_PREFIX}{identifier}", f"{INDEX_KEY_PREFIX}{user.id}", f"{INVALIDATED_KEY_PREFIX}{user.id}"]
 
-    # Кэшируем
-    cache_data = user_dict.copy()
-    cache_data["profile"] = maybe_json_dumps(cache_data["profile"])
-    await redis.setex(cache_key, CACHE_TTL_SECONDS, json.dumps(cache_data, default=str))
-    logger.info(f"Cached user by identifier: {identifier}")
-    return UserDetailRead(**user_dict)
+
+async def get_users_by_identifiers_cached(
+        identifiers: List[str],
+        pool: Pool,
+) -> Dict[str, Optional[UserDetailRead]]:
+    """
+    Пачка identifier: L1, затем один MGET (записи и отрицательные записи), остальное — одним
+    accounts.get_users_by_identifiers_v1; найденное и ненайденное пишется в Redis одним pipeline.
+    Возвращает identifier → пользователь (None — не найден); повторы во входе схлопываются.
+    """
+    seen_invalidations = _invalidations
+    result: Dict[str, Optional[UserDetailRead]] = {}
+    pending = list(dict.fromkeys(identifiers))
+    if _l1_active:
+        misses = []
+        for identifier in pending:
+            user = _l1.get(identifier)
+            if user is None:
+                misses.append(identifier)
+            else:
+                result[identifier] = user
+        USER_CACHE_L1_HIT.inc(len(pending) - len(misses))
+        USER_CACHE_L1_MISS.inc(len(misses))
+        pending = misses
+    if not pending:
+        return result
+
+    values = await redis.mget(
+        *(f"{CACHE_KEY_PREFIX}{identifier}" for identifier in pending),
+        *(f"{NOT_FOUND_KEY_PREFIX}{identifier}" for identifier in pending),
+    )
+    misses = []
+    for identifier, cached, not_found in zip(pending, values, values[len(pending):]):
+        if cached:
+            USER_CACHE_HIT.inc()
+            result[identifier] = user = UserDetailRead.model_validate_json(cached)
+            _remember(identifier, user, seen_invalidations)
+        elif not_found:
+            USER_CACHE_NEGATIVE_HIT.inc()
+            result[identifier] = None
+        else:
+            misses.append(identifier)
+    USER_CACHE_MISS.inc(len(misses))
+    if not misses:
+        return result
+
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(GET_USERS_BY_IDENTIFIERS, misses)
+    loaded = {row["identifier"]: _user_from_row(row) for row in rows}
+
+    async with redis.pipeline(transaction=False) as pipe:
+        for identifier in misses:
+            user = loaded.get(identifier)
+            if user is not None:
+                await _CACHE_SET_SCRIPT(
+                    keys=_cache_set_keys(identifier, user),
+                    args=[user.model_dump_json(), settings.user_cache_ttl_seconds],
+                    client=pipe,
+                )
+            elif settings.user_cache_negative_ttl_seconds > 0:
+                pipe.set(f"{NOT_FOUND_KEY_PREFIX}{identifier}", "1", ex=settings.user_cache_negative_ttl_seconds)
+        await pipe.execute()
+
+    for identifier in misses:
+        result[identifier] = user = loaded.get(identifier)
+        if user is not None:
+            _remember(identifier, user, seen_invalidations)
+    logger.debug(f"Batch lookup: {len(identifiers)} identifiers, {len(misses)} from DB, {len(loaded)} found there")
+    return result
+
+
+def _remember(identifier: str, user: UserDetailRead, seen_invalidations: int) -> None:
+    if _l1_active and seen_invalidations == _invalidations:
+        _l1.set(identifier, user, tag=str(user.id))
+
+def _drop_local(user_id: str) -> None:
+    global _invalidations
+    _invalidations += 1
+    # Загрузки, начатые до изменения, дослужат своим ожидающим, но новые запросы к ним не присоединятся
+    _inflight.clear()
+    if user_id == FLUSH_ALL:
+        _l1.clear()
+    else:
+        _l1.drop_tag(user_id)
 
 
 async def invalidate_user_cache_by_id(user_id: UUID) -> None:
-    """Инвалидация кэша по user_id (например, после PATCH)."""
-    await redis.delete(f"user:{user_id}")
+    """
+    Удаляет все записи пользователя (по любому идентификатору) после изменения users,
+    контактов или членства в группах: Redis — по обратному индексу, L1 всех процессов — через pub/sub.
+    Ошибка Redis не роняет уже выполненную запись: логируем, записи доживут до TTL.
+    """
+    _drop_local(str(user_id))
+    index_key = f"{INDEX_KEY_PREFIX}{user_id}"
+    try:
+        # Маркер — до чтения индекса: параллельное чтение из БД уже не запишет старое значение
+        await redis.set(
+            f"{INVALIDATED_KEY_PREFIX}{user_id}", "1", ex=settings.user_cache_invalidation_grace_seconds,
+        )
+        keys = await redis.smembers(index_key)
+        await redis.delete(index_key, *keys)
+        await redis.publish(settings.user_cache_invalidation_channel, str(user_id))
+    except RedisError as e:
+        logger.error(f"Cannot invalidate user cache for {user_id}: {e}")
+
+async def register_identifiers(values: Iterable[str]) -> None:
+    """
+    Значения, по которым пользователь теперь находится (новый/реактивированный контакт, реактивация
+    пользователя по UUID): удаляет отрицательные записи и добавляет значения в Bloom-фильтр.
+    """
+    values = list(values)
+    if not values:
+        return
+    try:
+        await redis.delete(*(f"{NOT_FOUND_KEY_PREFIX}{value}" for value in values))
+    except RedisError as e:
+        logger.error(f"Cannot drop negative cache entries for {len(values)} identifiers: {e}")
+    await identifier_bloom.add_identifiers(values)
+
+async def forget_missing_identifiers() -> None:
+    """
+    Добавления контактов могли пройти мимо (пропал LISTEN): удаляет все отрицательные записи
+    и Bloom-фильтр — до пересборки промахи идут в БД.
+    """
+    await identifier_bloom.drop_identifier_bloom()
+    try:
+        batch = []
+        async for key in redis.scan_iter(match=f"{NOT_FOUND_KEY_PREFIX}*", count=1000):
+            batch.append(key)
+            if len(batch) >= 1000:
+                await redis.unlink(*batch)
+                batch.clear()
+        if batch:
+            await redis.unlink(*batch)
+    except RedisError as e:
+        logger.error(f"Cannot drop negative cache entries: {e}")
+
+async def invalidate_all_user_cache() -> None:
+    """Сброс всего кэша пользователей: изменения, которые задевают многих (группа переименована)."""
+    _drop_local(FLUSH_ALL)
+    try:
+        batch = []
+        async for key in redis.scan_iter(match=f"{CACHE_KEY_PREFIX}*", count=1000):
+            batch.append(key)
+            if len(batch) >= 1000:
+                await redis.unlink(*batch)
+                batch.clear()
+        if batch:
+            await redis.unlink(*batch)
+        await redis.publish(settings.user_cache_invalidation_channel, FLUSH_ALL)
+    except RedisError as e:
+        logger.error(f"Cannot flush user cache: {e}")
+
+
+async def _listen_invalidations() -> None:
+    global _l1_active
+    while True:
+        try:
+            async with redis.pubsub() as pubsub:
+                await pubsub.subscribe(settings.user_cache_invalidation_channel)
+                # Пока подписки не было, инвалидации могли пройти мимо — начинаем с пустого L1
+                _l1.clear()
+                _l1_active = settings.user_cache_l1_max_size > 0
+                logger.info("User cache L1 enabled, listening for invalidations")
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        _drop_local(message["data"])
+        except (RedisError, OSError) as e:
+            logger.warning(f"User cache invalidation channel lost, L1 disabled: {e}")
+        finally:
+            _l1_active = False
+            _l1.clear()
+        await asyncio.sleep(1)
+
+def init_user_cache() -> None:
+    """Запускает подписку на инвалидации; L1 включается после подписки."""
+    global _listener
+    if _listener is None and settings.user_cache_l1_max_size > 0:
+        _listener = asyncio.create_task(_listen_invalidations())
+
+async def close_user_cache() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.cancel()
+        try:
+            await _listener
+        except asyncio.CancelledError:
+            pass
+        _listener = None
@@ -1,23 +1,59 @@
-from asyncpg import Pool, create_pool
+from typing import Iterable, List, Optional
 
 from src.settings import settings
+from src.db.codecs import register_json_codecs
+from common.db_pool import InstrumentedPool, create_instrumented_pool
+from src.db.queries import READ_HOT_STATEMENTS, WRITE_HOT_STATEMENTS
+from common.metrics import observe_query
 
 
-write_pool: Pool
-read_pool: Pool
+write_pool: Optional[InstrumentedPool] = None
+read_pool: Optional[InstrumentedPool] = None
+
+def _create_pool(dsn: str, name: str, min_size: int, max_size: int, hot_statements: Iterable[str]):
+    return create_instrumented_pool(
+        dsn,
+        name=name,
+        min_size=min_size,
+        max_size=max_size,
+        acquire_timeout=settings.db_pool_acquire_timeout,
+        command_timeout=settings.db_pool_command_timeout,
+        max_inactive_connection_lifetime=settings.db_pool_max_inactive_connection_lifetime,
+        max_queries=settings.db_pool_max_queries,
+        statement_cache_size=settings.db_pool_statement_cache_size,
+        register_codecs=register_json_codecs,
+        hot_statements=hot_statements,
+        query_logger=observe_query,
+    )
 
 async def init_pools():
     global write_pool, read_pool
-    write_pool = await create_pool(str(settings.database_write_url))
-    read_pool = await create_pool(str(settings.database_read_url))
+    # HAProxy: 5432 — мастер (запись), 5433 — реплики (чтение); размеры задаются раздельно
+    write_pool = await _create_pool(
+        str(settings.database_write_url), "write",
+        settings.db_write_pool_min_size, settings.db_write_pool_max_size,
+        WRITE_HOT_STATEMENTS,
+    )
+    read_pool = await _create_pool(
+        str(settings.database_read_url), "read",
+        settings.db_read_pool_min_size, settings.db_read_pool_max_size,
+        READ_HOT_STATEMENTS,
+    )
 
 async def close_pools():
-    await write_pool.close()
-    await read_pool.close()
+    global write_pool, read_pool
+    for pool in (write_pool, read_pool):
+        if pool is not None:
+            await pool.close()
+    write_pool = read_pool = None
 
 # Зависимости для роутов
-def get_write_pool() -> Pool:
+def get_write_pool() -> InstrumentedPool:
     return write_pool
 
-def get_read_pool() -> Pool:
-    return read_pool
\ No newline at end of file
+def get_read_pool() -> InstrumentedPool:
+    return read_pool
+
+def pools_stats() -> List[dict]:
+    """Пустой список, пока пулы не созданы (scrape /metrics до lifespan)."""
+    return [pool.stats() for pool in (write_pool, read_pool) if pool is not None]
@@ -0,0 +1,34 @@
+# Горячие запросы к accounts.*: используются в сервисах; кодеки их типов загружаются
+# на каждом новом соединении пула (src/db/pools.py).
+
+GET_USER_BY_IDENTIFIER = "SELECT * FROM accounts.get_user_by_identifier_v1($1)"
+GET_USERS_BY_IDENTIFIERS = "SELECT * FROM accounts.get_users_by_identifiers_v1($1)"
+GET_USER = "SELECT * FROM accounts.get_user($1)"
+GET_USERS_WITH_RELATIONS = "SELECT * FROM accounts.get_users_with_relations($1, $2)"
+GET_USERS_WITH_RELATIONS_AFTER = "SELECT * FROM accounts.get_users_with_relations_after($1, $2, $3)"
+COUNT_USERS = "SELECT accounts.count_users()"
+ESTIMATE_USERS = "SELECT accounts.estimate_users()"
+# Серверный курсор выгрузки: кодеки заранее не грузим, выполняется редко
+EXPORT_USERS = "SELECT * FROM accounts.export_users()"
+# Bulk-создание одной пачкой: вызывается редко, кодеки заранее не грузим
+CREATE_USERS_BULK = "SELECT * FROM accounts.create_users_bulk($1, $2, $3)"
+# Фоновые импорты (src/services/import_jobs.py, src/worker.py)
+CREATE_IMPORT_JOB = "SELECT * FROM accounts.create_user_import_job($1, $2)"
+START_IMPORT_JOB = "SELECT * FROM accounts.start_user_import_job($1)"
+UPDATE_IMPORT_JOB_PROGRESS = "SELECT accounts.update_user_import_job_progress($1, $2, $3, $4, $5, $6)"
+FINISH_IMPORT_JOB = "SELECT * FROM accounts.finish_user_import_job($1, $2, $3)"
+GET_IMPORT_JOB = "SELECT * FROM accounts.get_user_import_job($1)"
+# Пересборка Bloom-фильтра кэша by-identifier (src/cashe/identifier_bloom.py): серверный курсор, редко
+LIST_IDENTIFIER_VALUES = "SELECT value FROM accounts.list_identifier_values()"
+
+READ_HOT_STATEMENTS = (
+    GET_USER_BY_IDENTIFIER,
+    GET_USERS_BY_IDENTIFIERS,
+    GET_USER,
+    GET_USERS_WITH_RELATIONS,
+    GET_USERS_WITH_RELATIONS_AFTER,
+    COUNT_USERS,
+    ESTIMATE_USERS,
+    GET_IMPORT_JOB,  # клиент опрашивает статус импорта
+)
+WRITE_HOT_STATEMENTS = ()
@@ -1,5 +1,5 @@
-import aioredis
+from redis.asyncio import Redis
 
 from src.settings import settings
 
-redis = aioredis.from_url(str(settings.redis_url), decode_responses=True)
\ No newline at end of file
+redis = Redis.from_url(str(settings.redis_url), decode_responses=True)
@@ -0,0 +1,174 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+from asyncpg import Connection, Pool, PostgresError
+from loguru import logger
+
+from src.settings import settings
+
+
+# Read-your-writes поверх HAProxy 5432 (мастер) / 5433 (реплики):
+# после записи запоминаем LSN мастера, чтение идёт на реплику,
+# только если она его уже проиграла, иначе — короткое ожидание и мастер.
+
+CONSISTENCY_HEADER = "X-Consistency-Token"
+USER_LSN_KEY_PREFIX = "users:write_lsn:"
+
+CURRENT_LSN_QUERY = "SELECT pg_current_wal_lsn()::text"
+# replay_lsn IS NULL — HAProxy отдал соединение с мастером: читать можно всегда.
+# receive = replay — реплика проиграла всё, что получила: отставания нет,
+# даже если последняя транзакция на мастере была давно.
+REPLICA_STATE_QUERY = """
+SELECT pg_last_wal_replay_lsn()::text AS replay_lsn,
+       CASE
+           WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+           ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+       END AS lag_seconds
+"""
+
+
+# Состояние реплики по соединению: (когда прочитано, replay LSN или None для мастера, отставание).
+# HAProxy мог привести соединения на разные реплики, поэтому кэш — на соединение, а не на пул.
+ReplicaState = Tuple[float, Optional[int], Optional[float]]
+_replica_states: "WeakKeyDictionary[Connection, ReplicaState]" = WeakKeyDictionary()
+
+
+def parse_lsn(value: str) -> int:
+    """'16/B374D848' → целое для сравнения."""
+    high, low = value.split("/")
+    return (int(high, 16) << 32) + int(low, 16)
+
+def format_lsn(lsn: int) -> str:
+    return f"{lsn >> 32:X}/{lsn & 0xFFFFFFFF:X}"
+
+
+class RoutingStats:
+    def __init__(self):
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.replica_waits = 0  # реплика догнала за время ожидания
+        self.fallback_lsn = 0  # не догнала LSN записи → мастер
+        self.fallback_lag = 0  # отставание больше replica_max_lag_seconds → мастер
+
+    def as_dict(self) -> dict:
+        return dict(self.__dict__)
+
+
+routing_stats = RoutingStats()
+
+
+class _PoolShortcuts:
+    """pool.fetch*/execute через собственный acquire(), как в asyncpg.Pool."""
+
+    async def fetch(self, query: str, *args):
+        async with self.acquire() as conn:
+            return await conn.fetch(query, *args)
+
+    async def fetchrow(self, query: str, *args):
+        async with self.acquire() as conn:
+            return await conn.fetchrow(query, *args)
+
+    async def fetchval(self, query: str, *args):
+        async with self.acquire() as conn:
+            return await conn.fetchval(query, *args)
+
+    async def execute(self, query: str, *args):
+        async with self.acquire() as conn:
+            return await conn.execute(query, *args)
+
+
+class RoutedReadPool(_PoolShortcuts):
+    """
+    Пул для чтений: реплика, если она проиграла min_lsn и отстаёт не больше
+    replica_max_lag_seconds; иначе ждём до replica_wait_ms и уходим на мастер.
+    Повторяет используемую сервисами часть asyncpg.Pool: acquire/fetch*/execute.
+    """
+
+    def __init__(self, read_pool: Pool, write_pool: Pool, min_lsn: Optional[int] = None, force_primary: bool = False):
+        self.read_pool = read_pool
+        self.write_pool = write_pool
+        self.min_lsn = min_lsn
+        self.force_primary = force_primary
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Connection]:
+        if not self.force_primary:
+            async with self.read_pool.acquire() as conn:
+                if await self._replica_is_fresh(conn):
+                    routing_stats.replica_reads += 1
+                    yield conn
+                    return
+        routing_stats.primary_reads += 1
+        async with self.write_pool.acquire() as conn:
+            yield conn
+
+    async def _replica_is_fresh(self, conn: Connection) -> bool:
+        max_lag = settings.replica_max_lag_seconds
+        if self.min_lsn is None and max_lag is None:
+            return True
+        deadline = time.monotonic() + settings.replica_wait_ms / 1000
+        waited = False
+        replay_lsn, lag_seconds, cached = await _replica_state(conn, settings.replica_state_cache_seconds)
+        while True:
+            if replay_lsn is None:
+                return True
+            if max_lag is not None and lag_seconds is not None and lag_seconds > max_lag:
+                # Отставание в секундах за миллисекунды ожидания не исчезнет
+                routing_stats.fallback_lag += 1
+                return False
+            if self.min_lsn is None or replay_lsn >= self.min_lsn:
+                if waited:
+                    routing_stats.replica_waits += 1
+                return True
+            if cached:
+                # Кэш старше записи клиента — перечитываем сразу, без паузы
+                replay_lsn, lag_seconds, cached = await _replica_state(conn, 0)
+                continue
+            if time.monotonic() >= deadline:
+                routing_stats.fallback_lsn += 1
+                return False
+            waited = True
+            await asyncio.sleep(settings.replica_poll_interval_ms / 1000)
+            replay_lsn, lag_seconds, cached = await _replica_state(conn, 0)
+
+
+async def _replica_state(conn: Connection, max_age: float) -> Tuple[Optional[int], Optional[float], bool]:
+    """
+    replay LSN и отставание реплики за соединением и признак «из кэша»: моложе max_age секунд —
+    без запроса. Ожидание LSN записи передаёт max_age=0: там нужен свежий replay LSN.
+    """
+    # PoolConnectionProxy новый на каждый acquire() — кэш ключуется самим asyncpg.Connection
+    key = getattr(conn, "_con", None) or conn
+    now = time.monotonic()
+    cached = _replica_states.get(key)
+    if cached is not None and now - cached[0] < max_age:
+        return cached[1], cached[2], True
+    row = await conn.fetchrow(REPLICA_STATE_QUERY)
+    replay_lsn = parse_lsn(row["replay_lsn"]) if row["replay_lsn"] is not None else None
+    _replica_states[key] = (now, replay_lsn, row["lag_seconds"])
+    return replay_lsn, row["lag_seconds"], False
+
+
+class LsnRecordingPool(_PoolShortcuts):
+    """
+    Пул для записей: после успешного блока acquire() (транзакция уже закоммичена)
+    читает pg_current_wal_lsn() и передаёт его в on_lsn.
+    """
+
+    def __init__(self, write_pool: Pool, on_lsn: Callable[[int], Awaitable[None]]):
+        self.write_pool = write_pool
+        self.on_lsn = on_lsn
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Connection]:
+        async with self.write_pool.acquire() as conn:
+            yield conn
+            try:
+                lsn = parse_lsn(await conn.fetchval(CURRENT_LSN_QUERY))
+            except PostgresError as e:
+                logger.warning(f"Cannot read primary WAL LSN after write: {e}")
+                return
+        await self.on_lsn(lsn)
@@ -0,0 +1,23 @@
+from fastapi import Depends
+
+from common.access_token import close_access_token_verifier, init_access_token_verifier, require_access_token
+from src.settings import settings
+
+# Роуты, закрытые access-токеном auth (AUTH_ENABLED); без него — как раньше, без проверки
+AUTH_DEPENDENCIES = [Depends(require_access_token)] if settings.auth_enabled else []
+
+
+def init_auth() -> None:
+    if settings.auth_enabled:
+        init_access_token_verifier(
+            str(settings.auth_redis_url),
+            algorithm=settings.auth_jwt_algorithm,
+            secret_key=settings.auth_jwt_secret_key,
+            jwks_url=settings.auth_jwks_url,
+            jwks_refresh_seconds=settings.auth_jwks_refresh_seconds,
+            max_staleness_seconds=settings.auth_revocation_max_staleness_seconds,
+            claims_cache_size=settings.auth_claims_cache_size,
+        )
+
+async def close_auth() -> None:
+    await close_access_token_verifier()
@@ -1,10 +1,75 @@
-from asyncpg import Pool
+from typing import Optional, Union
 
+from fastapi import Request, Response
+from loguru import logger
+from redis.exceptions import RedisError
+
+from common.db_pool import InstrumentedPool
 from src.db.pools import get_write_pool, get_read_pool
+from src.db.redis import redis
+from src.db.routing import (
+    CONSISTENCY_HEADER,
+    USER_LSN_KEY_PREFIX,
+    LsnRecordingPool,
+    RoutedReadPool,
+    format_lsn,
+    parse_lsn,
+)
+from src.settings import settings
+
+
+def _request_lsn(request: Request) -> Optional[int]:
+    token = request.headers.get(CONSISTENCY_HEADER)
+    if not token:
+        return None
+    try:
+        return parse_lsn(token)
+    except ValueError:
+        logger.warning(f"Malformed {CONSISTENCY_HEADER}: {token!r}")
+        return None
+
+
+async def get_write_db_pool(request: Request, response: Response) -> LsnRecordingPool:
+    """
+    Запись → мастер. LSN после записи уходит клиенту в X-Consistency-Token
+    и, если в пути есть user_id, запоминается в Redis для чтений этого пользователя.
+    """
+    user_id = request.path_params.get("user_id")
+
+    async def on_lsn(lsn: int) -> None:
+        response.headers[CONSISTENCY_HEADER] = format_lsn(lsn)
+        if user_id is None:
+            return
+        try:
+            await redis.set(
+                f"{USER_LSN_KEY_PREFIX}{user_id}", format_lsn(lsn),
+                ex=settings.replica_user_lsn_ttl_seconds,
+            )
+        except RedisError as e:
+            logger.warning(f"Cannot store write LSN for user {user_id}: {e}")
+
+    return LsnRecordingPool(get_write_pool(), on_lsn)
 
 
-def get_write_db_pool() -> Pool:
-    return get_write_pool()
+async def get_read_db_pool(request: Request) -> Union[RoutedReadPool, InstrumentedPool]:
+    """
+    Чтение → реплика, если она догнала последнюю запись клиента
+    (X-Consistency-Token) или пользователя из пути; иначе мастер.
+    Маршрутизация выключена — read-пул как есть, без проверок реплики.
+    """
+    if not settings.replica_routing_enabled:
+        return get_read_pool()
 
-def get_read_db_pool() -> Pool:
-    return get_read_pool()
\ No newline at end of file
+    min_lsn = _request_lsn(request)
+    force_primary = False
+    user_id = request.path_params.get("user_id")
+    if user_id is not None:
+        try:
+            user_lsn = await redis.get(f"{USER_LSN_KEY_PREFIX}{user_id}")
+            if user_lsn:
+                min_lsn = max(min_lsn or 0, parse_lsn(user_lsn))
+        except RedisError as e:
+            # Без LSN пользователя реплика может вернуть старые данные — читаем с мастера
+            logger.warning(f"Cannot load write LSN for user {user_id}: {e}")
+            force_primary = True
+    return RoutedReadPool(get_read_pool(), get_write_pool(), min_lsn, force_primary)
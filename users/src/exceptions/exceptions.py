@@ -45,6 +45,15 @@ class DatabaseError(AppException):
             details={},
         )
 
+class QueueUnavailableError(AppException):
+    def __init__(self, detail: str = "Import queue is unavailable"):
+        super().__init__(
+            message=detail,
+            status_code=503,
+            error_code="QUEUE_UNAVAILABLE",
+            details={},
+        )
+
 class FileUploadError(AppException):
     def __init__(self, message: str):
         super().__init__(
@@ -85,3 +94,7 @@ class ContactTypeConflict(AppException):
 class ContactNotFound(NotFoundError):
     def __init__(self, contact_id: str):
         super().__init__("Contact", contact_id)
+
+class ImportJobNotFound(NotFoundError):
+    def __init__(self, job_id: str):
+        super().__init__("Import job", job_id)
\ No newline at end of file
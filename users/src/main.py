@@ -1,11 +1,27 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response
 
-from src.middleware.request_id import RequestIDMiddleware
-from src.middleware.logging import LoggingMiddleware
-from src.db.pools import init_pools, close_pools
+from common.middleware.request_context import RequestContextMiddleware, init_access_log, close_access_log
+from common.middleware.metrics import MetricsMiddleware
+from src.middleware.gzip import RouteGZipMiddleware
+from common.access_token import access_token_verifier_stats
+from common.metrics import (
+    observe_request,
+    preallocate,
+    register_pool_collector,
+    register_token_verifier_collector,
+    render_metrics,
+)
+from src.db.pools import init_pools, close_pools, pools_stats, get_write_pool
+from src.queue.connection import init_queue, close_queue
+from src.cashe.user_cashe import init_user_cache, close_user_cache
+from src.cashe.identifier_bloom import init_identifier_bloom, close_identifier_bloom
+from src.cashe.identifier_notify import init_identifier_listener, close_identifier_listener
+from src.db.queries import READ_HOT_STATEMENTS, WRITE_HOT_STATEMENTS
+from src.db.routing import CONSISTENCY_HEADER, routing_stats
+from src.dependencies.auth import AUTH_DEPENDENCIES, init_auth, close_auth
 from src.routers.accounts import router as accounts_router
 from src.settings import settings
 from src.logger_config import setup_logger
@@ -17,30 +33,70 @@ logger.info("✅ Logger is configured and working")
 
 @asynccontextmanager
 async def lifespan(app):
+    init_access_log()
     logger.info("🚀 Initializing database connection pools...")
     await init_pools()
+    preallocate(app.routes, READ_HOT_STATEMENTS + WRITE_HOT_STATEMENTS)
+    logger.info("🚀 Connecting to RabbitMQ (import jobs)...")
+    try:
+        await init_queue()
+    except Exception as e:
+        # Очередь нужна только /bulk/upload: подключится при первой загрузке, до того — 503
+        logger.warning(f"RabbitMQ is unavailable, import jobs will connect on demand: {e}")
+    init_auth()
+    init_user_cache()
+    # Пересборка по мастеру: реплика могла ещё не получить контакты, созданные до начала сборки
+    init_identifier_bloom(get_write_pool())
+    init_identifier_listener()
     yield
+    await close_identifier_listener()
+    await close_identifier_bloom()
+    await close_user_cache()
+    await close_auth()
+    await close_queue()
     logger.info("🛑 Closing database connection pools...")
     await close_pools()
+    close_access_log()
 
 
 app = FastAPI(lifespan=lifespan)
+register_pool_collector(pools_stats)
+register_token_verifier_collector(access_token_verifier_stats)
 
 # Регистрируем обработчики исключений ДО подключения роутеров (рекомендуется, но не критично)
 register_exception_handlers(app)
 
-app.add_middleware(RequestIDMiddleware)
-app.add_middleware(LoggingMiddleware)
+app.add_middleware(RequestContextMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "https://your-frontend.com"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[CONSISTENCY_HEADER],  # клиент возвращает его при следующих чтениях
+)
+# При возврате списков пользователей; выгрузка сжимает себя сама
+app.add_middleware(RouteGZipMiddleware, minimum_size=1000, exclude_paths=("/accounts/users/export",))
+# Последним — самый внешний: в длительность входят остальные middleware
+app.add_middleware(MetricsMiddleware, observe=observe_request)
+
+app.include_router(accounts_router, prefix="/accounts", dependencies=AUTH_DEPENDENCIES)
+
+
+@app.get(
+    "/pools/stats",
+    tags=["Service"],
+    summary="asyncpg pool usage: size, in-use, waiting, acquire wait",
+    dependencies=AUTH_DEPENDENCIES,
 )
-app.add_middleware(GZipMiddleware, minimum_size=1000)  # при возврате списков пользователей
+async def get_pools_stats():
+    return {"pools": pools_stats(), "read_routing": routing_stats.as_dict()}
+
 
-app.include_router(accounts_router, prefix="/accounts")
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
 
 
 if __name__ == "__main__":
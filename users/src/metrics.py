@@ -0,0 +1,32 @@
+from prometheus_client import Gauge
+
+from common.metrics import CACHE_REQUESTS
+
+
+CACHE_ENTRIES = Gauge(
+    "cache_entries",
+    "Entries in in-process caches",
+    ("cache",),
+)
+
+# Предсозданные серии для горячего пути
+# user_by_identifier_l1 — память процесса, user_by_identifier — Redis (только промахи L1)
+USER_CACHE_L1_HIT = CACHE_REQUESTS.labels("user_by_identifier_l1", "hit")
+USER_CACHE_L1_MISS = CACHE_REQUESTS.labels("user_by_identifier_l1", "miss")
+USER_CACHE_HIT = CACHE_REQUESTS.labels("user_by_identifier", "hit")
+USER_CACHE_MISS = CACHE_REQUESTS.labels("user_by_identifier", "miss")
+# Промахи, не дошедшие до БД сами: дождались загрузки в этом процессе / блокировки другого воркера
+USER_CACHE_COALESCED = CACHE_REQUESTS.labels("user_by_identifier", "coalesced")
+USER_CACHE_LOCK_WAIT = CACHE_REQUESTS.labels("user_by_identifier", "lock_wait")
+# Несуществующие identifier: отрицательная запись в Redis; Bloom-фильтр — «точно нет» и ложные «возможно есть»
+USER_CACHE_NEGATIVE_HIT = CACHE_REQUESTS.labels("user_by_identifier", "negative_hit")
+USER_BLOOM_NEGATIVE = CACHE_REQUESTS.labels("user_identifier_bloom", "negative")
+USER_BLOOM_FALSE_POSITIVE = CACHE_REQUESTS.labels("user_identifier_bloom", "false_positive")
+
+# Bloom-фильтр идентификаторов (src/cashe/identifier_bloom.py), по данным из Redis
+BLOOM_ITEMS = Gauge("user_identifier_bloom_items", "Values added to the identifier bloom filter")
+BLOOM_BYTES = Gauge("user_identifier_bloom_bytes", "Identifier bloom filter size in Redis")
+BLOOM_ESTIMATED_ERROR_RATE = Gauge(
+    "user_identifier_bloom_estimated_error_rate",
+    "Expected false positive rate for the current number of values",
+)
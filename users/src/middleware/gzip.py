@@ -0,0 +1,21 @@
+from typing import Iterable
+
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class RouteGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware с исключениями по пути: роуты из exclude_paths сами решают, как сжимать ответ
+    (выгрузка пользователей жмёт CSV/NDJSON своим gzip-потоком, XLSX уже сжат deflate).
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 500, compresslevel: int = 9, exclude_paths: Iterable[str] = ()):
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.exclude_paths = frozenset(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
@@ -0,0 +1,67 @@
+import asyncio
+from typing import Optional
+
+import aio_pika
+from aio_pika.abc import AbstractRobustConnection, AbstractRobustChannel, AbstractQueue
+
+from src.settings import settings
+
+
+connection: Optional[AbstractRobustConnection] = None
+channel: Optional[AbstractRobustChannel] = None
+_connect_lock = asyncio.Lock()
+
+async def init_queue():
+    global connection, channel
+    conn = await aio_pika.connect_robust(settings.rabbitmq_url)
+    try:
+        # publisher_confirms=True: publish() ждёт подтверждения брокера,
+        # т.е. 202 отдаётся только после того, как задача записана на диск
+        ch = await conn.channel(publisher_confirms=True)
+        await declare_import_queue(ch)
+    except BaseException:
+        await conn.close()
+        raise
+    connection, channel = conn, ch
+
+async def close_queue():
+    global connection, channel
+    if connection:
+        await connection.close()
+    connection = channel = None
+
+def get_channel() -> AbstractRobustChannel:
+    return channel
+
+async def ensure_channel() -> AbstractRobustChannel:
+    """
+    Канал для публикации. API не требует RabbitMQ на старте: если init_queue() тогда не удался,
+    подключаемся при первой загрузке (ошибка подключения — та же, что у publish).
+    """
+    if channel is None:
+        async with _connect_lock:
+            if channel is None:
+                await init_queue()
+    return channel
+
+async def declare_import_queue(ch: AbstractRobustChannel) -> AbstractQueue:
+    """
+    Объявляет очередь импортов и её dead-letter очередь (идемпотентно).
+    Quorum-очередь: переживает рестарт брокера, x-delivery-limit отсекает
+    импорт, который раз за разом роняет воркер.
+    """
+    await ch.declare_queue(
+        settings.users_import_dead_letter_queue_name,
+        durable=True,
+        arguments={"x-queue-type": "quorum"},
+    )
+    return await ch.declare_queue(
+        settings.users_import_queue_name,
+        durable=True,
+        arguments={
+            "x-queue-type": "quorum",
+            "x-delivery-limit": settings.users_import_max_redeliveries,
+            "x-dead-letter-exchange": "",
+            "x-dead-letter-routing-key": settings.users_import_dead_letter_queue_name,
+        },
+    )
@@ -0,0 +1,31 @@
+from aio_pika import DeliveryMode, Message
+from aio_pika.exceptions import AMQPError
+from loguru import logger
+
+from src.exceptions.exceptions import QueueUnavailableError
+from src.queue.connection import ensure_channel
+from src.settings import settings
+
+
+async def publish_import_job(job_id: str) -> None:
+    """
+    Ставит импорт в durable-очередь: в сообщении только id задачи,
+    файл и состояние — в каталоге users_import_dir и accounts.user_import_jobs.
+    Возвращается только после publisher confirm от брокера.
+    """
+    message = Message(
+        job_id.encode(),
+        content_type="text/plain",
+        delivery_mode=DeliveryMode.PERSISTENT,
+        message_id=job_id,
+    )
+    try:
+        channel = await ensure_channel()
+        await channel.default_exchange.publish(
+            message,
+            routing_key=settings.users_import_queue_name,
+            mandatory=True,
+        )
+    except (AMQPError, OSError) as e:
+        logger.error(f"Failed to publish import job {job_id}: {e}")
+        raise QueueUnavailableError()
@@ -7,29 +7,34 @@ from fastapi import (
     UploadFile,
     File,
     Query,
+    Request,
 )
-from loguru import logger
+from fastapi.responses import StreamingResponse
 from asyncpg import Pool
 from uuid import UUID
+from typing import Literal, Optional
 
-from src.services.users import (
-    UserService,
-    bulk_create_users_from_file,
-    UserDetailRead,
-)
-from src.db.redis import redis
-from src.utils.json_utils import maybe_json_loads, maybe_json_dumps
+from src.services.users import UserService
+from src.services.import_jobs import create_import_job, get_import_job
+from src.services.users_export import EXPORT_MEDIA_TYPES, stream_users_export
+from src.cashe.user_cashe import get_user_by_identifier_cached, get_users_by_identifiers_cached
 from src.dependencies.db import get_read_db_pool, get_write_db_pool
+from src.db.pools import get_write_pool
 from src.dependencies.upload import validate_upload_file
-from src.schemas.common import PaginatedResponse
-from src.exceptions.exceptions import ValidationError, UserNotFound
+from src.schemas.common import PaginatedResponse, CursorPage
+from src.exceptions.exceptions import ValidationError
 from src.schemas.users import (
     UserCreate,
     UserUpdate,
     UserRead,
     BulkCreateRequest,
     BulkCreateResult,
-    UploadResult,
+    ImportJobRead,
+    UserReadExtended,
+    UserDetailRead,
+    UsersByIdentifiersRequest,
+    UsersByIdentifiersResult,
+    UserByIdentifierItem,
 )
 
 
@@ -38,18 +43,56 @@ router = APIRouter(tags=["Accounts: Users"])
 async def get_user_service(pool: Pool = Depends(get_read_db_pool)) -> UserService:
     return UserService(pool)
 
+async def get_user_write_service(pool: Pool = Depends(get_write_db_pool)) -> UserService:
+    return UserService(pool)
+
 @router.post("/", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-async def create_user(user: UserCreate, service: UserService = Depends(get_write_db_pool)):
+async def create_user(user: UserCreate, service: UserService = Depends(get_user_write_service)):
     return await service.create(user)
 
 @router.get("/", response_model=PaginatedResponse[UserRead])
 async def get_user_list(
         page: int = Query(1, ge=1, description="Номер страницы"),
         size: int = Query(50, ge=1, le=100, description="Размер страницы (макс. 100)"),
-        service: UserService = Depends(get_read_db_pool)
+        service: UserService = Depends(get_user_service)
 ):
     return await service.get_paginated(page=page, size=size)
 
+@router.get("/cursor", response_model=CursorPage[UserReadExtended])
+async def get_user_list_by_cursor(
+        cursor: Optional[str] = Query(None, max_length=200, description="next_cursor предыдущей страницы; пусто — первая"),
+        size: int = Query(50, ge=1, le=100, description="Размер страницы (макс. 100)"),
+        total: Literal["none", "estimate", "exact"] = Query(
+            "none", description="none — без total, estimate — оценка по статистике, exact — COUNT(*) с кэшем"
+        ),
+        service: UserService = Depends(get_user_service)
+):
+    """Keyset-пагинация: время ответа не зависит от глубины страницы."""
+    return await service.get_cursor_page(cursor=cursor, size=size, total_mode=total)
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_users(
+        request: Request,
+        format: Literal["csv", "ndjson", "xlsx"] = Query("csv", description="csv, ndjson или xlsx"),
+        pool: Pool = Depends(get_read_db_pool),
+):
+    """
+    Потоковая выгрузка всех пользователей (серверный курсор, chunked-ответ):
+    память не зависит от числа строк.
+    """
+    # Роут исключён из RouteGZipMiddleware: xlsx уже сжат deflate,
+    # CSV/NDJSON сжимаем сами (уровень users_export_gzip_level)
+    headers = {"Content-Disposition": f'attachment; filename="users.{format}"'}
+    gzip = format != "xlsx" and "gzip" in request.headers.get("accept-encoding", "")
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+    return StreamingResponse(
+        stream_users_export(pool, format, gzip),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers=headers,
+    )
+
 @router.patch("/{user_id}", response_model=UserRead)
 async def update_user(
     user_id: UUID,
@@ -61,7 +104,7 @@ async def update_user(
         }
     ]
 ),
-    service: UserService = Depends(lambda pool=Depends(get_write_db_pool): UserService(pool))
+    service: UserService = Depends(get_user_write_service)
 ):
     return await service.update(
         user_id=user_id,
@@ -72,106 +115,52 @@ async def update_user(
 @router.post("/bulk", response_model=BulkCreateResult)
 async def bulk_create_users(
         request: BulkCreateRequest,
-        service: UserService = Depends(get_write_db_pool),
+        service: UserService = Depends(get_user_write_service),
 ):
     try:
         return await service.bulk_create_users(interface=request.interface, users=request.users)
     except ValueError as e:
         raise ValidationError("bulk_create", "users", str(e))
 
-@router.post("/bulk/upload", response_model=UploadResult)
-async def bulk_create_users_upload(file: UploadFile = Depends(validate_upload_file)):
+@router.post("/bulk/upload", response_model=ImportJobRead, status_code=status.HTTP_202_ACCEPTED)
+async def bulk_create_users_upload(
+        file: UploadFile = Depends(validate_upload_file),
+        pool: Pool = Depends(get_write_db_pool),
+):
     """
     Загружает файл с колонками: phone, user_groups.
     Пример user_groups: "client,driver" (через запятую).
+    Импорт идёт в фоне (src.worker); прогресс — GET /bulk/jobs/{id}.
+    """
+    return await create_import_job(pool, file)
+
+@router.get("/bulk/jobs/{job_id}", response_model=ImportJobRead)
+async def get_bulk_import_job(job_id: UUID, pool: Pool = Depends(get_write_pool)):
     """
-    return await process_user_groups_bulk_upload(file)
+    Статус фонового импорта: прогресс, счётчики и строки с ошибками.
+    Читается с мастера: задачу только что создал POST /bulk/upload, а прогресс пишет воркер —
+    токен согласованности клиента этих записей не покрывает, реплика может её ещё не видеть.
+    """
+    return await get_import_job(pool, job_id)
 
 @router.get("/by-identifier", response_model=UserDetailRead)
 async def get_user_by_identifier(
     identifier: str = Query(..., min_length=1, max_length=255, description="UUID, email, phone (+7...), or second_login"),
     pool: Pool = Depends(get_read_db_pool)
 ):
-    cache_key = f"user_by_id:{identifier}"
-    cached = await redis.get(cache_key)
-    if cached:
-        logger.debug(f"Cache hit for identifier: {identifier}")
-        data = json.loads(cached)
-        data["profile"] = maybe_json_loads(data.get("profile"))
-        return UserDetailRead(**data)
-
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(
-            "SELECT * FROM accounts.get_user_by_identifier_v1($1)",
-            identifier
-        )
-        if not row:
-            raise UserNotFound(user_id=identifier)
-
-    # Формируем ответ
-    user_dict = {
-        "id": row["id"],
-        "created_at": row["created_at"],
-        "updated_at": row["updated_at"],
-        "is_active": row["is_active"],
-        "profile": row["profile"],
-        "groups": row["groups"],
-        "contacts": row["contacts"],
-    }
-
-    # Подготовка к кэшированию
-    cache_data = user_dict.copy()
-    cache_data["profile"] = maybe_json_dumps(cache_data["profile"])
+    return await get_user_by_identifier_cached(identifier, pool)
 
-    # Кэшируем на 10 минут
-    await redis.setex(cache_key, 600, json.dumps(cache_data, default=str))
-    logger.info(f"Cached user by identifier: {identifier}")
-
-    @router.get("/by-identifier", response_model=UserDetailRead)
-    async def get_user_by_identifier(
-            identifier: str = Query(..., min_length=1, max_length=255,
-                                    description="UUID, email, phone (+7...), or second_login"),
-            pool: Pool = Depends(get_read_db_pool)
-    ):
-        cache_key = f"user_by_id:{identifier}"
-        cached = await redis.get(cache_key)
-        if cached:
-            logger.debug(f"Cache hit for identifier: {identifier}")
-            data = json.loads(cached)
-            data["profile"] = maybe_json_loads(data.get("profile"))
-            return UserDetailRead(**data)
-
-        async with pool.acquire() as conn:
-            row = await conn.fetchrow(
-                "SELECT * FROM accounts.get_user_by_identifier_v1($1)",
-                identifier
-            )
-            if not row:
-                raise UserNotFound(user_id=identifier)
-
-        # Формируем ответ
-        user_dict = {
-            "id": row["id"],
-            "created_at": row["created_at"],
-            "updated_at": row["updated_at"],
-            "is_active": row["is_active"],
-            "profile": row["profile"],
-            "groups": row["groups"],
-            "contacts": row["contacts"],
-        }
-
-        # Подготовка к кэшированию
-        cache_data = user_dict.copy()
-        cache_data["profile"] = maybe_json_dumps(cache_data["profile"])
-
-        # Кэшируем на 10 минут
-        await redis.setex(cache_key, 600, json.dumps(cache_data, default=str))
-        logger.info(f"Cached user by identifier: {identifier}")
-
-        @router.get("/by-identifier", response_model=UserDetailRead)
-        async def get_user_by_identifier(
-                identifier: str = Query(..., min_length=1, max_length=255,
-                                        description="UUID, email, phone (+7...), or second_login"),
-                pool: Pool = Depends(get_read_db_pool)
-        ):
-            return await get_user_by_identifier_cached(identifier, pool)
\ No newline at end of file
+@router.post("/by-identifiers", response_model=UsersByIdentifiersResult)
+async def get_users_by_identifiers(
+    request: UsersByIdentifiersRequest,
+    pool: Pool = Depends(get_read_db_pool)
+):
+    """
+    До 1000 identifier (UUID, email, phone, second_login вперемешку) за запрос: кэш — одним MGET,
+    остальное — одним запросом к БД. Порядок items — как в запросе, ненайденные — found=false.
+    """
+    users = await get_users_by_identifiers_cached(request.identifiers, pool)
+    return UsersByIdentifiersResult(items=[
+        UserByIdentifierItem(identifier=identifier, found=users[identifier] is not None, user=users[identifier])
+        for identifier in request.identifiers
+    ])
@@ -1,4 +1,4 @@
-from typing import TypeVar, Generic, List
+from typing import TypeVar, Generic, List, Literal, Optional
 from pydantic import BaseModel
 
 T = TypeVar("T")
@@ -8,4 +8,12 @@ class PaginatedResponse(BaseModel, Generic[T]):
     total: int
     page: int
     size: int
-    pages: int
\ No newline at end of file
+    pages: int
+
+
+class CursorPage(BaseModel, Generic[T]):
+    items: List[T]
+    size: int
+    next_cursor: Optional[str] = None  # None — это последняя страница
+    total: Optional[int] = None
+    total_mode: Literal["none", "estimate", "exact"] = "none"
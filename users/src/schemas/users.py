@@ -49,10 +49,19 @@ class BulkCreateRequest(BaseModel):
     interface: str  # "driver" или "courier" — для назначения роли
     users: List[BulkUserItem] = Field(..., min_length=1, max_length=1000)
 
+class BulkCreateRowResult(BaseModel):
+    """Итог по одной строке запроса; index — позиция в users (с 0)."""
+    index: int
+    phone: str
+    status: Literal["created", "skipped", "error"]
+    user_id: Optional[UUID] = None  # skipped по существующему phone — id владельца
+    reason: Optional[str] = None
+
 class BulkCreateResult(BaseModel):
     created: int
     skipped: int
     errors: List[dict]
+    items: List[BulkCreateRowResult] = Field(default_factory=list)
 
 class UserBulkCreateRow(BaseModel):
     """
@@ -68,11 +77,32 @@ class UploadResult(BaseModel):
     """
     success_count: int
     error_count: int
+    skipped_count: int = 0  # телефон уже зарегистрирован или повторяется в файле
+    total_rows: int = 0  # непустых строк обработано (без заголовка)
     errors: List[str] = Field(
         default_factory=list,
-        description="Список ошибок в формате: 'строка 5: причина'"
+        description="Список ошибок в формате: 'строка 5: причина' (не больше USERS_UPLOAD_MAX_ERRORS)"
     )
 
+class ImportJobRead(BaseModel):
+    """
+    Фоновый импорт файла: POST /bulk/upload возвращает его сразу (status=queued),
+    GET /bulk/jobs/{id} — прогресс. errors — первые USERS_UPLOAD_MAX_ERRORS ошибок.
+    """
+    id: UUID
+    status: Literal["queued", "running", "done", "failed"]
+    filename: str
+    total_rows: int
+    created_count: int
+    skipped_count: int
+    error_count: int
+    errors: List[str] = Field(default_factory=list)
+    error: Optional[str] = None  # почему импорт целиком не удался
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    updated_at: datetime
+
 class UserGroupItem(BaseModel):
     id: UUID4
     name: str
@@ -107,3 +137,22 @@ class UserDetailRead(BaseModel):
         profile: Optional[dict[str, Any]] = None
         groups: List[UserGroupItem]
         contacts: List[UserContactItem]
+
+class UsersByIdentifiersRequest(BaseModel):
+    identifiers: List[str] = Field(..., min_length=1, max_length=1000)
+
+    @field_validator("identifiers")
+    @classmethod
+    def validate_identifiers(cls, v: List[str]) -> List[str]:
+        if any(not 1 <= len(identifier) <= 255 for identifier in v):
+            raise ValueError("identifier must be 1..255 characters")
+        return v
+
+class UserByIdentifierItem(BaseModel):
+    """Позиция совпадает с identifiers запроса; found=false — такого пользователя нет (user=null)."""
+    identifier: str
+    found: bool
+    user: Optional[UserDetailRead] = None
+
+class UsersByIdentifiersResult(BaseModel):
+    items: List[UserByIdentifierItem]
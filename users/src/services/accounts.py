@@ -7,6 +7,7 @@ from src.utils.json_utils import (
     maybe_json_dumps,
     maybe_json_loads,
 )
+from src.cashe.user_cashe import invalidate_all_user_cache, invalidate_user_cache_by_id, register_identifiers
 from src.schemas.accounts import (
     UserGroupCreate,
     UserGroupUpdate,
@@ -50,6 +51,9 @@ class UserGroupService:
                 group.description,  # может быть None
                 group.is_active  # может быть None
             )
+        # Имя и активность группы входят в закэшированные профили всех её участников
+        if row and (group.name is not None or group.is_active is not None):
+            await invalidate_all_user_cache()
         return UserGroupRead(**dict(row)) if row else None
 
 
@@ -96,6 +100,9 @@ class UserService:
                 is_active,
                 profile_json,
             )
+        await invalidate_user_cache_by_id(user_id)
+        if is_active:
+            await register_identifiers([str(user_id)])  # мог быть закэширован как несуществующий
         return UserRead(**normalize_user_row(row)) if row else None
 
 class UserGroupMembershipService:
@@ -106,6 +113,7 @@ class UserGroupMembershipService:
         query = 'SELECT * FROM accounts.create_user_group_membership($1, $2)'
         async with self.pool.acquire() as conn:
             row = await conn.fetchrow(query, membership.user_id, membership.group_id)
+        await invalidate_user_cache_by_id(membership.user_id)
         return UserGroupMembershipRead(**dict(row))
 
     async def get(self, user_id: UUID, group_id: int) -> Optional[UserGroupMembershipRead]:
@@ -124,12 +132,14 @@ class UserGroupMembershipService:
         query = 'SELECT * FROM accounts.deactivate_user_group_membership($1, $2)'
         async with self.pool.acquire() as conn:
             row = await conn.fetchrow(query, user_id, group_id)
+        await invalidate_user_cache_by_id(user_id)
         return UserGroupMembershipRead(**dict(row))
 
     async def reactivate(self, user_id: UUID, group_id: int) -> UserGroupMembershipRead:
         query = 'SELECT * FROM accounts.reactivate_user_group_membership($1, $2)'
         async with self.pool.acquire() as conn:
             row = await conn.fetchrow(query, user_id, group_id)
+        await invalidate_user_cache_by_id(user_id)
         return UserGroupMembershipRead(**dict(row))
 
 class UserContactService:
@@ -140,6 +150,8 @@ class UserContactService:
         query = 'SELECT * FROM accounts.create_user_contact($1, $2, $3)'
         async with self.pool.acquire() as conn:
             row = await conn.fetchrow(query, contact.user_id, contact.contact_type_id, contact.value)
+        await invalidate_user_cache_by_id(contact.user_id)
+        await register_identifiers([row["value"]])
         return UserContactRead(**dict(row))
 
     async def get_by_id(self, contact_id: UUID) -> Optional[UserContactRead]:
@@ -158,12 +170,15 @@ class UserContactService:
         query = 'SELECT * FROM accounts.deactivate_user_contact($1)'
         async with self.pool.acquire() as conn:
             row = await conn.fetchrow(query, contact_id)
+        await invalidate_user_cache_by_id(row["user_id"])
         return UserContactRead(**dict(row))
 
     async def reactivate(self, contact_id: UUID) -> UserContactRead:
         query = 'SELECT * FROM accounts.reactivate_user_contact($1)'
         async with self.pool.acquire() as conn:
             row = await conn.fetchrow(query, contact_id)
+        await invalidate_user_cache_by_id(row["user_id"])
+        await register_identifiers([row["value"]])
         return UserContactRead(**dict(row))
 
 class ContactTypeService:
@@ -0,0 +1,103 @@
+import shutil
+from pathlib import Path
+from typing import IO, Optional
+from uuid import UUID, uuid4
+
+from asyncpg import Pool, Record
+from fastapi import UploadFile
+from loguru import logger
+from starlette.concurrency import run_in_threadpool
+
+from src.db.queries import (
+    CREATE_IMPORT_JOB,
+    FINISH_IMPORT_JOB,
+    GET_IMPORT_JOB,
+    START_IMPORT_JOB,
+    UPDATE_IMPORT_JOB_PROGRESS,
+)
+from src.exceptions.exceptions import AppException, ImportJobNotFound, QueueUnavailableError
+from src.queue.publisher import publish_import_job
+from src.schemas.users import ImportJobRead, UploadResult
+from src.services.users_upload import bulk_create_users_from_file
+from src.settings import settings
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def _save_upload(source: IO[bytes], target: Path) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    source.seek(0)
+    with target.open("wb") as f:
+        shutil.copyfileobj(source, f, COPY_BUFFER_SIZE)
+
+
+async def create_import_job(pool: Pool, file: UploadFile) -> ImportJobRead:
+    """
+    Сохраняет загрузку в users_import_dir, заводит задачу в accounts.user_import_jobs
+    и ставит её в очередь. Сам импорт делает src.worker.
+    """
+    target = Path(settings.users_import_dir) / f"{uuid4()}{Path(file.filename or '').suffix.lower()}"
+    await run_in_threadpool(_save_upload, file.file, target)
+
+    job = await pool.fetchrow(CREATE_IMPORT_JOB, file.filename, str(target))
+    try:
+        await publish_import_job(str(job["id"]))
+    except QueueUnavailableError:
+        await pool.fetchrow(FINISH_IMPORT_JOB, job["id"], "failed", "Import queue is unavailable")
+        target.unlink(missing_ok=True)
+        raise
+    logger.info(f"Import job {job['id']} queued: {file.filename}")
+    return ImportJobRead(**job)
+
+async def get_import_job(pool: Pool, job_id: UUID) -> ImportJobRead:
+    job = await pool.fetchrow(GET_IMPORT_JOB, job_id)
+    if job is None:
+        raise ImportJobNotFound(str(job_id))
+    return ImportJobRead(**job)
+
+
+async def run_import_job(pool: Pool, job_id: UUID) -> Optional[Record]:
+    """
+    Выполняет импорт в воркере; None — задача уже завершена (повторная доставка).
+    Прогресс и новые ошибки пишутся в задачу после каждой порции.
+    Ошибка файла (формат, колонки, файла нет) — задача failed; остальные исключения
+    пробрасываются, решение о повторе принимает воркер.
+    """
+    job = await pool.fetchrow(START_IMPORT_JOB, job_id)
+    if job is None:
+        return None
+    path = Path(job["file_path"])
+    logger.info(f"Import job {job_id} started: {job['filename']}")
+
+    saved_errors = 0
+
+    async def on_progress(result: UploadResult) -> None:
+        nonlocal saved_errors
+        new_errors = result.errors[saved_errors:]
+        saved_errors = len(result.errors)
+        await pool.execute(
+            UPDATE_IMPORT_JOB_PROGRESS, job_id, result.total_rows, result.success_count,
+            result.skipped_count, result.error_count, new_errors,
+        )
+
+    try:
+        with path.open("rb") as f:
+            await bulk_create_users_from_file(UploadFile(file=f, filename=job["filename"]), pool, on_progress)
+    except (AppException, FileNotFoundError) as e:
+        reason = e.message if isinstance(e, AppException) else f"File not found: {path}"
+        logger.warning(f"Import job {job_id} failed: {reason}")
+        return await fail_import_job(pool, job_id, reason)
+
+    job = await pool.fetchrow(FINISH_IMPORT_JOB, job_id, "done", None)
+    path.unlink(missing_ok=True)
+    logger.info(
+        f"Import job {job_id} done: {job['total_rows']} rows, created={job['created_count']}, "
+        f"skipped={job['skipped_count']}, errors={job['error_count']}"
+    )
+    return job
+
+async def fail_import_job(pool: Pool, job_id: UUID, reason: str) -> Record:
+    """Задача failed, файл удаляется — повторять её уже не будут."""
+    job = await pool.fetchrow(FINISH_IMPORT_JOB, job_id, "failed", reason)
+    Path(job["file_path"]).unlink(missing_ok=True)
+    return job
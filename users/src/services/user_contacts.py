@@ -4,6 +4,7 @@ from uuid import UUID
 
 from src.utils.json_utils import normalize_user_row, maybe_json_dumps, maybe_json_loads
 from src.schemas.user_contacts import UserContactCreate, UserContactRead
+from src.cashe.user_cashe import invalidate_user_cache_by_id, register_identifiers
 
 
 class UserContactService:
@@ -14,6 +15,8 @@ class UserContactService:
         query = 'SELECT * FROM accounts.create_user_contact($1, $2, $3)'
         async with self.pool.acquire() as conn:
             row = await conn.fetchrow(query, contact.user_id, contact.contact_type_id, contact.value)
+        await invalidate_user_cache_by_id(contact.user_id)
+        await register_identifiers([row["value"]])
         return UserContactRead(**dict(row))
 
     async def get_by_id(self, contact_id: UUID) -> Optional[UserContactRead]:
@@ -32,12 +35,15 @@ class UserContactService:
         query = 'SELECT * FROM accounts.deactivate_user_contact($1)'
         async with self.pool.acquire() as conn:
             row = await conn.fetchrow(query, contact_id)
+        await invalidate_user_cache_by_id(row["user_id"])
         return UserContactRead(**dict(row))
 
     async def reactivate(self, contact_id: UUID) -> UserContactRead:
         query = 'SELECT * FROM accounts.reactivate_user_contact($1)'
         async with self.pool.acquire() as conn:
             row = await conn.fetchrow(query, contact_id)
+        await invalidate_user_cache_by_id(row["user_id"])
+        await register_identifiers([row["value"]])
         return UserContactRead(**dict(row))
 
 
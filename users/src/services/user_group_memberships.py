@@ -4,6 +4,7 @@ from uuid import UUID
 
 from src.utils.json_utils import normalize_user_row, maybe_json_dumps, maybe_json_loads
 from src.schemas.user_group_memberships import UserGroupMembershipCreate, UserGroupMembershipRead, UserGroupMembershipUpdate
+from src.cashe.user_cashe import invalidate_user_cache_by_id
 
 
 class UserGroupMembershipService:
@@ -14,6 +15,7 @@ class UserGroupMembershipService:
         query = 'SELECT * FROM accounts.create_user_group_membership($1, $2)'
         async with self.pool.acquire() as conn:
             row = await conn.fetchrow(query, membership.user_id, membership.group_id)
+        await invalidate_user_cache_by_id(membership.user_id)
         return UserGroupMembershipRead(**dict(row))
 
     async def get(self, user_id: UUID, group_id: int) -> Optional[UserGroupMembershipRead]:
@@ -32,10 +34,12 @@ class UserGroupMembershipService:
         query = 'SELECT * FROM accounts.deactivate_user_group_membership($1, $2)'
         async with self.pool.acquire() as conn:
             row = await conn.fetchrow(query, user_id, group_id)
+        await invalidate_user_cache_by_id(user_id)
         return UserGroupMembershipRead(**dict(row))
 
     async def reactivate(self, user_id: UUID, group_id: int) -> UserGroupMembershipRead:
         query = 'SELECT * FROM accounts.reactivate_user_group_membership($1, $2)'
         async with self.pool.acquire() as conn:
             row = await conn.fetchrow(query, user_id, group_id)
+        await invalidate_user_cache_by_id(user_id)
         return UserGroupMembershipRead(**dict(row))
@@ -3,6 +3,7 @@ from typing import List, Optional
 
 from src.utils.json_utils import normalize_user_row, maybe_json_dumps, maybe_json_loads
 from src.schemas.user_groups import UserGroupCreate, UserGroupUpdate, UserGroupRead
+from src.cashe.user_cashe import invalidate_all_user_cache
 
 
 class UserGroupService:
@@ -31,4 +32,7 @@ class UserGroupService:
                 group.description,  # может быть None
                 group.is_active  # может быть None
             )
+        # Имя и активность группы входят в закэшированные профили всех её участников
+        if row and (group.name is not None or group.is_active is not None):
+            await invalidate_all_user_cache()
         return UserGroupRead(**dict(row)) if row else None
@@ -1,12 +1,24 @@
-from fastapi import Depends, UploadFile
-from asyncpg import Pool
-from typing import List, Optional, Dict, Any
+from fastapi import Depends
+from asyncpg import Pool, Record
+from asyncpg.exceptions import RaiseError, UniqueViolationError
+from typing import List, Optional, Dict, Any, Tuple
 from uuid import UUID
 import logging
-
-from src.utils.json_utils import maybe_json_loads
-from src.schemas.common import PaginatedResponse
-from src.dependencies.db import get_accounts_db_pool_dep
+import time
+
+from src.schemas.common import PaginatedResponse, CursorPage
+from src.dependencies.db import get_read_db_pool
+from src.db.queries import (
+    GET_USER,
+    GET_USERS_WITH_RELATIONS,
+    GET_USERS_WITH_RELATIONS_AFTER,
+    COUNT_USERS,
+    ESTIMATE_USERS,
+    CREATE_USERS_BULK,
+)
+from src.settings import settings
+from src.cashe.user_cashe import invalidate_user_cache_by_id, register_identifiers
+from src.utils.cursor import FIRST_PAGE_CURSOR, encode_cursor, decode_cursor
 from src.exceptions.exceptions import ValidationError
 from src.utils.json_utils import (
     normalize_user_row,
@@ -18,14 +30,39 @@ from src.schemas.users import (
     UserUpdate,
     UserRead,
     BulkUserItem,
-    UserBulkCreateRow,
-    UploadResult,
+    BulkCreateResult,
+    BulkCreateRowResult,
     UserReadExtended,
 )
 
 
 logger = logging.getLogger(__name__)
 
+# (момент подсчёта, COUNT(*)) для total=exact в keyset-пагинации
+_exact_total: Optional[Tuple[float, int]] = None
+
+
+async def create_users_bulk(
+        pool: Pool,
+        phones: List[str],
+        external_ids: List[Optional[str]],
+        group_names: List[str],
+) -> List[Record]:
+    """
+    Пачка пользователей одним вызовом accounts.create_users_bulk: строки (idx, status, user_id, reason).
+    unique_violation — тот же phone параллельно создал другой запрос: повторная разметка его пропустит.
+    """
+    for attempt in range(2):
+        try:
+            rows = await pool.fetch(CREATE_USERS_BULK, phones, external_ids, group_names)
+            break
+        except UniqueViolationError:
+            if attempt:
+                raise
+            logger.warning("Bulk create: concurrent phone insert, retrying batch")
+    await register_identifiers(phones[row["idx"] - 1] for row in rows if row["status"] == "created")
+    return rows
+
 class UserService:
     def __init__(self, db_pool: Pool):
         self.pool = db_pool
@@ -42,9 +79,8 @@ class UserService:
         return UserRead(**normalize_user_row(row_dict))
 
     async def get_by_id(self, user_id: int) -> Optional[UserRead]:
-        query = 'SELECT * FROM accounts.get_user($1)'
         async with self.pool.acquire() as conn:
-            row = await conn.fetchrow(query, user_id)
+            row = await conn.fetchrow(GET_USER, user_id)
         return UserRead(**normalize_user_row(row)) if row else None
 
     async def get_all(self) -> List[UserRead]:
@@ -68,56 +104,50 @@ class UserService:
                 is_active,
                 profile_json,
             )
+        await invalidate_user_cache_by_id(user_id)
+        if is_active:
+            await register_identifiers([str(user_id)])  # мог быть закэширован как несуществующий
         return UserRead(**normalize_user_row(row)) if row else None
 
     async def bulk_create_users(
             self,
             interface: str,
             users: List[BulkUserItem],
-    ):
-        created = skipped = 0
-        errors = []
-
+    ) -> BulkCreateResult:
+        """
+        Вся пачка — один вызов accounts.create_users_bulk (staging + три многострочных INSERT).
+        Строки не падают по одной: в ответе статус created/skipped/error для каждой.
+        """
         allowed_interfaces = {"driver", "courier"}
         if interface not in allowed_interfaces:
             raise ValidationError("interface", interface, f"interface must be one of {allowed_interfaces}")
 
-        async with self.pool.acquire() as conn:
-            async with conn.transaction():
-                for idx, user in enumerate(users):
-                    try:
-                        payload = {
-                            "phone": user.phone,
-                            "group_names": [interface],
-                        }
-                        if user.external_id is not None:
-                            payload["profile"] = {"external_id": user.external_id}
-
-                        json_payload = maybe_json_dumps(payload)
-
-                        row = await conn.fetchrow(
-                             "SELECT status, user_id FROM accounts.create_user_bulk_stub($1::jsonb)",
-                            json_payload,
-                        )
-
-                        if row["status"] == "created":
-                            created += 1
-                        elif row["status"] == "skipped":
-                            skipped += 1
-                        else:
-                            errors.append({
-                                "index": idx,
-                                "phone": user.phone,
-                                "reason": f"unexpected status: {row['status']}"
-                            })
-
-                    except Exception as e:
-                        errors.append({
-                            "index": idx,
-                            "phone": user.phone,
-                            "reason": str(e)
-                        })
-                        logger.error(f"Bulk create error for phone {user.phone}: {e}")
+        phones = [user.phone for user in users]
+        external_ids = [user.external_id for user in users]
+
+        try:
+            rows = await create_users_bulk(self.pool, phones, external_ids, [interface])
+        except RaiseError as e:
+            raise ValidationError("interface", interface, str(e))
+
+        items = [
+            BulkCreateRowResult(
+                index=row["idx"] - 1,
+                phone=phones[row["idx"] - 1],
+                status=row["status"],
+                user_id=row["user_id"],
+                reason=row["reason"],
+            )
+            for row in rows
+        ]
+        created = sum(1 for item in items if item.status == "created")
+        skipped = sum(1 for item in items if item.status == "skipped")
+        errors = [
+            {"index": item.index, "phone": item.phone, "reason": item.reason}
+            for item in items if item.status == "error"
+        ]
+        logger.info(f"Bulk create ({interface}): created={created}, skipped={skipped}, errors={len(errors)}")
+        return BulkCreateResult(created=created, skipped=skipped, errors=errors, items=items)
 
     async def get_paginated(self, page: int, size: int) -> PaginatedResponse[UserReadExtended]:
         """
@@ -131,12 +161,9 @@ class UserService:
 
         offset = (page - 1) * size
 
-        rows = await self.pool.fetch(
-            "SELECT * FROM accounts.get_users_with_relations($1, $2)",
-            size, offset
-        )
+        rows = await self.pool.fetch(GET_USERS_WITH_RELATIONS, size, offset)
 
-        total = await self.pool.fetchval("SELECT accounts.count_users()")
+        total = await self.pool.fetchval(COUNT_USERS)
 
         items = []
         for row in rows:
@@ -155,45 +182,54 @@ class UserService:
             pages=pages
         )
 
-def get_user_service(pool: Pool = Depends(get_accounts_db_pool_dep)) -> UserService:
-    return UserService(pool)
+    async def get_cursor_page(
+            self,
+            cursor: Optional[str],
+            size: int,
+            total_mode: str = "none",
+    ) -> CursorPage[UserReadExtended]:
+        """
+        Keyset-пагинация по (created_at DESC, id DESC): accounts.get_users_with_relations_after
+        читает только строки страницы, время не растёт с номером страницы.
+        total_mode: none — без подсчёта, estimate — pg_class.reltuples,
+        exact — COUNT(*), кэшируется на users_total_cache_ttl_seconds.
+        """
+        if size < 1 or size > 100:
+            raise ValidationError("pagination", str(size), "size должен быть от 1 до 100")
 
+        created_at, user_id = decode_cursor(cursor) if cursor else FIRST_PAGE_CURSOR
+        # +1 строка: есть ли следующая страница, без отдельного запроса
+        rows = await self.pool.fetch(GET_USERS_WITH_RELATIONS_AFTER, size + 1, created_at, user_id)
 
-async def bulk_create_users_from_file(file: UploadFile) -> UploadResult:
-    """
-    Обрабатывает загруженный файл с колонками: phone, user_groups.
-    Пример user_groups: "client,driver"
-    Возвращает статистику по обработке.
-    """
-    required_columns = {"phone", "user_groups"}
-    rows = await read_file_to_dicts(file, required_columns=required_columns)
+        next_cursor = None
+        if len(rows) > size:
+            rows = rows[:size]
+            next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+
+        items = []
+        for row in rows:
+            d = dict(row)
+            d["profile"] = maybe_json_loads(d.get("profile"))
+            items.append(UserReadExtended(**d))
 
-    success_count = 0
-    errors: List[str] = []
+        return CursorPage(
+            items=items,
+            size=size,
+            next_cursor=next_cursor,
+            total=await self._total(total_mode),
+            total_mode=total_mode,
+        )
 
-    for idx, raw_row in enumerate(rows, start=2):  # строка 1 — заголовок
-        try:
-            # Валидация через Pydantic
-            validated = UserBulkCreateRow(**raw_row)
-
-            # Парсим группы
-            groups = [g.strip() for g in validated.user_groups.split(",") if g.strip()]
-            if not groups:
-                raise ValidationError("user_groups", validated.user_groups,
-                                      "Поле user_groups не содержит валидных групп")
-
-            # 🔜 Здесь будет вызов PostgreSQL-функции, например:
-            # await assign_groups_by_phone(validated.phone, groups)
-            logger.debug(f"Привязка групп {groups} к телефону {validated.phone}")
-            success_count += 1
-
-        except Exception as e:
-            phone_display = raw_row.get("phone", "N/A")
-            logger.error(f"File upload error at row {idx}: {e}")
-            errors.append(f"строка {idx} (phone='{phone_display}'): {str(e)}")
-
-    return UploadResult(
-        success_count=success_count,
-        error_count=len(errors),
-        errors=errors
-    )
+    async def _total(self, total_mode: str) -> Optional[int]:
+        global _exact_total
+        if total_mode == "estimate":
+            return await self.pool.fetchval(ESTIMATE_USERS)
+        if total_mode == "exact":
+            now = time.monotonic()
+            if _exact_total is None or now - _exact_total[0] > settings.users_total_cache_ttl_seconds:
+                _exact_total = (now, await self.pool.fetchval(COUNT_USERS))
+            return _exact_total[1]
+        return None
+
+def get_user_service(pool: Pool = Depends(get_read_db_pool)) -> UserService:
+    return UserService(pool)
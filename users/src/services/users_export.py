@@ -0,0 +1,122 @@
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterator, Callable, Dict, Iterable, List
+
+from asyncpg import Pool, Record
+from loguru import logger
+
+from src.db.queries import EXPORT_USERS
+from src.settings import settings
+from src.utils.xlsx_stream import XlsxStreamWriter
+
+EXPORT_COLUMNS = ("id", "is_active", "created_at", "updated_at", "groups", "contacts", "profile")
+
+EXPORT_MEDIA_TYPES: Dict[str, str] = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def _json_default(value):
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+def _flat_row(record: Record) -> List:
+    """Строка для CSV/XLSX: группы через запятую, contacts/profile — JSON."""
+    return [
+        str(record["id"]),
+        record["is_active"],
+        record["created_at"].isoformat() if record["created_at"] else None,
+        record["updated_at"].isoformat() if record["updated_at"] else None,
+        ",".join(record["groups"] or ()),
+        json.dumps(record["contacts"] or [], ensure_ascii=False),
+        json.dumps(record["profile"], ensure_ascii=False) if record["profile"] is not None else None,
+    ]
+
+
+class _CsvEncoder:
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def _take(self) -> bytes:
+        data = self._buffer.getvalue().encode()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def start(self) -> bytes:
+        self._writer.writerow(EXPORT_COLUMNS)
+        return "\ufeff".encode() + self._take()  # BOM — Excel открывает UTF-8 без кракозябр
+
+    def encode(self, records: Iterable[Record]) -> bytes:
+        self._writer.writerows(_flat_row(r) for r in records)
+        return self._take()
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class _NdjsonEncoder:
+    def start(self) -> bytes:
+        return b""
+
+    def encode(self, records: Iterable[Record]) -> bytes:
+        return "".join(json.dumps(dict(r), ensure_ascii=False, default=_json_default) + "\n" for r in records).encode()
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class _XlsxEncoder:
+    def __init__(self):
+        self._writer = XlsxStreamWriter("users")
+
+    def start(self) -> bytes:
+        return self._writer.write_rows([EXPORT_COLUMNS])
+
+    def encode(self, records: Iterable[Record]) -> bytes:
+        return self._writer.write_rows(_flat_row(r) for r in records)
+
+    def finish(self) -> bytes:
+        return self._writer.close()
+
+
+_ENCODERS: Dict[str, Callable] = {"csv": _CsvEncoder, "ndjson": _NdjsonEncoder, "xlsx": _XlsxEncoder}
+
+
+async def stream_users_export(pool: Pool, fmt: str, gzip: bool) -> AsyncIterator[bytes]:
+    """
+    Выгрузка всех пользователей: серверный курсор accounts.export_users() в read-only
+    транзакции, порциями по users_export_batch_size строк; каждая порция кодируется
+    и сразу отдаётся. gzip=True — порции сжимаются здесь же одним gzip-потоком
+    (Z_SYNC_FLUSH после каждой, чтобы клиент получал данные без задержки).
+    """
+    encoder = _ENCODERS[fmt]()
+    compressor = zlib.compressobj(settings.users_export_gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if gzip else None
+
+    def out(data: bytes) -> bytes:
+        if compressor is None:
+            return data
+        return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    exported = 0
+    async with pool.acquire() as conn:
+        # REPEATABLE READ — один снимок на всю выгрузку; на реплике допустима только read-only
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            yield out(encoder.start())
+            cursor = await conn.cursor(EXPORT_USERS)
+            while True:
+                records = await cursor.fetch(settings.users_export_batch_size)
+                if not records:
+                    break
+                exported += len(records)
+                chunk = encoder.encode(records)
+                if chunk:
+                    yield out(chunk)
+
+    tail = encoder.finish()
+    yield compressor.compress(tail) + compressor.flush() if compressor else tail
+    logger.info(f"Users export ({fmt}) finished: {exported} rows")
@@ -0,0 +1,123 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from asyncpg import Pool
+from asyncpg.exceptions import RaiseError
+from fastapi import UploadFile
+from loguru import logger
+
+from src.schemas.users import UploadResult
+from src.services.users import create_users_bulk
+from src.settings import settings
+from src.utils.file_parsing import FileRow, iter_file_chunks
+from src.utils.upload_validation import ValidRow, validate_upload_rows
+
+REQUIRED_COLUMNS = {"phone", "user_groups"}
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def init_upload_workers() -> None:
+    """Процессы для валидации и нормализации телефонов: phonenumbers — чистый Python, держит GIL."""
+    global _executor
+    if _executor is None and settings.users_upload_workers > 0:
+        # spawn: воркеры не наследуют потоки и event loop родителя
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.users_upload_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+def close_upload_workers() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+async def _next_validated(chunks: AsyncIterator[List[FileRow]]) -> Optional[Tuple[List[ValidRow], List[str]]]:
+    chunk = await anext(chunks, None)
+    if chunk is None:
+        return None
+    # без init_upload_workers (скрипты, бенчмарк) — пул потоков по умолчанию
+    return await asyncio.get_running_loop().run_in_executor(
+        _executor, validate_upload_rows, chunk, settings.users_upload_phone_region,
+    )
+
+def _add_error(result: UploadResult, message: str) -> None:
+    result.error_count += 1
+    if len(result.errors) < settings.users_upload_max_errors:
+        result.errors.append(message)
+
+async def _write_chunk(pool: Pool, valid: List[ValidRow], result: UploadResult) -> None:
+    """Порция в БД: по одному accounts.create_users_bulk на каждый набор групп."""
+    by_groups: Dict[Tuple[str, ...], List[Tuple[int, str]]] = {}
+    for line, phone, groups in valid:
+        by_groups.setdefault(groups, []).append((line, phone))
+
+    for groups, items in by_groups.items():
+        phones = [phone for _, phone in items]
+        try:
+            rows = await create_users_bulk(pool, phones, [None] * len(phones), list(groups))
+        except RaiseError as e:
+            for line, phone in items:
+                _add_error(result, f"строка {line} (phone='{phone}'): {e}")
+            continue
+        for row in rows:
+            line, phone = items[row["idx"] - 1]
+            if row["status"] == "created":
+                result.success_count += 1
+            elif row["status"] == "skipped":
+                result.skipped_count += 1
+            else:
+                _add_error(result, f"строка {line} (phone='{phone}'): {row['reason']}")
+
+
+async def bulk_create_users_from_file(
+        file: UploadFile,
+        pool: Pool,
+        on_progress: Optional[Callable[[UploadResult], Awaitable[None]]] = None,
+) -> UploadResult:
+    """
+    Обрабатывает загруженный файл с колонками: phone, user_groups.
+    Пример user_groups: "client,driver"
+
+    Конвейер по порциям users_upload_chunk_size строк: чтение (поток) → валидация и
+    нормализация телефонов (процессы init_upload_workers) → accounts.create_users_bulk.
+    Следующая порция читается и валидируется, пока текущая пишется в БД; в памяти не больше
+    двух порций, ошибок хранится не больше users_upload_max_errors (счётчик — все).
+    on_progress вызывается после каждой порции.
+    """
+    result = UploadResult(success_count=0, error_count=0)
+    chunks = iter_file_chunks(file, REQUIRED_COLUMNS, settings.users_upload_chunk_size)
+    pending = asyncio.ensure_future(_next_validated(chunks))
+    try:
+        while True:
+            validated = await pending
+            if validated is None:
+                break
+            pending = asyncio.ensure_future(_next_validated(chunks))
+
+            valid, errors = validated
+            result.total_rows += len(valid) + len(errors)
+            for message in errors:
+                _add_error(result, message)
+            await _write_chunk(pool, valid, result)
+
+            logger.info(
+                f"Bulk upload {file.filename}: {result.total_rows} rows, created={result.success_count}, "
+                f"skipped={result.skipped_count}, errors={result.error_count}"
+            )
+            if on_progress is not None:
+                await on_progress(result)
+    finally:
+        if not pending.done():
+            pending.cancel()
+        try:
+            await pending
+        except (Exception, asyncio.CancelledError):
+            pass  # ошибка уже поднята из цикла выше или порция не нужна
+        await chunks.aclose()
+
+    return result
@@ -1,7 +1,7 @@
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict, PostgresDsn, Field, RedisDsn
 from pathlib import Path
-from typing import Set
+from typing import Literal, Optional, Set
 
 
 class Settings(BaseSettings):
@@ -14,9 +14,86 @@ class Settings(BaseSettings):
     )  # используем DB=1
     log_dir: Path = Path("./logs")
 
+    # Пулы asyncpg (src/db/pools.py): write — HAProxy 5432, read — HAProxy 5433
+    db_write_pool_min_size: int = 2
+    db_write_pool_max_size: int = 10
+    db_read_pool_min_size: int = 5
+    db_read_pool_max_size: int = 20
+    db_pool_acquire_timeout: Optional[float] = 10.0  # сек ожидания свободного соединения
+    db_pool_command_timeout: Optional[float] = None
+    db_pool_max_inactive_connection_lifetime: float = 300.0
+    db_pool_max_queries: int = 50_000  # после N запросов соединение пересоздаётся
+    db_pool_statement_cache_size: int = 100
+
+    # Read-your-writes: чтение с реплики только если она проиграла LSN последней записи
+    replica_routing_enabled: bool = True
+    replica_max_lag_seconds: Optional[float] = 5.0  # больше — читаем с мастера; None — не проверять
+    replica_wait_ms: float = 50.0  # сколько ждать, пока реплика догонит LSN записи
+    replica_poll_interval_ms: float = 5.0
+    replica_state_cache_seconds: float = 1.0  # сколько верить прочитанному отставанию соединения без запроса
+    replica_user_lsn_ttl_seconds: int = 60  # сколько помнить LSN записи пользователя
+
+    # Кэш GET /accounts/users/by-identifier: Redis (L2) с обратным индексом user_id → ключи,
+    # L1 в памяти процесса перед Redis (0 записей — выключен), инвалидация L1 — через Redis pub/sub
+    user_cache_ttl_seconds: int = 3600
+    user_cache_invalidation_grace_seconds: int = 10  # столько после изменения пользователя его не кэшируем
+    # Защита от stampede: одна загрузка из БД на identifier в процессе (single-flight) и между
+    # процессами (блокировка в Redis; не дождались записи за wait_ms — читаем из БД сами)
+    user_cache_coalescing_enabled: bool = True
+    user_cache_lock_ttl_ms: int = 2000
+    user_cache_lock_wait_ms: int = 300
+    user_cache_lock_poll_ms: int = 20
+    # Несуществующие identifier: отрицательная запись на N сек (0 — выключено) и Bloom-фильтр
+    # значений контактов в Redis (capacity и error_rate задают размер: 1M / 1% ≈ 1.2 МБ)
+    user_cache_negative_ttl_seconds: int = 30
+    user_cache_bloom_enabled: bool = False
+    user_cache_bloom_capacity: int = 1_000_000
+    user_cache_bloom_error_rate: float = 0.01
+    user_cache_bloom_rebuild_interval_seconds: int = 3600
+    user_cache_l1_max_size: int = 10000
+    user_cache_l1_ttl_seconds: float = 30.0
+    user_cache_invalidation_channel: str = "users:cache:invalidate"
+
+    # Проверка access-токенов auth (src/dependencies/auth.py): HS256 — общий с auth секрет,
+    # RS256 / EdDSA — публичные ключи из JWKS auth; отзывы — стрим access_token_revocations в Redis auth (DB=0)
+    auth_enabled: bool = False
+    auth_jwt_algorithm: Literal["HS256", "RS256", "EdDSA"] = "HS256"  # как JWT_ALGORITHM у auth
+    auth_jwt_secret_key: Optional[str] = None  # только для HS256
+    auth_jwks_url: str = "http://auth:8001/.well-known/jwks.json"
+    auth_jwks_refresh_seconds: float = 300.0  # и сразу при неизвестном kid (не чаще раза в 30 с)
+    auth_redis_url: RedisDsn = "redis://localhost:6379/0"
+    auth_revocation_max_staleness_seconds: float = 5.0  # дольше — отзыв проверяется в Redis на каждый запрос
+    auth_claims_cache_size: int = 10_000
+
+    # Keyset-пагинация GET /accounts/users/cursor: total=exact считается не чаще раза в N сек
+    users_total_cache_ttl_seconds: float = 30.0
+
+    # Выгрузка GET /accounts/users/export: строк на одну выборку из курсора, уровень gzip
+    users_export_batch_size: int = 1000
+    users_export_gzip_level: int = 6
+
+    # Загрузка файла POST /accounts/users/bulk/upload: строк в порции, процессов для валидации
+    # телефонов (0 — пул потоков), регион для номеров без "+", сколько текстов ошибок вернуть
+    users_upload_chunk_size: int = 1000
+    users_upload_workers: int = 2
+    users_upload_phone_region: str = "RU"
+    users_upload_max_errors: int = 1000
+
+    # Фоновые импорты: файлы — в каталоге, общем для API и воркера (src.worker);
+    # одновременно импортов на воркер (prefetch) — каждый держит не больше одного соединения write-пула
+    users_import_dir: str = "imports"
+    users_import_queue_name: str = "users.import"
+    users_import_dead_letter_queue_name: str = "users.import.dead"
+    users_import_max_concurrent_jobs: int = 2
+    users_import_max_redeliveries: int = 3  # после N падений воркера задача failed, сообщение — в dead-очередь
+    # Пауза перед возвратом задачи в очередь после временной ошибки: base * 2^попытка, не больше max
+    users_import_retry_base_delay_seconds: float = 2.0
+    users_import_retry_max_delay_seconds: float = 60.0
+
     # Настройки загрузки файлов (общие для всех сервисов с bulk-операциями)
     MAX_UPLOAD_FILE_SIZE: int = Field(10 * 1024 * 1024, description="10 MB")
-    ALLOWED_UPLOAD_EXTENSIONS: Set[str] = {".csv", ".xlsx", ".xls"}
+    # .xls (старый бинарный формат) потоково не читается — только .xlsx
+    ALLOWED_UPLOAD_EXTENSIONS: Set[str] = {".csv", ".xlsx"}
 
     model_config = ConfigDict(
         env_file=".env",
@@ -0,0 +1,25 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Tuple
+from uuid import UUID
+
+from src.exceptions.exceptions import ValidationError
+
+# Начало выдачи для keyset-пагинации: любая реальная пара (created_at, id) строго меньше.
+# asyncpg передаёт datetime.max в timestamptz как 'infinity'.
+FIRST_PAGE_CURSOR: Tuple[datetime, UUID] = (datetime.max, UUID("ffffffff-ffff-ffff-ffff-ffffffffffff"))
+
+
+def encode_cursor(created_at: datetime, user_id: UUID) -> str:
+    """(created_at, id) последней строки страницы → непрозрачный токен."""
+    raw = f"{created_at.isoformat()}|{user_id}".encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, user_id = raw.split("|")
+        return datetime.fromisoformat(created_at), UUID(user_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValidationError("cursor", cursor, "Invalid cursor")
@@ -1,35 +1,99 @@
-import pandas as pd
-from io import BytesIO
-from fastapi import UploadFile, HTTPException
-from typing import List, Dict, Set
+import csv
+import io
+from typing import IO, AsyncIterator, Dict, Iterator, List, Sequence, Tuple
+
+from fastapi import UploadFile
+from openpyxl import load_workbook
+from starlette.concurrency import run_in_threadpool
 
 from src.exceptions.exceptions import FileUploadError, ValidationError
 
+# (номер строки в файле, {колонка: значение}); заголовок — строка 1
+FileRow = Tuple[int, Dict[str, str]]
+
+
 def normalize_columns(columns: list) -> list:
     """Приводит названия колонок к единому виду (например, snake_case)."""
-    return [col.strip().lower().replace(" ", "_") for col in columns]
+    return [str(col or "").strip().lower().replace(" ", "_") for col in columns]
 
-async def read_file_to_dicts(file: UploadFile, required_columns: set) -> List[Dict]:
-    """
-    Читает .csv / .xlsx и возвращает список строк как dict.
-    Проверяет наличие обязательных колонок.
-    """
-    contents = await file.read()
-    await file.seek(0)
+def _cell_to_str(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # телефон в Excel часто хранится числом: 79161234567.0
+    return str(value).strip()
+
+def _iter_csv(fileobj: IO[bytes]) -> Iterator[Sequence]:
+    fileobj.seek(0)
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        yield from csv.reader(text)
+    finally:
+        text.detach()  # файл закрывает UploadFile, не обёртка
 
+def _iter_xlsx(fileobj: IO[bytes]) -> Iterator[Sequence]:
+    fileobj.seek(0)
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
     try:
-        if file.filename.endswith(".csv"):
-            df = pd.read_csv(BytesIO(contents), encoding="utf-8-sig")
-        elif file.filename.endswith((".xlsx", ".xls")):
-            df = pd.read_excel(BytesIO(contents))
-        else:
-            raise ValidationError("file_format", file.filename or "unknown", "Неподдерживаемый формат")
-    except Exception as e:
-        raise FileUploadError("Ошибка чтения файла")
-
-    df.columns = normalize_columns(list(df.columns))
-    missing = required_columns - set(df.columns)
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+def _iter_dict_rows(rows: Iterator[Sequence], required_columns: set) -> Iterator[FileRow]:
+    header = next(rows, None)
+    if header is None:
+        raise ValidationError("file_columns", "", "Файл пустой")
+    columns = normalize_columns(list(header))
+    missing = required_columns - set(columns)
     if missing:
         raise ValidationError("file_columns", str(missing), f"Отсутствуют обязательные колонки: {missing}")
 
-    return df.to_dict(orient="records")
\ No newline at end of file
+    # Берём только нужные колонки — остальные не держим в памяти
+    positions = [(name, columns.index(name)) for name in sorted(required_columns)]
+    for line, row in enumerate(rows, start=2):
+        values = {name: _cell_to_str(row[pos]) if pos < len(row) else "" for name, pos in positions}
+        if any(values.values()):
+            yield line, values
+
+def _take(rows: Iterator[FileRow], size: int) -> List[FileRow]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            break
+    return chunk
+
+async def iter_file_chunks(
+        file: UploadFile,
+        required_columns: set,
+        chunk_size: int,
+) -> AsyncIterator[List[FileRow]]:
+    """
+    Читает .csv / .xlsx порциями по chunk_size строк, не загружая файл целиком:
+    CSV — csv.reader поверх потока, XLSX — openpyxl в режиме read_only (построчный итератор).
+    Разбор идёт в пуле потоков, event loop не блокируется.
+    Проверяет наличие обязательных колонок (до первой порции).
+    """
+    filename = (file.filename or "").lower()
+    if filename.endswith(".csv"):
+        raw_rows = _iter_csv(file.file)
+    elif filename.endswith(".xlsx"):
+        raw_rows = _iter_xlsx(file.file)
+    else:
+        raise ValidationError("file_format", file.filename or "unknown", "Неподдерживаемый формат")
+
+    rows = _iter_dict_rows(raw_rows, required_columns)
+    try:
+        while True:
+            try:
+                chunk = await run_in_threadpool(_take, rows, chunk_size)
+            except ValidationError:
+                raise
+            except Exception as e:
+                raise FileUploadError(f"Ошибка чтения файла: {e}")
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        rows.close()
+        raw_rows.close()
@@ -0,0 +1,37 @@
+from typing import Dict, List, Tuple
+
+import phonenumbers
+
+from src.schemas.users import UserBulkCreateRow
+
+# Выполняется в процессах пула загрузки (src/services/users_upload.py):
+# модуль импортируется в каждом воркере, поэтому без тяжёлых зависимостей.
+
+# (номер строки в файле, телефон E164, группы)
+ValidRow = Tuple[int, str, Tuple[str, ...]]
+
+
+def normalize_phone(phone: str, region: str) -> str:
+    """Телефон в E164; без "+" номер разбирается как номер региона region."""
+    try:
+        parsed = phonenumbers.parse(phone, region)
+    except phonenumbers.NumberParseException as e:
+        raise ValueError(f"Invalid phone format: {e}")
+    if not phonenumbers.is_valid_number(parsed):
+        raise ValueError("Invalid phone")
+    return phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
+
+def validate_upload_rows(rows: List[Tuple[int, Dict[str, str]]], region: str) -> Tuple[List[ValidRow], List[str]]:
+    """Порция строк файла → (валидные строки, ошибки в формате 'строка 5 (phone=...): причина')."""
+    valid: List[ValidRow] = []
+    errors: List[str] = []
+    for line, raw_row in rows:
+        try:
+            validated = UserBulkCreateRow(**raw_row)
+            groups = tuple(sorted({g.strip() for g in validated.user_groups.split(",") if g.strip()}))
+            if not groups:
+                raise ValueError("Поле user_groups не содержит валидных групп")
+            valid.append((line, normalize_phone(validated.phone, region), groups))
+        except ValueError as e:
+            errors.append(f"строка {line} (phone='{raw_row.get('phone', 'N/A')}'): {e}")
+    return valid, errors
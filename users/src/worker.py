@@ -0,0 +1,97 @@
+"""
+Воркер фоновых импортов: вычитывает id задач из RabbitMQ (users_import_queue_name)
+и выполняет импорт файла порциями через accounts.create_users_bulk.
+
+Запуск отдельным процессом (нужен тот же users_import_dir, что и у API):
+    python -m src.worker
+
+Одновременно выполняется не больше users_import_max_concurrent_jobs импортов (prefetch),
+каждый держит не больше одного соединения write-пула — интерактивные запросы API
+идут через собственный пул процесса API и импортами не вытесняются.
+ack — после завершения задачи; упавший на середине импорт придёт повторно и начнётся заново.
+"""
+import asyncio
+import signal
+from uuid import UUID
+
+from aio_pika.abc import AbstractIncomingMessage
+from loguru import logger
+
+from src.db.pools import init_pools, close_pools, get_write_pool
+from src.logger_config import setup_logger
+from src.queue.connection import init_queue, close_queue, get_channel, declare_import_queue
+from src.services.import_jobs import fail_import_job, run_import_job
+from src.services.users_upload import init_upload_workers, close_upload_workers
+from src.settings import settings
+
+
+def retry_delay(deliveries: int) -> float:
+    """Экспоненциальная пауза перед nack: короткий отказ БД не исчерпывает попытки за миллисекунды."""
+    return min(
+        settings.users_import_retry_base_delay_seconds * 2 ** deliveries,
+        settings.users_import_retry_max_delay_seconds,
+    )
+
+
+async def handle_message(message: AbstractIncomingMessage) -> None:
+    try:
+        job_id = UUID(message.body.decode())
+    except ValueError:
+        logger.error(f"Malformed import message {message.message_id}, moving to dead-letter")
+        await message.reject(requeue=False)
+        return
+
+    try:
+        job = await run_import_job(get_write_pool(), job_id)
+    except Exception as e:
+        # Временная ошибка (БД/сеть) — вернуть в очередь после паузы; на последней попытке задача failed,
+        # брокер переложит сообщение в dead-очередь
+        deliveries = int((message.headers or {}).get("x-delivery-count", 0))
+        if deliveries < settings.users_import_max_redeliveries:
+            delay = retry_delay(deliveries)
+            logger.error(f"Import job {job_id} failed, requeue in {delay:.1f}s: {e}")
+            await asyncio.sleep(delay)
+            await message.nack(requeue=True)
+            return
+        logger.error(f"Import job {job_id} failed after {deliveries + 1} attempts: {e}")
+        try:
+            await fail_import_job(get_write_pool(), job_id, str(e))
+        except Exception as fail_error:
+            logger.error(f"Cannot mark import job {job_id} as failed: {fail_error}")
+        await message.reject(requeue=False)
+        return
+
+    if job is None:
+        logger.info(f"Import job {job_id} already finished, skipping")
+    await message.ack()
+
+
+async def run_worker() -> None:
+    logger.info("🚀 Starting users import worker...")
+    await init_pools()
+    init_upload_workers()
+    await init_queue()
+
+    channel = get_channel()
+    await channel.set_qos(prefetch_count=settings.users_import_max_concurrent_jobs)
+    queue = await declare_import_queue(channel)
+    consumer_tag = await queue.consume(handle_message)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await stop.wait()
+
+    logger.info("🛑 Stopping users import worker...")
+    # Сначала перестаём брать новые задачи; неподтверждённые вернутся в очередь
+    await queue.cancel(consumer_tag)
+    await close_queue()
+    close_upload_workers()
+    await close_pools()
+
+
+if __name__ == "__main__":
+    setup_logger()
+    asyncio.run(run_worker())
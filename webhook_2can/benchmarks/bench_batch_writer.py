@@ -0,0 +1,110 @@
+"""
+Сравнение записи вебхуков: по одному (to_can.f_syspay) vs micro-batching (to_can.f_syspay_batch).
+
+Запуск (из webhook_2can/, нужна БД с функциями to_can.*):
+    python -m benchmarks.bench_batch_writer --count 5000 --concurrency 200
+
+Выводит webhooks/sec и commits/sec (по pg_stat_database.xact_commit).
+Внимание: пишет синтетические строки в to_can.syspay.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+
+import asyncpg
+from loguru import logger
+
+from src.db.codecs import register_json_codecs
+from src.schemas.webhook import WebhookPayload
+from src.settings import settings
+from src.services.db_service import WebhookBatchWriter, call_webhook_function
+
+
+def make_payload() -> bytes:
+    return json.dumps({
+        "Id": str(uuid.uuid4()),
+        "MID": "bench-mid",
+        "Amount": "100.00",
+        "ReaderId": "bench-reader",
+        "CreatedAt": "2025-01-01T00:00:00",
+        "PaidAt": "2025-01-01T00:00:00",
+        "Inputtype": 1,
+        "ClientName": "bench",
+        "Description": "bench",
+    }).encode()
+
+
+async def xact_commits(pool: asyncpg.Pool) -> int:
+    return await pool.fetchval(
+        "SELECT xact_commit FROM pg_stat_database WHERE datname = current_database()"
+    )
+
+
+async def run_concurrently(count: int, concurrency: int, write) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            body = make_payload()
+            await write(body, WebhookPayload.model_validate_json(body))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(count)))
+    return time.perf_counter() - start
+
+
+async def bench(count: int, concurrency: int, batch_size: int, linger_ms: float, in_flight: int):
+    pool = await asyncpg.create_pool(
+        str(settings.database_write_url), min_size=in_flight, max_size=20, init=register_json_codecs
+    )
+
+    async def single(body: bytes, payload: WebhookPayload):
+        async with pool.acquire() as conn:
+            await call_webhook_function(conn, body, payload)
+
+    commits_before = await xact_commits(pool)
+    elapsed = await run_concurrently(count, concurrency, single)
+    commits = await xact_commits(pool) - commits_before
+    logger.info(
+        f"per-request: {count / elapsed:,.0f} webhooks/s, "
+        f"{commits / elapsed:,.0f} commits/s ({commits} commits, {elapsed:.2f}s)"
+    )
+
+    writer = WebhookBatchWriter(pool, batch_size, linger_ms, in_flight)
+    writer.start()
+    commits_before = await xact_commits(pool)
+    elapsed = await run_concurrently(
+        count, concurrency, lambda body, payload: writer.submit((body, payload))
+    )
+    await writer.stop()
+    commits = await xact_commits(pool) - commits_before
+    logger.info(
+        f"batched (size={batch_size}, linger={linger_ms}ms, in_flight={in_flight}): "
+        f"{count / elapsed:,.0f} webhooks/s, "
+        f"{commits / elapsed:,.0f} commits/s ({commits} commits, {elapsed:.2f}s)"
+    )
+
+    await pool.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=settings.webhook_batch_max_size)
+    parser.add_argument("--linger-ms", type=float, default=settings.webhook_batch_linger_ms)
+    parser.add_argument("--in-flight", type=int, default=settings.webhook_batch_max_in_flight)
+    args = parser.parse_args()
+
+    # Минимальная настройка логгера (без файлов — только в консоль)
+    logger.remove()
+    logger.add(
+        sink=sys.stderr,
+        level="INFO",
+        format="<green>{time:HH:mm:ss}</green> | <level>{message}</level>"
+    )
+
+    asyncio.run(bench(args.count, args.concurrency, args.batch_size, args.linger_ms, args.in_flight))
@@ -0,0 +1,86 @@
+"""
+CPU на один вебхук в Python-части горячего пути (без сети и БД):
+
+- old: json.loads → WebhookPayload(**) → model_dump → json.dumps (str в asyncpg, text-кодек);
+- new: WebhookPayload.model_validate_json(bytes) → исходные байты в binary-кодек json.
+
+Запуск (из webhook_2can/):
+    python -m benchmarks.bench_json_path --count 20000
+
+Меряется time.process_time — только процессорное время текущего процесса.
+"""
+import argparse
+import json
+import sys
+import time
+import uuid
+
+from loguru import logger
+
+from src.db.codecs import _encode_json
+from src.schemas.webhook import WebhookPayload
+
+
+def make_body(size: int) -> bytes:
+    payload = {
+        "Id": str(uuid.uuid4()),
+        "MID": "000012345",
+        "Amount": "15000",
+        "ReaderId": "bench-reader",
+        "CreatedAt": "2025-01-01T00:00:00",
+        "PaidAt": "2025-01-01T00:00:00",
+        "Inputtype": 1,
+        "ClientName": "bench",
+        "Description": "bench",
+    }
+    # Добиваем дополнительными полями (extra="allow") до нужного размера
+    i = 0
+    while len(json.dumps(payload)) < size:
+        payload[f"Extra{i}"] = "x" * 64
+        i += 1
+    return json.dumps(payload).encode()
+
+
+def old_path(body: bytes) -> str:
+    payload = WebhookPayload(**json.loads(body))
+    return json.dumps(payload.model_dump())
+
+
+def new_path(body: bytes) -> bytes:
+    WebhookPayload.model_validate_json(body)
+    return _encode_json(body)
+
+
+def measure(func, body: bytes, count: int) -> float:
+    """Микросекунды CPU на вызов."""
+    start = time.process_time()
+    for _ in range(count):
+        func(body)
+    return (time.process_time() - start) / count * 1_000_000
+
+
+def bench(count: int) -> None:
+    for size in (1024, 10 * 1024):
+        body = make_body(size)
+        old = measure(old_path, body, count)
+        new = measure(new_path, body, count)
+        logger.info(
+            f"{len(body)} bytes: old {old:.1f} µs, new {new:.1f} µs "
+            f"({old / new:.1f}x less CPU)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=20000)
+    args = parser.parse_args()
+
+    # Минимальная настройка логгера (без файлов — только в консоль)
+    logger.remove()
+    logger.add(
+        sink=sys.stderr,
+        level="INFO",
+        format="<green>{time:HH:mm:ss}</green> | <level>{message}</level>"
+    )
+
+    bench(args.count)
@@ -0,0 +1,167 @@
+"""
+Запросов в секунду на пустом роуте: старый стек RequestIDMiddleware + LoggingMiddleware
+(BaseHTTPMiddleware, две f-строки в лог на запрос) vs RequestContextMiddleware (чистый ASGI,
+access-запись через очередь и поток).
+
+Запуск (из webhook_2can/):
+    PYTHONPATH=.. python -m benchmarks.bench_middleware --count 20000 --concurrency 50
+
+Без сети и сервера: приложение вызывается напрямую как ASGI-callable, поэтому
+в замер попадают только FastAPI + middleware. Лог приложения в обоих случаях пишется
+в файл во временной директории с тем же форматом, что и setup_logger.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from fastapi import FastAPI, Response
+from loguru import logger
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from common.middleware.request_context import (
+    RequestContextMiddleware,
+    close_access_log,
+    init_access_log,
+    request_id_ctx,
+)
+
+
+# --- Старый стек (до перехода на чистый ASGI), копия для сравнения ---
+
+class LegacyRequestIDMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
+        request_id_ctx.set(request_id)
+        request.state.request_id = request_id
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        request_id = request_id_ctx.get() or getattr(request.state, "request_id", "unknown")
+        start_time = time.time()
+        logger.info(
+            f"[{request_id}] {request.method} {request.url.path} "
+            f"Query: {request.query_params} | "
+            f"Client: {request.client.host if request.client else 'unknown'}"
+        )
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        logger.info(f"[{request_id}] {response.status_code} ({process_time:.3f}s)")
+        return response
+
+
+def make_app(stack: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return Response(status_code=204)
+
+    if stack == "before":
+        app.add_middleware(LegacyRequestIDMiddleware)
+        app.add_middleware(LegacyLoggingMiddleware)
+    else:
+        app.add_middleware(RequestContextMiddleware)
+    return app
+
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": "/ping",
+    "raw_path": b"/ping",
+    "root_path": "",
+    "query_string": b"",
+    "headers": [(b"host", b"bench")],
+    "client": ("127.0.0.1", 50000),
+    "server": ("127.0.0.1", 8000),
+}
+
+
+async def call(app: FastAPI) -> None:
+    done = asyncio.Event()
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and not message.get("more_body", False):
+            done.set()
+
+    await app(dict(SCOPE), receive, send)
+
+
+async def measure(app: FastAPI, count: int, concurrency: int) -> float:
+    """Запросов в секунду."""
+    remaining = count
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await call(app)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return count / (time.perf_counter() - start)
+
+
+async def bench(count: int, concurrency: int, rounds: int) -> None:
+    results = {}
+    for stack in ("before", "after"):
+        app = make_app(stack)
+        if stack == "after":
+            init_access_log()
+        await measure(app, min(count, 1000), concurrency)  # прогрев
+        results[stack] = statistics.median(
+            [await measure(app, count, concurrency) for _ in range(rounds)]
+        )
+        if stack == "after":
+            close_access_log()
+        logger.bind(bench=True).info(f"{stack}: {results[stack]:.0f} req/s")
+    logger.bind(bench=True).info(f"after/before: {results['after'] / results['before']:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    log_dir = Path(tempfile.mkdtemp(prefix="bench_middleware_"))
+    logger.remove()
+    # Лог приложения — в файл, как в setup_logger; в консоль — только отчёт
+    logger.add(
+        log_dir / "webhook.log",
+        level="INFO",
+        encoding="utf-8",
+        format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}",
+        filter=lambda record: "bench" not in record["extra"],
+    )
+    logger.add(
+        sink=sys.stderr,
+        level="INFO",
+        format="<green>{time:HH:mm:ss}</green> | <level>{message}</level>",
+        filter=lambda record: "bench" in record["extra"],
+    )
+
+    asyncio.run(bench(args.count, args.concurrency, args.rounds))
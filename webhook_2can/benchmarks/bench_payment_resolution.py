@@ -0,0 +1,103 @@
+"""
+Время БД на один вебхук: полный путь to_can.f_syspay (CTE-цепочка f_payment)
+vs to_can.f_syspay_resolved с параметрами из снимка MerchantResolutionCache.
+
+Запуск (из webhook_2can/, нужен реальный MID из to_can.merchant_tap2go):
+    python -m benchmarks.bench_payment_resolution --mid 000012345 --amount 15000 --count 2000
+
+Каждый вызов выполняется в транзакции с ROLLBACK — данные не остаются в БД.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import uuid
+
+import asyncpg
+from loguru import logger
+
+from src.settings import settings
+from src.services.merchant_cache import MerchantResolutionCache
+
+
+def make_payload(mid: str, amount: str) -> dict:
+    return {
+        "Id": str(uuid.uuid4()),
+        "MID": mid,
+        "Amount": amount,
+        "ReaderId": "bench-reader",
+        "CreatedAt": "2025-01-01T00:00:00",
+        "PaidAt": "2025-01-01T00:00:00",
+        "Inputtype": 1,
+        "ClientName": "bench",
+        "Description": "bench",
+    }
+
+
+async def measure(conn: asyncpg.Connection, count: int, query: str, make_args) -> list:
+    timings = []
+    for _ in range(count):
+        args = make_args()
+        transaction = conn.transaction()
+        await transaction.start()
+        start = time.perf_counter()
+        await conn.fetchval(query, *args)
+        timings.append((time.perf_counter() - start) * 1000)
+        await transaction.rollback()
+    return timings
+
+
+def report(name: str, timings: list) -> None:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    logger.info(
+        f"{name}: mean {statistics.mean(timings):.3f} ms, "
+        f"p50 {statistics.median(timings):.3f} ms, p95 {p95:.3f} ms"
+    )
+
+
+async def bench(mid: str, amount: str, count: int):
+    cache = MerchantResolutionCache(str(settings.database_write_url), ttl_seconds=3600)
+    await cache.refresh()
+    resolved = cache.resolve(mid, amount)
+    if resolved is None:
+        logger.error(f"MID {mid} with amount {amount} is not resolvable from the snapshot")
+        return
+
+    conn = await asyncpg.connect(str(settings.database_write_url))
+    try:
+        full = await measure(
+            conn, count,
+            "SELECT to_can.f_syspay($1::json)",
+            lambda: (json.dumps(make_payload(mid, amount)),),
+        )
+        slim = await measure(
+            conn, count,
+            "SELECT to_can.f_syspay_resolved($1::json, $2::jsonb)",
+            lambda: (json.dumps(make_payload(mid, amount)), resolved),
+        )
+    finally:
+        await conn.close()
+
+    report("f_syspay (full CTE)", full)
+    report("f_syspay_resolved (cached)", slim)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mid", required=True)
+    parser.add_argument("--amount", default="10000")
+    parser.add_argument("--count", type=int, default=2000)
+    args = parser.parse_args()
+
+    # Минимальная настройка логгера (без файлов — только в консоль)
+    logger.remove()
+    logger.add(
+        sink=sys.stderr,
+        level="INFO",
+        format="<green>{time:HH:mm:ss}</green> | <level>{message}</level>"
+    )
+
+    asyncio.run(bench(args.mid, args.amount, args.count))
@@ -0,0 +1,3 @@
+"""
+Нагрузочный стенд для POST /webhook: см. benchmarks/loadtest/__main__.py.
+"""
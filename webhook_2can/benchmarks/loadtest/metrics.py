@@ -0,0 +1,54 @@
+import time
+from typing import Dict, List, Optional
+
+from asyncpg import Pool
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max/mean в миллисекундах (nearest-rank)."""
+    if not samples:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0, "mean": 0.0}
+    ordered = sorted(samples)
+
+    def rank(q: float) -> float:
+        return ordered[min(len(ordered) - 1, max(0, int(len(ordered) * q + 0.5) - 1))]
+
+    return {
+        "p50": round(rank(0.50), 3),
+        "p95": round(rank(0.95), 3),
+        "p99": round(rank(0.99), 3),
+        "max": round(ordered[-1], 3),
+        "mean": round(sum(ordered) / len(ordered), 3),
+    }
+
+
+class _TimedAcquire:
+    def __init__(self, pool: "InstrumentedPool", timeout: Optional[float]):
+        self._pool = pool
+        self._ctx = pool.pool.acquire(timeout=timeout)
+
+    async def __aenter__(self):
+        start = time.perf_counter_ns()
+        conn = await self._ctx.__aenter__()
+        self._pool.waits_ms.append((time.perf_counter_ns() - start) / 1_000_000)
+        return conn
+
+    async def __aexit__(self, *exc):
+        return await self._ctx.__aexit__(*exc)
+
+
+class InstrumentedPool:
+    """
+    Обёртка над asyncpg.Pool для стенда: время ожидания acquire()
+    (очередь за свободным соединением + его проверка). Остальное проксируется.
+    """
+
+    def __init__(self, pool: Pool):
+        self.pool = pool
+        self.waits_ms: List[float] = []
+
+    def acquire(self, *, timeout: Optional[float] = None) -> _TimedAcquire:
+        return _TimedAcquire(self, timeout)
+
+    def __getattr__(self, name):
+        return getattr(self.pool, name)
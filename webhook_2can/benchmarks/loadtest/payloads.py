@@ -0,0 +1,56 @@
+import json
+import random
+import uuid
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+
+def synthetic_payload() -> dict:
+    """Вебхук 2can с обязательными полями WebhookPayload."""
+    return {
+        "Id": str(uuid.uuid4()),
+        "MID": f"{random.randint(1, 99999):09d}",
+        "Amount": str(random.randint(100, 500000)),
+        "ReaderId": "bench-reader",
+        "CreatedAt": "2025-01-01T00:00:00",
+        "PaidAt": "2025-01-01T00:00:00",
+        "Inputtype": 1,
+        "ClientName": "bench",
+        "Description": "bench",
+    }
+
+
+def load_recorded(path: Path) -> List[dict]:
+    """
+    Записанные вебхуки: JSON Lines (один payload на строку) или JSON-массив.
+    Строки, в которых нет объекта с "Id", пропускаются.
+    """
+    text = path.read_text(encoding="utf-8").strip()
+    if text.startswith("["):
+        items = json.loads(text)
+    else:
+        items = [json.loads(line) for line in text.splitlines() if line.strip()]
+    return [item for item in items if isinstance(item, dict) and "Id" in item]
+
+
+def generate_bodies(
+    count: int,
+    duplicate_ratio: float,
+    recorded: Optional[List[dict]] = None,
+    seed: int = 0,
+) -> Iterator[bytes]:
+    """
+    Тела запросов. Доля duplicate_ratio — повторы уже отправленных Id
+    (как ретраи шлюза); остальные получают свежий Id, даже если взяты из записи.
+    """
+    rnd = random.Random(seed)
+    sent: List[bytes] = []
+    for i in range(count):
+        if sent and rnd.random() < duplicate_ratio:
+            yield rnd.choice(sent)
+            continue
+        payload = dict(recorded[i % len(recorded)]) if recorded else synthetic_payload()
+        payload["Id"] = str(uuid.UUID(int=rnd.getrandbits(128), version=4))
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        sent.append(body)
+        yield body
@@ -0,0 +1,62 @@
+-- Локальная замена to_can для нагрузочного стенда (benchmarks.loadtest --setup-standin).
+-- Повторяет контракт to_can.f_syspay / f_syspay_batch (вставка в syspay с ON CONFLICT по id_uuid,
+-- ответы ok/duplicated, status пачки), но без f_payment и справочников — меряем сервис, а не CTE-цепочку.
+-- НЕ применять к боевой БД: функции to_can.* будут перезаписаны.
+
+CREATE SCHEMA IF NOT EXISTS "to_can";
+
+CREATE TABLE IF NOT EXISTS "to_can"."syspay" (
+  "id" serial PRIMARY KEY,
+  "json_inside" jsonb,
+  "id_uuid" uuid NOT NULL,
+  CONSTRAINT "id_uuid" UNIQUE ("id_uuid")
+);
+
+CREATE OR REPLACE FUNCTION "to_can"."f_syspay"("x_json" json)
+  RETURNS "pg_catalog"."json" AS $BODY$
+	DECLARE
+		xid UUID;
+		xjson JSONB;
+		inserted_rows INTEGER;
+BEGIN
+	xjson := x_json::jsonb;
+	xid := (xjson ->> 'Id')::uuid;
+	INSERT INTO "to_can".syspay (json_inside, id_uuid)
+    VALUES (xjson, xid)
+    ON CONFLICT (id_uuid) DO NOTHING;
+
+    GET DIAGNOSTICS inserted_rows = ROW_COUNT;
+
+    IF inserted_rows = 0 THEN
+        RETURN json_build_object('ans', 'duplicated', 'id', xid);
+    END IF;
+    RETURN json_build_object('ans', 'ok', 'id', xid);
+END;
+$BODY$
+  LANGUAGE plpgsql VOLATILE
+  COST 100;
+
+-- Тип результата менялся (добавлен status) — CREATE OR REPLACE его не меняет
+DROP FUNCTION IF EXISTS "to_can"."f_syspay_batch"(jsonb[], jsonb[]);
+
+CREATE OR REPLACE FUNCTION "to_can"."f_syspay_batch"("x_jsons" jsonb[], "x_resolved" jsonb[]=NULL::jsonb[])
+  RETURNS TABLE("idx" int4, "status" text, "ans" json) AS $BODY$
+BEGIN
+    FOR i IN 1 .. COALESCE(array_length(x_jsons, 1), 0) LOOP
+        idx := i;
+        BEGIN
+            ans := to_can.f_syspay(x_jsons[i]::json);
+            status := ans ->> 'ans';
+        EXCEPTION WHEN data_exception OR check_violation OR not_null_violation THEN
+            status := 'invalid';
+            ans := json_build_object('error', SQLERRM, 'sqlstate', SQLSTATE);
+        END;
+        RETURN NEXT;
+    END LOOP;
+END;
+$BODY$
+  LANGUAGE plpgsql VOLATILE
+  COST 100
+  ROWS 100;
+
+TRUNCATE "to_can"."syspay";
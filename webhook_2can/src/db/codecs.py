@@ -0,0 +1,30 @@
+from asyncpg import Connection
+
+
+# json/jsonb в binary-формате: в БД уходят исходные байты тела запроса,
+# из БД приходят байты ответа — без json.loads/json.dumps в Python.
+# На вход принимаются и bytes, и str (например, заранее собранный x_resolved).
+
+def _encode_json(value) -> bytes:
+    return value if isinstance(value, bytes) else value.encode()
+
+def _decode_json(data: bytes) -> bytes:
+    return data
+
+def _encode_jsonb(value) -> bytes:
+    # binary jsonb = байт версии формата (1) + текст
+    return b"\x01" + _encode_json(value)
+
+def _decode_jsonb(data: bytes) -> bytes:
+    return data[1:]
+
+async def register_json_codecs(conn: Connection) -> None:
+    """init= для пулов: json/jsonb как сырые bytes."""
+    await conn.set_type_codec(
+        "json", schema="pg_catalog",
+        encoder=_encode_json, decoder=_decode_json, format="binary",
+    )
+    await conn.set_type_codec(
+        "jsonb", schema="pg_catalog",
+        encoder=_encode_jsonb, decoder=_decode_jsonb, format="binary",
+    )
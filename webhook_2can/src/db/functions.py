@@ -1,12 +1,26 @@
 from asyncpg import Connection
-from typing import Any, Dict
-import json
-
-async def call_webhook_function(conn: Connection, payload: Dict[str, Any]) -> Any:
-    # Пример: вызов функции в схеме to_can
-    json_str = json.dumps(payload, ensure_ascii=False)
-    result = await conn.fetchval(
-        "SELECT to_can.f_syspay($1::json)",
-        json_str
-    )
+from typing import Any, List, Optional, Tuple
+
+# Соединения пула используют src.db.codecs: json/jsonb передаются как bytes.
+
+F_SYSPAY = "SELECT to_can.f_syspay($1::json)"
+F_SYSPAY_RESOLVED = "SELECT to_can.f_syspay_resolved($1::json, $2::jsonb)"
+F_SYSPAY_BATCH = "SELECT idx, status, ans FROM to_can.f_syspay_batch($1::jsonb[], $2::jsonb[]) ORDER BY idx"
+
+
+async def call_webhook_function(conn: Connection, body: bytes, resolved: Optional[str] = None) -> Any:
+    # Исходное тело запроса уходит в to_can.f_syspay как есть — без повторной сериализации
+    if resolved is not None:
+        # Параметры мерчанта уже разрешены кэшем — без CTE-цепочки f_payment
+        return await conn.fetchval(F_SYSPAY_RESOLVED, body, resolved)
+    result = await conn.fetchval(F_SYSPAY, body)
     return result
+
+async def call_webhook_batch_function(
+    conn: Connection,
+    bodies: List[bytes],
+    resolved: Optional[List[Optional[str]]] = None,
+) -> List[Tuple[str, Any]]:
+    # Пачка вебхуков за один round trip; (status, ответ) в порядке входного массива
+    rows = await conn.fetch(F_SYSPAY_BATCH, bodies, resolved)
+    return [(row["status"], row["ans"]) for row in rows]
@@ -1,23 +1,71 @@
-from asyncpg import Pool, create_pool
+from typing import List, Optional
 
 from src.settings import settings
+from src.db.codecs import register_json_codecs
+from src.db.functions import F_SYSPAY, F_SYSPAY_RESOLVED, F_SYSPAY_BATCH
+from common.db_pool import InstrumentedPool, create_instrumented_pool
+from common.metrics import observe_query
 
 
-write_pool: Pool
-read_pool: Pool
+write_pool: Optional[InstrumentedPool] = None
+read_pool: Optional[InstrumentedPool] = None
+
+def _write_hot_statements() -> List[str]:
+    # Готовим только то, что реально вызывается при текущих настройках
+    statements = [F_SYSPAY]
+    if settings.webhook_reference_cache_enabled:
+        statements.append(F_SYSPAY_RESOLVED)
+    if settings.webhook_batch_enabled:
+        statements.append(F_SYSPAY_BATCH)
+    return statements
+
+def _create_pool(dsn: str, name: str, min_size: int, max_size: int, hot_statements: List[str]):
+    return create_instrumented_pool(
+        dsn,
+        name=name,
+        min_size=min_size,
+        max_size=max_size,
+        acquire_timeout=settings.db_pool_acquire_timeout,
+        command_timeout=settings.db_pool_command_timeout,
+        max_inactive_connection_lifetime=settings.db_pool_max_inactive_connection_lifetime,
+        max_queries=settings.db_pool_max_queries,
+        statement_cache_size=settings.db_pool_statement_cache_size,
+        register_codecs=register_json_codecs,
+        hot_statements=hot_statements,
+        query_logger=observe_query,
+    )
 
 async def init_pools():
     global write_pool, read_pool
-    write_pool = await create_pool(str(settings.database_write_url))
-    read_pool = await create_pool(str(settings.database_read_url))
+    # HAProxy: 5432 — мастер (запись), 5433 — реплики (чтение); размеры задаются раздельно
+    write_pool = await _create_pool(
+        str(settings.database_write_url), "write",
+        settings.db_write_pool_min_size, settings.db_write_pool_max_size,
+        _write_hot_statements(),
+    )
+    read_pool = await _create_pool(
+        str(settings.database_read_url), "read",
+        settings.db_read_pool_min_size, settings.db_read_pool_max_size,
+        [],
+    )
 
 async def close_pools():
-    await write_pool.close()
-    await read_pool.close()
+    global write_pool, read_pool
+    for pool in (write_pool, read_pool):
+        if pool is not None:
+            await pool.close()
+    write_pool = read_pool = None
 
 # Зависимости для роутов
-def get_write_pool() -> Pool:
+def get_write_pool() -> InstrumentedPool:
     return write_pool
 
-def get_read_pool() -> Pool:
+def get_read_pool() -> InstrumentedPool:
     return read_pool
+
+def hot_statements() -> List[str]:
+    return _write_hot_statements()
+
+def pools_stats() -> List[dict]:
+    """Пустой список, пока пулы не созданы (scrape /metrics до lifespan)."""
+    return [pool.stats() for pool in (write_pool, read_pool) if pool is not None]
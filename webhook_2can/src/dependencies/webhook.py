@@ -1,17 +1,60 @@
-from fastapi import Depends
+from fastapi import Depends, Request, Response, status
+from fastapi.exceptions import RequestValidationError
 from asyncpg import Pool, PostgresError
 from loguru import logger
+from pydantic import ValidationError
 
 from src.schemas.webhook import WebhookPayload
 #from src.db.functions import call_webhook_function
 from src.exceptions import DatabaseError, WebhookProcessingError
 from src.dependencies.db import get_db_pool
-from src.services.db_service import call_webhook_function
+from src.services.db_service import write_webhook
+from src.services.dedup import get_deduplicator
+from src.queue.publisher import publish_webhook
+from src.settings import settings
+
+
+async def read_webhook_body(request: Request) -> tuple[bytes, WebhookPayload]:
+    """
+    Валидирует обязательные поля прямо по сырым байтам (pydantic-core, без json.loads)
+    и возвращает исходное тело — оно уходит в БД/очередь без повторной сериализации.
+    """
+    body = await request.body()
+    try:
+        payload = WebhookPayload.model_validate_json(body)
+    except ValidationError as e:
+        # Формат 422 как у обычной валидации тела FastAPI
+        errors = [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)]
+        raise RequestValidationError(errors, body=body)
+    return body, payload
 
 
 async def process_webhook_payload(
-    payload: WebhookPayload,
+    response: Response,
+    webhook: tuple[bytes, WebhookPayload] = Depends(read_webhook_body),
     db_pool: Pool = Depends(get_db_pool)
 ):
-    async with db_pool.acquire() as conn:
-        return await call_webhook_function(conn, payload.model_dump())
+    body, payload = webhook
+    deduplicator = get_deduplicator()
+    if deduplicator:
+        duplicate = await deduplicator.check(payload.Id)
+        if duplicate:
+            return duplicate
+
+    if settings.webhook_ingest_mode == "queue":
+        return await enqueue_webhook_payload(body, payload, response)
+    result = await write_webhook(db_pool, body, payload)
+    if deduplicator:
+        await deduplicator.remember(payload.Id)
+    # Ответ БД — уже готовый JSON
+    return Response(content=result, media_type="application/json")
+
+
+async def enqueue_webhook_payload(body: bytes, payload: WebhookPayload, response: Response) -> dict:
+    """
+    Режим accept-then-process: только кладём payload в очередь.
+    Повторная доставка безопасна — f_syspay отсекает дубли по id_uuid.
+    """
+    await publish_webhook(body, message_id=payload.Id)
+    response.status_code = status.HTTP_202_ACCEPTED
+    return {"ans": "accepted", "id": payload.Id}
@@ -2,5 +2,6 @@ from .webhook import (
     WebhookProcessingError,
     InvalidWebhookData,
     DatabaseError,
+    QueueUnavailableError,
 )
 from .base import BaseWebhookException
\ No newline at end of file
@@ -7,4 +7,7 @@ class InvalidWebhookData(BaseWebhookException):
     pass
 
 class DatabaseError(BaseWebhookException):
-    pass
\ No newline at end of file
+    pass
+
+class QueueUnavailableError(BaseWebhookException):
+    pass
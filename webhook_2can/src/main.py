@@ -1,31 +1,70 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 
-from src.middleware.request_id import RequestIDMiddleware
-from src.middleware.logging import LoggingMiddleware
-from src.db.pools import init_pools, close_pools
+from common.middleware.request_context import RequestContextMiddleware, init_access_log, close_access_log
+from common.middleware.metrics import MetricsMiddleware
+from common.access_token import access_token_verifier_stats
+from common.metrics import (
+    observe_request,
+    preallocate,
+    register_pool_collector,
+    register_token_verifier_collector,
+    render_metrics,
+)
+from src.db.pools import init_pools, close_pools, get_write_pool, hot_statements, pools_stats
+from src.dependencies.auth import init_auth, close_auth
+from src.services.db_service import start_batch_writer, stop_batch_writer
+from src.services.dedup import init_deduplicator, close_deduplicator
+from src.services.merchant_cache import init_merchant_cache, close_merchant_cache
+from src.queue.connection import init_queue, close_queue
+from src.settings import settings
 from src.routers import webhook
 from src.exceptions import (
     BaseWebhookException,
     InvalidWebhookData,
     WebhookProcessingError,
     DatabaseError,
+    QueueUnavailableError,
 )
 
 
 @asynccontextmanager
 async def lifespan(app):
+    init_access_log()
     logger.info("🚀 Initializing database connection pools for webhook...")
     await init_pools()
+    preallocate(app.routes, hot_statements())
+    init_auth()
+    init_deduplicator()
+    await init_merchant_cache()
+    if settings.webhook_batch_enabled:
+        start_batch_writer(
+            get_write_pool(),
+            settings.webhook_batch_max_size,
+            settings.webhook_batch_linger_ms,
+            settings.webhook_batch_max_in_flight,
+        )
+    if settings.webhook_ingest_mode == "queue":
+        logger.info("🚀 Connecting to RabbitMQ (ingest mode: queue)...")
+        await init_queue()
     yield
+    if settings.webhook_ingest_mode == "queue":
+        await close_queue()
+    await stop_batch_writer()
+    await close_deduplicator()
+    await close_merchant_cache()
+    await close_auth()
     logger.info("🛑 Closing database connection pools for webhook...")
     await close_pools()
+    close_access_log()
 
 
 app = FastAPI(lifespan=lifespan)
+register_pool_collector(pools_stats)
+register_token_verifier_collector(access_token_verifier_stats)
 
 # --- Exception handlers ---
 @app.exception_handler(InvalidWebhookData)
@@ -42,6 +81,13 @@ async def database_error_handler(request, exc: DatabaseError):
         content={"detail": exc.detail}
     )
 
+@app.exception_handler(QueueUnavailableError)
+async def queue_unavailable_handler(request, exc: QueueUnavailableError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": exc.detail}
+    )
+
 @app.exception_handler(WebhookProcessingError)
 async def webhook_processing_error_handler(request, exc: WebhookProcessingError):
     return JSONResponse(
@@ -57,8 +103,7 @@ async def base_webhook_exception_handler(request, exc: BaseWebhookException):
         content={"detail": exc.detail}
     )
 
-app.add_middleware(RequestIDMiddleware)
-app.add_middleware(LoggingMiddleware)
+app.add_middleware(RequestContextMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # ← ограничь в продакшене!
@@ -66,10 +111,18 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Последним — самый внешний: в длительность входят остальные middleware
+app.add_middleware(MetricsMiddleware, observe=observe_request)
 
 app.include_router(webhook.router, prefix="/webhook")
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("src.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -0,0 +1,21 @@
+from prometheus_client import Counter
+
+from common.metrics import CACHE_REQUESTS
+
+
+WEBHOOK_DUPLICATES = Counter(
+    "webhook_duplicates_total",
+    "Duplicate webhooks by where they were detected",
+    ("source",),
+)
+
+# Предсозданные серии для горячего пути
+DEDUP_MEMORY_HIT = CACHE_REQUESTS.labels("webhook_dedup_memory", "hit")
+DEDUP_MEMORY_MISS = CACHE_REQUESTS.labels("webhook_dedup_memory", "miss")
+DEDUP_REDIS_HIT = CACHE_REQUESTS.labels("webhook_dedup_redis", "hit")
+DEDUP_REDIS_MISS = CACHE_REQUESTS.labels("webhook_dedup_redis", "miss")
+REFERENCE_CACHE_HIT = CACHE_REQUESTS.labels("webhook_reference", "hit")
+REFERENCE_CACHE_MISS = CACHE_REQUESTS.labels("webhook_reference", "miss")
+DUPLICATES_MEMORY = WEBHOOK_DUPLICATES.labels("memory")
+DUPLICATES_REDIS = WEBHOOK_DUPLICATES.labels("redis")
+DUPLICATES_DB = WEBHOOK_DUPLICATES.labels("db")
@@ -0,0 +1,44 @@
+import aio_pika
+from aio_pika.abc import AbstractRobustConnection, AbstractRobustChannel, AbstractQueue
+
+from src.settings import settings
+
+
+connection: AbstractRobustConnection
+channel: AbstractRobustChannel
+
+async def init_queue():
+    global connection, channel
+    connection = await aio_pika.connect_robust(settings.rabbitmq_url)
+    # publisher_confirms=True: publish() ждёт подтверждения брокера,
+    # т.е. 202 отдаётся только после того, как сообщение записано на диск
+    channel = await connection.channel(publisher_confirms=True)
+    await declare_webhook_queue(channel)
+
+async def close_queue():
+    await connection.close()
+
+def get_channel() -> AbstractRobustChannel:
+    return channel
+
+async def declare_webhook_queue(ch: AbstractRobustChannel) -> AbstractQueue:
+    """
+    Объявляет рабочую и dead-letter очереди (идемпотентно).
+    Quorum-очередь: реплицируется и переживает рестарт брокера,
+    x-delivery-limit отсекает «ядовитые» сообщения после N повторов.
+    """
+    await ch.declare_queue(
+        settings.webhook_dead_letter_queue_name,
+        durable=True,
+        arguments={"x-queue-type": "quorum"},
+    )
+    return await ch.declare_queue(
+        settings.webhook_queue_name,
+        durable=True,
+        arguments={
+            "x-queue-type": "quorum",
+            "x-delivery-limit": settings.webhook_worker_max_redeliveries,
+            "x-dead-letter-exchange": "",
+            "x-dead-letter-routing-key": settings.webhook_dead_letter_queue_name,
+        },
+    )
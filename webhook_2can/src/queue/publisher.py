@@ -0,0 +1,29 @@
+from aio_pika import DeliveryMode, Message
+from aio_pika.exceptions import AMQPError
+from loguru import logger
+
+from src.exceptions import QueueUnavailableError
+from src.queue.connection import get_channel
+from src.settings import settings
+
+
+async def publish_webhook(body: bytes, message_id: str) -> None:
+    """
+    Публикует сырой webhook в durable-очередь.
+    Возвращается только после publisher confirm от брокера.
+    """
+    message = Message(
+        body,
+        content_type="application/json",
+        delivery_mode=DeliveryMode.PERSISTENT,
+        message_id=message_id,
+    )
+    try:
+        await get_channel().default_exchange.publish(
+            message,
+            routing_key=settings.webhook_queue_name,
+            mandatory=True,
+        )
+    except (AMQPError, ConnectionError) as e:
+        logger.error(f"Failed to publish webhook {message_id}: {e}")
+        raise QueueUnavailableError(detail="Webhook queue is unavailable")
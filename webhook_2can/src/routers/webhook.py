@@ -1,6 +1,11 @@
 from fastapi import APIRouter, Depends
 
+from src.db.pools import pools_stats
+from src.dependencies.auth import AUTH_DEPENDENCIES
 from src.dependencies.webhook import process_webhook_payload
+from src.schemas.webhook import WebhookPayload
+from src.services.dedup import get_deduplicator
+from src.services.merchant_cache import get_merchant_cache
 
 router = APIRouter(tags=["Webhooks"])
 
@@ -8,6 +13,41 @@ router = APIRouter(tags=["Webhooks"])
              summary="Process incoming webhook from payment system",
              description="Validates and stores webhook payload from payment gateway into legacy database (`paydb`).",
              operation_id="process_payment_webhook",
+             # Тело читается как сырые байты (см. read_webhook_body) — схему указываем явно
+             openapi_extra={
+                 "requestBody": {
+                     "required": True,
+                     "content": {"application/json": {"schema": WebhookPayload.model_json_schema()}},
+                 }
+             },
              )
 async def get_hook(result = Depends(process_webhook_payload)):
-    return result
\ No newline at end of file
+    return result
+
+@router.get("/dedup/stats",
+            summary="Duplicate-webhook filter counters",
+            operation_id="get_webhook_dedup_stats",
+            dependencies=AUTH_DEPENDENCIES,  # служебные: только с access-токеном auth (AUTH_ENABLED)
+            )
+async def get_dedup_stats():
+    deduplicator = get_deduplicator()
+    return deduplicator.stats() if deduplicator else {"enabled": False}
+
+
+@router.get("/reference-cache/stats",
+            summary="Merchant/firm/tariff snapshot state",
+            operation_id="get_webhook_reference_cache_stats",
+            dependencies=AUTH_DEPENDENCIES,
+            )
+async def get_reference_cache_stats():
+    merchant_cache = get_merchant_cache()
+    return merchant_cache.stats() if merchant_cache else {"enabled": False}
+
+
+@router.get("/pools/stats",
+            summary="asyncpg pool usage: size, in-use, waiting, acquire wait",
+            operation_id="get_webhook_pools_stats",
+            dependencies=AUTH_DEPENDENCIES,
+            )
+async def get_pools_stats():
+    return pools_stats()
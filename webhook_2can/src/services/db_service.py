@@ -1,28 +1,127 @@
-from asyncpg import Connection, PostgresError
+from typing import List, Optional, Tuple
+
+from asyncpg import Connection, Pool, PostgresError
+from asyncpg.exceptions import CheckViolationError, DataError, NotNullViolationError
 from loguru import logger
 
-from src.exceptions import InvalidWebhookData
+from common.batch_writer import BatchEntry, MicroBatchWriter
+from src.db import functions as db_functions
+from src.metrics import DUPLICATES_DB
+from src.schemas.webhook import WebhookPayload
+from src.services.merchant_cache import resolve_payment
+from src.exceptions import (
+    BaseWebhookException,
+    InvalidWebhookData,
+    DatabaseError,
+    WebhookProcessingError,
+)
 
-async def call_webhook_function(conn: Connection, payload: dict) -> dict:
-    try:
-        logger.debug(f"Calling DB function with keys: {list(payload.keys())}")
-        result = await conn.fetchval("SELECT to_can.process_webhook($1)", payload)
+EMPTY_RESULT = b'{"status": "success"}'
+# Ошибки в данных вебхука (как EXCEPTION WHEN ... в to_can.f_syspay_batch): повтор не поможет → 400.
+# Остальные PostgresError (deadlock, serialization failure, lock timeout, обрыв) — временные → 503.
+DATA_ERRORS = (DataError, CheckViolationError, NotNullViolationError)
+INVALID_DATA_DETAIL = "Webhook data rejected by database"
+
+# Ответ о повторе f_syspay / f_syspay_resolved собирает json_build_object — текст начинается ровно так.
+# Эхо payload из f_payment — вывод jsonb ({"Id": ...}, без пробела перед двоеточием) — с ним не совпадёт.
+DUPLICATED_PREFIX = b'{"ans" : "duplicated"'
 
-        if isinstance(result, dict) and result.get("error"):
-            logger.warning(f"DB rejected webhook: {result['error']}")
-            raise InvalidWebhookData(detail=result["error"])
+def _check_result(result: Optional[bytes]) -> bytes:
+    """
+    Ответ БД остаётся сырыми JSON-байтами (см. src.db.codecs) и уходит клиенту как есть, без разбора.
+    Отказ по данным приходит исключением (DATA_ERRORS) или status пачки, а не ключом в ответе:
+    в ответе эхо payload, и искать в нём подстроки нельзя.
+    """
+    if not result:
+        return EMPTY_RESULT
+    if result.startswith(DUPLICATED_PREFIX):
+        DUPLICATES_DB.inc()
+    return result
 
+async def call_webhook_function(conn: Connection, body: bytes, payload: WebhookPayload) -> bytes:
+    try:
+        logger.debug(f"Calling DB function for webhook {payload.Id}")
+        result = _check_result(
+            await db_functions.call_webhook_function(conn, body, resolve_payment(payload))
+        )
         logger.info("Webhook processed successfully")
-        return result or {"status": "success"}
+        return result
 
-    except PostgresError as err:
+    except BaseWebhookException:
+        raise
+    except DATA_ERRORS as e:
+        logger.warning(f"DB rejected webhook {payload.Id}: [{e.sqlstate}] {e}")
+        raise InvalidWebhookData(detail=INVALID_DATA_DETAIL)
+    except PostgresError as e:
         logger.error(f"PostgreSQL error: {e}")
         raise DatabaseError(detail="Database operation failed")
-    except Exception as e:
+    except Exception:
         logger.exception("Unexpected error in DB function")
         raise WebhookProcessingError(detail="Internal error during DB call")
 
 
-    except Exception:
-        logger.exception("Exception in DB function call")
-        raise
\ No newline at end of file
+# (исходное тело, провалидированный payload)
+BatchItem = Tuple[bytes, WebhookPayload]
+
+
+class WebhookBatchWriter(MicroBatchWriter[BatchItem]):
+    """
+    Пачка конкурентных вебхуков (common/batch_writer.py) пишется одним вызовом
+    to_can.f_syspay_batch; ответ каждого элемента возвращается своему запросу.
+    """
+
+    def __init__(self, pool: Pool, max_size: int, linger_ms: float, max_in_flight: int):
+        super().__init__(max_size, linger_ms, max_in_flight)
+        self.pool = pool
+
+    async def write(self, batch: List[BatchEntry[BatchItem]]) -> None:
+        try:
+            logger.debug(f"Flushing webhook batch of {len(batch)}")
+            resolved = [resolve_payment(payload) for (_, payload), _ in batch]
+            async with self.pool.acquire() as conn:
+                results = await db_functions.call_webhook_batch_function(
+                    conn, [body for (body, _), _ in batch], resolved if any(resolved) else None
+                )
+        except PostgresError as e:
+            logger.error(f"PostgreSQL error in batch of {len(batch)}: {e}")
+            self.fail(batch, DatabaseError(detail="Database operation failed"))
+            return
+        except Exception:
+            logger.exception("Unexpected error in batch DB function")
+            self.fail(batch, WebhookProcessingError(detail="Internal error during DB call"))
+            return
+
+        for ((_, payload), future), (status, result) in zip(batch, results):
+            if future.done():  # клиент уже отвалился
+                continue
+            if status == "invalid":
+                logger.warning(f"DB rejected webhook {payload.Id} in batch: {result.decode()}")
+                future.set_exception(InvalidWebhookData(detail=INVALID_DATA_DETAIL))
+                continue
+            if status == "duplicated":
+                DUPLICATES_DB.inc()
+            future.set_result(result or EMPTY_RESULT)
+        # Страховка: ответов меньше, чем элементов, — не оставляем запросы висеть
+        self.fail(batch, WebhookProcessingError(detail="Missing result for webhook in batch"))
+
+
+batch_writer: Optional[WebhookBatchWriter] = None
+
+def start_batch_writer(pool: Pool, max_size: int, linger_ms: float, max_in_flight: int) -> None:
+    global batch_writer
+    batch_writer = WebhookBatchWriter(pool, max_size, linger_ms, max_in_flight)
+    batch_writer.start()
+
+async def stop_batch_writer() -> None:
+    if batch_writer:
+        await batch_writer.stop()
+
+def get_batch_writer() -> Optional[WebhookBatchWriter]:
+    return batch_writer
+
+async def write_webhook(pool: Pool, body: bytes, payload: WebhookPayload) -> bytes:
+    """Запись вебхука: через пачку, если batch writer запущен, иначе — отдельным вызовом."""
+    if batch_writer:
+        return await batch_writer.submit((body, payload))
+    async with pool.acquire() as conn:
+        return await call_webhook_function(conn, body, payload)
@@ -0,0 +1,139 @@
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+from loguru import logger
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.metrics import (
+    DEDUP_MEMORY_HIT,
+    DEDUP_MEMORY_MISS,
+    DEDUP_REDIS_HIT,
+    DEDUP_REDIS_MISS,
+    DUPLICATES_MEMORY,
+    DUPLICATES_REDIS,
+)
+from src.settings import settings
+
+
+REDIS_KEY_PREFIX = "webhook:2can:seen:"
+
+
+def normalize_webhook_id(webhook_id: str) -> str:
+    """Приводит Id к виду, в котором его возвращает БД (uuid в нижнем регистре)."""
+    try:
+        return str(uuid.UUID(webhook_id))
+    except ValueError:
+        return webhook_id
+
+
+class WebhookDeduplicator:
+    """
+    Фильтр повторных вебхуков перед to_can.f_syspay.
+
+    L1 — LRU в памяти воркера с окном window_seconds и потолком max_entries
+    (~150 байт на запись). Опционально L2 — ключи в Redis с тем же TTL,
+    чтобы несколько uvicorn-воркеров (и src.worker) видели одни и те же Id.
+
+    Id запоминается только ПОСЛЕ успешной записи в БД: упавший вызов
+    не должен превращать повтор шлюза в ложный "duplicated".
+    """
+
+    def __init__(self, max_entries: int, window_seconds: int, redis: Optional[Redis] = None):
+        self.max_entries = max_entries
+        self.window_seconds = window_seconds
+        self.redis = redis
+        self._seen: OrderedDict[str, float] = OrderedDict()  # id -> monotonic expires_at
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def check(self, webhook_id: str) -> Optional[dict]:
+        """Возвращает ответ как у f_syspay для известного Id, иначе None."""
+        key = normalize_webhook_id(webhook_id)
+        expires_at = self._seen.get(key)
+        if expires_at is not None:
+            if expires_at > time.monotonic():
+                self._seen.move_to_end(key)
+                self.hits += 1
+                DEDUP_MEMORY_HIT.inc()
+                DUPLICATES_MEMORY.inc()
+                return {"ans": "duplicated", "id": key}
+            del self._seen[key]
+        DEDUP_MEMORY_MISS.inc()
+
+        if self.redis is not None:
+            try:
+                if await self.redis.exists(REDIS_KEY_PREFIX + key):
+                    self.redis_hits += 1
+                    DEDUP_REDIS_HIT.inc()
+                    DUPLICATES_REDIS.inc()
+                    self._remember_local(key)
+                    return {"ans": "duplicated", "id": key}
+                DEDUP_REDIS_MISS.inc()
+            except RedisError as e:
+                # Redis — только оптимизация, источник истины — UNIQUE (id_uuid)
+                logger.warning(f"Dedup Redis lookup failed: {e}")
+
+        self.misses += 1
+        return None
+
+    async def remember(self, webhook_id: str) -> None:
+        key = normalize_webhook_id(webhook_id)
+        self._remember_local(key)
+        if self.redis is not None:
+            try:
+                await self.redis.set(REDIS_KEY_PREFIX + key, 1, ex=self.window_seconds)
+            except RedisError as e:
+                logger.warning(f"Dedup Redis write failed: {e}")
+
+    def _remember_local(self, key: str) -> None:
+        now = time.monotonic()
+        self._seen[key] = now + self.window_seconds
+        self._seen.move_to_end(key)
+        # Сначала выбрасываем протухшие с головы, затем — по потолку памяти
+        while self._seen:
+            oldest_key, oldest_expires = next(iter(self._seen.items()))
+            if oldest_expires > now and len(self._seen) <= self.max_entries:
+                break
+            del self._seen[oldest_key]
+            if oldest_expires > now:
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._seen),
+            "max_entries": self.max_entries,
+            "window_seconds": self.window_seconds,
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+deduplicator: Optional[WebhookDeduplicator] = None
+
+def init_deduplicator() -> None:
+    global deduplicator
+    if not settings.webhook_dedup_enabled:
+        return
+    redis = None
+    if settings.webhook_dedup_redis_url:
+        redis = Redis.from_url(str(settings.webhook_dedup_redis_url))
+    deduplicator = WebhookDeduplicator(
+        settings.webhook_dedup_max_entries,
+        settings.webhook_dedup_window_seconds,
+        redis,
+    )
+
+async def close_deduplicator() -> None:
+    if deduplicator and deduplicator.redis is not None:
+        await deduplicator.redis.aclose()
+
+def get_deduplicator() -> Optional[WebhookDeduplicator]:
+    return deduplicator
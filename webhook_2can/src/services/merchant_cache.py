@@ -0,0 +1,240 @@
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Dict, List, Optional
+
+import asyncpg
+from loguru import logger
+
+from src.metrics import REFERENCE_CACHE_HIT, REFERENCE_CACHE_MISS
+from src.schemas.webhook import WebhookPayload
+from src.settings import settings
+
+
+NOTIFY_CHANNEL = "to_can_reference_changed"
+CENTS = Decimal("0.01")
+
+
+@dataclass(frozen=True)
+class TariffRange:
+    minsum: Decimal
+    maxsum: Decimal
+    resolved_json: str  # готовый x_resolved для to_can.f_payment_resolved
+
+
+@dataclass(frozen=True)
+class MerchantResolution:
+    ratio: Decimal
+    tariffs: List[TariffRange]
+
+
+class MerchantResolutionCache:
+    """
+    Версионированный снимок MID → мерчант/фирма/комиссия/ratio/тарифы
+    (to_can.get_payment_resolution), чтобы горячий путь вызывал
+    to_can.f_syspay_resolved — одну вставку вместо CTE-цепочки f_payment.
+
+    Семантика инвалидации:
+    - NOTIFY to_can_reference_changed (триггеры на справочниках) сразу помечает
+      снимок устаревшим — до окончания перечитывания resolve() возвращает None,
+      и вебхуки идут по полному пути f_syspay;
+    - снимок старше ttl_seconds (например, пропал LISTEN) тоже не используется;
+    - MID, который резолвится неоднозначно (несколько строк), или сумма,
+      под которую подходит не ровно один тариф, — всегда полный путь.
+    """
+
+    def __init__(self, dsn: str, ttl_seconds: int):
+        self.dsn = dsn
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self._snapshot: Dict[str, MerchantResolution] = {}
+        self._loaded_at = 0.0
+        self._stale = True
+        self._invalidations = 0
+        self._listen_conn: Optional[asyncpg.Connection] = None
+        self._refresh_requested = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.hits = 0
+        self.fallbacks = 0
+
+    async def start(self) -> None:
+        # LISTEN до первой загрузки, чтобы не пропустить изменения между ними
+        try:
+            await self._ensure_listener()
+            await self.refresh()
+        except Exception as e:
+            # Не мешаем старту сервиса: пока снимка нет, работает полный путь f_syspay
+            logger.error(f"Initial merchant snapshot load failed: {e}")
+            self._refresh_requested.set()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self._close_listener()
+
+    def resolve(self, mid: str, amount: str) -> Optional[str]:
+        """x_resolved для f_syspay_resolved или None — тогда полный путь f_syspay."""
+        if self._stale or time.monotonic() - self._loaded_at > self.ttl_seconds:
+            self.fallbacks += 1
+            REFERENCE_CACHE_MISS.inc()
+            return None
+        resolution = self._snapshot.get(mid)
+        if resolution is None:
+            self.fallbacks += 1
+            REFERENCE_CACHE_MISS.inc()
+            return None
+        try:
+            # как в f_payment: (amount * ratio)::numeric(10,2)
+            sum_val = (Decimal(amount) * resolution.ratio).quantize(CENTS, ROUND_HALF_UP)
+        except (InvalidOperation, TypeError):
+            self.fallbacks += 1
+            REFERENCE_CACHE_MISS.inc()
+            return None
+        matched = [t for t in resolution.tariffs if t.minsum < sum_val < t.maxsum]
+        if len(matched) != 1:
+            self.fallbacks += 1
+            REFERENCE_CACHE_MISS.inc()
+            return None
+        self.hits += 1
+        REFERENCE_CACHE_HIT.inc()
+        return matched[0].resolved_json
+
+    async def refresh(self) -> None:
+        invalidations = self._invalidations
+        # Справочники читаем с мастера: после NOTIFY реплика может ещё отставать
+        conn = await asyncpg.connect(self.dsn)
+        try:
+            rows = await conn.fetch("SELECT mid, resolved FROM to_can.get_payment_resolution()")
+        finally:
+            await conn.close()
+
+        snapshot: Dict[str, MerchantResolution] = {}
+        ambiguous = set()
+        for row in rows:
+            mid = row["mid"]
+            if mid in snapshot or mid in ambiguous:
+                snapshot.pop(mid, None)
+                ambiguous.add(mid)
+                continue
+            resolution = self._build_resolution(json.loads(row["resolved"]))
+            if resolution is not None:
+                snapshot[mid] = resolution
+
+        self._snapshot = snapshot
+        self._loaded_at = time.monotonic()
+        # NOTIFY пришёл во время чтения — снимок мог не увидеть изменение
+        self._stale = invalidations != self._invalidations
+        self.version += 1
+        logger.info(
+            f"Merchant resolution snapshot v{self.version}: "
+            f"{len(snapshot)} MIDs, {len(ambiguous)} ambiguous"
+        )
+
+    @staticmethod
+    def _build_resolution(resolved: dict) -> Optional[MerchantResolution]:
+        if resolved.get("ratio") is None:
+            return None
+        base = {
+            key: resolved[key]
+            for key in ("principal", "idmerch", "comm_json", "firm_json", "merch_json", "e_kassa")
+            if resolved.get(key) is not None
+        }
+        tariffs = []
+        for tariff in resolved.get("tariffs") or []:
+            if tariff.get("minsum") is None or tariff.get("maxsum") is None:
+                continue
+            params = dict(base)
+            if tariff.get("tarif_json") is not None:
+                params["tarif_json"] = tariff["tarif_json"]
+            tariffs.append(TariffRange(
+                minsum=Decimal(str(tariff["minsum"])),
+                maxsum=Decimal(str(tariff["maxsum"])),
+                resolved_json=json.dumps(params, ensure_ascii=False),
+            ))
+        return MerchantResolution(ratio=Decimal(str(resolved["ratio"])), tariffs=tariffs)
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        logger.info(f"Reference data changed ({payload}), invalidating merchant snapshot")
+        self._stale = True
+        self._invalidations += 1
+        self._refresh_requested.set()
+
+    def _on_listener_lost(self, connection) -> None:
+        # Без LISTEN изменения можно пропустить — не доверяем снимку до переподключения
+        logger.warning("Lost LISTEN connection for merchant snapshot")
+        self._stale = True
+        self._invalidations += 1
+        self._listen_conn = None
+        self._refresh_requested.set()
+
+    async def _ensure_listener(self) -> None:
+        if self._listen_conn is not None and not self._listen_conn.is_closed():
+            return
+        self._listen_conn = await asyncpg.connect(self.dsn)
+        self._listen_conn.add_termination_listener(self._on_listener_lost)
+        await self._listen_conn.add_listener(NOTIFY_CHANNEL, self._on_notify)
+
+    async def _close_listener(self) -> None:
+        if self._listen_conn is not None and not self._listen_conn.is_closed():
+            await self._listen_conn.close()
+        self._listen_conn = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._ensure_listener()
+                try:
+                    await asyncio.wait_for(self._refresh_requested.wait(), self.ttl_seconds / 2)
+                except asyncio.TimeoutError:
+                    pass
+                self._refresh_requested.clear()
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Merchant snapshot refresh failed: {e}")
+                await self._close_listener()
+                await asyncio.sleep(5)
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "mids": len(self._snapshot),
+            "stale": self._stale,
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1),
+            "hits": self.hits,
+            "fallbacks": self.fallbacks,
+        }
+
+
+merchant_cache: Optional[MerchantResolutionCache] = None
+
+async def init_merchant_cache() -> None:
+    global merchant_cache
+    if not settings.webhook_reference_cache_enabled:
+        return
+    merchant_cache = MerchantResolutionCache(
+        str(settings.database_write_url),
+        settings.webhook_reference_cache_ttl_seconds,
+    )
+    await merchant_cache.start()
+
+async def close_merchant_cache() -> None:
+    if merchant_cache:
+        await merchant_cache.stop()
+
+def get_merchant_cache() -> Optional[MerchantResolutionCache]:
+    return merchant_cache
+
+def resolve_payment(payload: WebhookPayload) -> Optional[str]:
+    if merchant_cache is None:
+        return None
+    return merchant_cache.resolve(payload.MID, payload.Amount)
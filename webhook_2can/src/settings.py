@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
-from pydantic import ConfigDict, PostgresDsn
+from pydantic import ConfigDict, PostgresDsn, RedisDsn
 from pathlib import Path
+from typing import Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -9,6 +10,58 @@ class Settings(BaseSettings):
     rabbitmq_url: str
     log_dir: Path = Path("./logs")
 
+    # Пулы asyncpg (src/db/pools.py): write — HAProxy 5432, read — HAProxy 5433
+    db_write_pool_min_size: int = 2
+    db_write_pool_max_size: int = 10
+    db_read_pool_min_size: int = 1
+    db_read_pool_max_size: int = 5
+    db_pool_acquire_timeout: Optional[float] = 10.0  # сек ожидания свободного соединения
+    db_pool_command_timeout: Optional[float] = None
+    db_pool_max_inactive_connection_lifetime: float = 300.0
+    db_pool_max_queries: int = 50_000  # после N запросов соединение пересоздаётся
+    db_pool_statement_cache_size: int = 100
+
+    # Режим приёма вебхуков:
+    #   sync  — f_syspay вызывается внутри HTTP-запроса (как раньше)
+    #   queue — payload кладётся в RabbitMQ, ответ 202, в БД пишет src.worker
+    webhook_ingest_mode: Literal["sync", "queue"] = "sync"
+    webhook_queue_name: str = "webhook.2can.syspay"
+    webhook_dead_letter_queue_name: str = "webhook.2can.syspay.dead"
+    webhook_worker_prefetch: int = 50
+    webhook_worker_max_redeliveries: int = 10  # после N попыток сообщение уходит в dead-очередь
+    # Пауза перед возвратом в очередь после временной ошибки: base * 2^попытка, не больше max —
+    # failover БД (секунды) не съедает x-delivery-limit за миллисекунды
+    webhook_worker_retry_base_delay_seconds: float = 0.5
+    webhook_worker_retry_max_delay_seconds: float = 30.0
+
+    # Micro-batching записи в to_can.syspay (to_can.f_syspay_batch)
+    webhook_batch_enabled: bool = False
+    webhook_batch_max_size: int = 100  # M вебхуков в пачке
+    webhook_batch_linger_ms: float = 5.0  # N мс ожидания добора пачки
+    webhook_batch_max_in_flight: int = 4  # параллельных пачек (соединений write-пула)
+
+    # Фильтр повторных вебхуков (по WebhookPayload.Id) перед f_syspay — включается явно:
+    # отвечает "duplicated", не доходя до БД; источник истины — UNIQUE (id_uuid), фильтр лишь экономит запросы
+    webhook_dedup_enabled: bool = False
+    webhook_dedup_max_entries: int = 100_000  # потолок памяти: ~150 байт на Id → ~15 МБ
+    webhook_dedup_window_seconds: int = 24 * 60 * 60
+    webhook_dedup_redis_url: Optional[RedisDsn] = None  # общий фильтр для всех воркеров
+
+    # Кэш справочников f_payment (MID → мерчант/фирма/комиссия/тарифы), см. to_can.f_syspay_resolved
+    webhook_reference_cache_enabled: bool = False
+    webhook_reference_cache_ttl_seconds: int = 300  # верхняя граница устаревания без NOTIFY
+
+    # Проверка access-токенов auth (src/dependencies/auth.py): HS256 — общий с auth секрет,
+    # RS256 / EdDSA — публичные ключи из JWKS auth; отзывы — стрим access_token_revocations в Redis auth (DB=0)
+    auth_enabled: bool = False
+    auth_jwt_algorithm: Literal["HS256", "RS256", "EdDSA"] = "HS256"  # как JWT_ALGORITHM у auth
+    auth_jwt_secret_key: Optional[str] = None  # только для HS256
+    auth_jwks_url: str = "http://auth:8001/.well-known/jwks.json"
+    auth_jwks_refresh_seconds: float = 300.0  # и сразу при неизвестном kid (не чаще раза в 30 с)
+    auth_redis_url: RedisDsn = "redis://localhost:6379/0"
+    auth_revocation_max_staleness_seconds: float = 5.0  # дольше — отзыв проверяется в Redis на каждый запрос
+    auth_claims_cache_size: int = 10_000
+
     model_config = ConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",  # рекомендуется явно указать кодировку
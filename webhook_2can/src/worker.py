@@ -0,0 +1,113 @@
+"""
+Воркер режима WEBHOOK_INGEST_MODE=queue: вычитывает вебхуки из RabbitMQ
+и записывает их через to_can.f_syspay.
+
+Запуск отдельным процессом:
+    python -m src.worker
+
+Гарантия at-least-once: ack отправляется только после коммита в БД.
+Если воркер упал между коммитом и ack — сообщение придёт повторно,
+и f_syspay вернёт {"ans": "duplicated"} благодаря UNIQUE (id_uuid).
+"""
+import asyncio
+import signal
+
+from aio_pika.abc import AbstractIncomingMessage
+from loguru import logger
+from pydantic import ValidationError
+
+from src.db.pools import init_pools, close_pools, get_write_pool
+from src.exceptions import InvalidWebhookData
+from src.logger_config import setup_logger
+from src.schemas.webhook import WebhookPayload
+from src.queue.connection import init_queue, close_queue, get_channel, declare_webhook_queue
+from src.services.db_service import write_webhook, start_batch_writer, stop_batch_writer
+from src.services.dedup import init_deduplicator, close_deduplicator, get_deduplicator
+from src.services.merchant_cache import init_merchant_cache, close_merchant_cache
+from src.settings import settings
+
+
+def retry_delay(message: AbstractIncomingMessage) -> float:
+    """Экспоненциальная пауза перед nack по x-delivery-count (счётчик quorum-очереди)."""
+    deliveries = int((message.headers or {}).get("x-delivery-count", 0))
+    return min(
+        settings.webhook_worker_retry_base_delay_seconds * 2 ** deliveries,
+        settings.webhook_worker_retry_max_delay_seconds,
+    )
+
+
+async def handle_message(message: AbstractIncomingMessage) -> None:
+    try:
+        payload = WebhookPayload.model_validate_json(message.body)
+    except ValidationError:
+        logger.error(f"Malformed webhook message {message.message_id}, moving to dead-letter")
+        await message.reject(requeue=False)
+        return
+
+    deduplicator = get_deduplicator()
+    if deduplicator and await deduplicator.check(payload.Id):
+        logger.info(f"Webhook {message.message_id} already stored, skipping")
+        await message.ack()
+        return
+
+    try:
+        result = await write_webhook(get_write_pool(), message.body, payload)
+    except InvalidWebhookData as e:
+        # БД отвергла данные — повтор не поможет
+        logger.warning(f"Webhook {message.message_id} rejected by DB: {e.detail}")
+        await message.reject(requeue=False)
+        return
+    except Exception as e:
+        # Временная ошибка (БД/сеть) — вернуть в очередь после паузы (иначе повторы за миллисекунды
+        # исчерпают x-delivery-limit); после x-delivery-limit попыток брокер переложит в dead-очередь
+        delay = retry_delay(message)
+        logger.error(f"Webhook {message.message_id} failed, requeue in {delay:.1f}s: {e}")
+        await asyncio.sleep(delay)
+        await message.nack(requeue=True)
+        return
+
+    await message.ack()
+    if deduplicator:
+        await deduplicator.remember(payload.Id)
+    logger.info(f"Webhook {message.message_id} stored: {result.decode()}")
+
+
+async def run_worker() -> None:
+    logger.info("🚀 Starting webhook worker...")
+    await init_pools()
+    init_deduplicator()
+    await init_merchant_cache()
+    if settings.webhook_batch_enabled:
+        start_batch_writer(
+            get_write_pool(),
+            settings.webhook_batch_max_size,
+            settings.webhook_batch_linger_ms,
+            settings.webhook_batch_max_in_flight,
+        )
+    await init_queue()
+
+    channel = get_channel()
+    await channel.set_qos(prefetch_count=settings.webhook_worker_prefetch)
+    queue = await declare_webhook_queue(channel)
+    consumer_tag = await queue.consume(handle_message)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await stop.wait()
+
+    logger.info("🛑 Stopping webhook worker...")
+    # Сначала перестаём брать новые сообщения; неподтверждённые вернутся в очередь
+    await queue.cancel(consumer_tag)
+    await close_queue()
+    await stop_batch_writer()
+    await close_deduplicator()
+    await close_merchant_cache()
+    await close_pools()
+
+
+if __name__ == "__main__":
+    setup_logger()
+    asyncio.run(run_worker())